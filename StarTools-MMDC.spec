@@ -1,4 +1,6 @@
 # StarTools-MMDC.spec
+from PyInstaller.utils.hooks import collect_submodules
+
 block_cipher = None
 
 a = Analysis(
@@ -6,7 +8,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('startools_mmdc.ico', '.')],  
-    hiddenimports=[],
+    hiddenimports=['mmdc_gui', 'mmdc_core'] + collect_submodules('mmdc_core'),
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -3,6 +3,8 @@ echo Building StarTools: MMDC...
 pyinstaller --noconfirm --windowed --onefile ^
  --name "StarTools-MMDC" ^
  --icon=startools_mmdc.ico ^
+ --hidden-import mmdc_gui ^
+ --collect-submodules mmdc_core ^
  mmdc.py
 
 echo Build complete!
@@ -0,0 +1,254 @@
+"""
+StarTools: MMDC benchmark harness.
+
+Generates a synthetic modpack (Registry Dump-style dump/items tree, N mod jars, an RP zip)
+and times each pipeline stage on it, so pack sizes can be compared across versions:
+
+    python mmdc_bench.py --mods 50 200 2000 --out bench_results.json
+    python mmdc_bench.py --mods 200 --compare bench_results.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import zipfile
+import argparse
+import platform
+import tempfile
+from typing import Dict, List, Optional
+
+from mmdc_core import (
+    APP_NAME,
+    compute_display_names,
+    group_dupes_by_name,
+    load_mod_langs,
+    load_resource_pack_langs,
+    scan_registry_folder,
+    write_reports,
+)
+
+BENCH_VERSION = 1
+
+# order matters: it is the pipeline order and the column order of the summary
+STAGES = (
+    "scan_registry_folder",
+    "load_mod_langs",
+    "load_resource_pack_langs",
+    "compute_display_names",
+    "group_dupes_by_name",
+    "write_reports",
+)
+
+WORDS = (
+    "copper", "tin", "silver", "lead", "nickel", "zinc", "bronze", "steel", "ruby", "sapphire",
+    "limestone", "marble", "basalt", "slate", "andesite", "oak", "birch", "maple", "pear", "apple",
+    "orange", "cherry", "jelly", "cheese", "bread", "salt", "crystal", "quartz", "obsidian", "ender",
+)
+SHAPES = ("", "", "", "Nugget", "Ingot", "Dust", "Plate", "Gear", "Block", "Slab", "Stairs", "Wall", "Ore")
+
+##############################
+# Synthetic modpack
+##############################
+
+def random_name(rng: random.Random) -> str:
+    words = rng.sample(WORDS, rng.randint(1, 2))
+    shape = rng.choice(SHAPES)
+    name = " ".join(w.title() for w in words) + (f" {shape}" if shape else "")
+    # the near-misses RCP contributors care about
+    if rng.random() < 0.1:
+        name += "s"
+    return name
+
+def generate_pack(root: str,
+                  mods: int,
+                  items_per_mod: int = 40,
+                  extra_lang_keys: int = 200,
+                  missing_lang_ratio: float = 0.05,
+                  rp_ratio: float = 0.1,
+                  seed: int = 1) -> Dict[str, str]:
+    """
+    Writes <root>/dump/items/<modid>.json, <root>/mods/<modid>.jar and <root>/rp.zip.
+    Each jar's en_us.json holds the item names plus `extra_lang_keys` unrelated keys (tooltips, blocks, ...),
+    so lang files are as heavy as real ones. Returns the registry/mods/rp paths.
+    """
+    rng = random.Random(seed)
+    registry = os.path.join(root, "dump", "items")
+    mods_folder = os.path.join(root, "mods")
+    rp_path = os.path.join(root, "rp.zip")
+    os.makedirs(registry, exist_ok=True)
+    os.makedirs(mods_folder, exist_ok=True)
+    overrides: Dict[str, str] = {}
+    for m in range(mods):
+        modid = f"benchmod{m}"
+        ids = [f"{modid}:item_{i}" for i in range(items_per_mod)]
+        lang: Dict[str, str] = {}
+        for i in range(items_per_mod):
+            key = f"item.{modid}.item_{i}"
+            name = random_name(rng)
+            if rng.random() >= missing_lang_ratio:
+                lang[key] = name
+            if rng.random() < rp_ratio:
+                overrides[key] = f"{name} ({modid})"
+        for i in range(extra_lang_keys):
+            lang[f"tooltip.{modid}.line_{i}"] = f"{random_name(rng)} tooltip text number {i}"
+        # both registry file shapes extract_ids_from_json understands
+        data = ids if m % 2 else [{"id": x} for x in ids]
+        with open(os.path.join(registry, f"{modid}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        with zipfile.ZipFile(os.path.join(mods_folder, f"{modid}.jar"), "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\n")
+            zf.writestr(f"assets/{modid}/lang/en_us.json", json.dumps(lang))
+            for c in range(10):
+                zf.writestr(f"com/example/{modid}/Class{c}.class", b"\xca\xfe\xba\xbe" + bytes(256))
+    with zipfile.ZipFile(rp_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("pack.mcmeta", json.dumps({"pack": {"pack_format": 15, "description": "MMDC bench"}}))
+        zf.writestr("assets/rcp/lang/en_us.json", json.dumps(overrides))
+    return {"registry": registry, "mods": mods_folder, "rp": rp_path}
+
+##############################
+# Timed run
+##############################
+
+def run_pipeline(paths: Dict[str, str], output_dir: str, lang_workers: int = 1, report_workers: int = 4) -> dict:
+    """
+    One pass over the pipeline with every stage timed on its own (wall-clock seconds).
+    The lang cache is not used, so load_mod_langs always reads the jars.
+    """
+    stages: Dict[str, float] = {}
+
+    def timed(stage: str, fn, *args, **kwargs):
+        started = time.perf_counter()
+        value = fn(*args, **kwargs)
+        stages[stage] = time.perf_counter() - started
+        return value
+
+    store = timed("scan_registry_folder", scan_registry_folder, paths["registry"],
+                  treat_underscores_as_spaces=True, case_insensitive=True)
+    mod_langs = timed("load_mod_langs", load_mod_langs, paths["mods"], workers=lang_workers).get("en_us", {})
+    rp_overrides = timed("load_resource_pack_langs", load_resource_pack_langs, paths["rp"]).get("en_us", {})
+    before, after = timed("compute_display_names", compute_display_names, "item", store, mod_langs, rp_overrides)
+    started = time.perf_counter()
+    before_dupes = group_dupes_by_name(before, True, True)
+    after_dupes = group_dupes_by_name(after, True, True)
+    stages["group_dupes_by_name"] = time.perf_counter() - started
+    timed("write_reports", write_reports, output_dir, paths["registry"], "item", before, after,
+          case_insensitive=True, treat_underscores_as_spaces=True,
+          before_dupes=before_dupes, after_dupes=after_dupes, workers=report_workers)
+    return {
+        "ids": len(store),
+        "mods_with_langs": len(mod_langs),
+        "rp_overrides": len(rp_overrides),
+        "after_groups": len(after_dupes),
+        "stages": stages,
+        "total": sum(stages.values()),
+    }
+
+def bench_size(mods: int,
+               items_per_mod: int,
+               extra_lang_keys: int,
+               repeat: int,
+               lang_workers: int,
+               report_workers: int,
+               work_dir: Optional[str] = None,
+               log=print) -> dict:
+    """
+    Generates one pack size and runs the pipeline `repeat` times; each stage reports its best time.
+    """
+    root = work_dir or tempfile.mkdtemp(prefix=f"mmdc_bench_{mods}_")
+    try:
+        started = time.perf_counter()
+        paths = generate_pack(root, mods, items_per_mod, extra_lang_keys)
+        log(f"[{mods} mods] pack generated in {time.perf_counter() - started:.1f}s")
+        runs = []
+        for i in range(repeat):
+            out = os.path.join(root, f"out_{i}")
+            runs.append(run_pipeline(paths, out, lang_workers, report_workers))
+            log(f"[{mods} mods] run {i + 1}/{repeat}: {runs[-1]['total']:.3f}s")
+        best = {stage: min(r["stages"][stage] for r in runs) for stage in STAGES}
+        return {
+            "mods": mods,
+            "items_per_mod": items_per_mod,
+            "extra_lang_keys": extra_lang_keys,
+            "ids": runs[0]["ids"],
+            "rp_overrides": runs[0]["rp_overrides"],
+            "after_groups": runs[0]["after_groups"],
+            "repeat": repeat,
+            "stages": best,
+            "total": sum(best.values()),
+            "runs": [r["stages"] for r in runs],
+        }
+    finally:
+        if work_dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+##############################
+# Results
+##############################
+
+def print_summary(results: List[dict], baseline: Optional[dict] = None):
+    """
+    One row per pack size, one column per stage (ms); with a baseline, the ratio new/old per stage.
+    """
+    old = {r["mods"]: r for r in baseline.get("results", [])} if baseline else {}
+    header = f"{'mods':>6} {'ids':>8} " + " ".join(f"{s[:14]:>14}" for s in STAGES) + f" {'total':>9}"
+    print(header)
+    for r in results:
+        print(f"{r['mods']:>6} {r['ids']:>8} " + " ".join(f"{r['stages'][s] * 1000:>12.1f}ms" for s in STAGES)
+              + f" {r['total']:>8.3f}s")
+        prev = old.get(r["mods"])
+        if prev is not None:
+            ratios = []
+            for s in STAGES:
+                before = prev["stages"].get(s)
+                ratios.append(f"{r['stages'][s] / before:>13.2f}x" if before else f"{'-':>14}")
+            print(f"{'vs':>6} {'base':>8} " + " ".join(ratios) + f" {r['total'] / prev['total']:>8.2f}x")
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mmdc_bench", description=f"{APP_NAME} benchmark")
+    parser.add_argument("--mods", type=int, nargs="+", default=[50, 200], help="pack sizes (number of mod jars)")
+    parser.add_argument("--items-per-mod", type=int, default=40)
+    parser.add_argument("--extra-lang-keys", type=int, default=200, help="unrelated keys per en_us.json")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size; the best time per stage is kept")
+    parser.add_argument("--lang-workers", type=int, default=1, help="jar parser processes (0 = one per CPU)")
+    parser.add_argument("--report-workers", type=int, default=4)
+    parser.add_argument("--label", default="", help="free text stored with the results (e.g. a version or commit)")
+    parser.add_argument("--out", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--keep", metavar="DIR", help="generate the packs in DIR and keep them")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except Exception as ex:
+            print(f"error: cannot read {args.compare}: {ex}", file=sys.stderr)
+            return 2
+    results = []
+    for mods in args.mods:
+        work_dir = os.path.join(args.keep, f"pack_{mods}") if args.keep else None
+        results.append(bench_size(mods, args.items_per_mod, args.extra_lang_keys, max(1, args.repeat),
+                                  args.lang_workers, args.report_workers, work_dir))
+    data = {
+        "version": BENCH_VERSION,
+        "label": args.label,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "stages": list(STAGES),
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print_summary(results, baseline)
+    print(f"Results written to {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+StarTools: MMDC scan engine, importable on its own: nothing here loads tkinter or ttkbootstrap.
+
+    from mmdc_core import ScanOptions, run_scan
+    result = run_scan(ScanOptions(registry_folder="dump/items", mods_folder="mods", output_folder="reports"))
+
+A run gets all its settings from the ScanOptions (or mmdc.json-style dict) it is given and keeps its state
+to itself, so several scans can run at once in one process. The names below are imported from their module
+on first use: importing the package costs next to nothing, and a scan never loads what only serve needs.
+"""
+import importlib
+
+# module -> the public names it provides
+_EXPORTS = {
+    "common": ("APP_NAME", "BATCH_SUMMARY_NAME", "CONFIG_NAME", "DEFAULT_LOCALE", "DISCOVERY_COUNT_LIMIT",
+               "DISCOVERY_MAX_CANDIDATES", "DISCOVERY_MAX_DEPTH", "DUMP_ID_KEYS", "JAR_STORE_NAME",
+               "JAR_STORE_VERSION", "KINDS", "LANG_CACHE_NAME", "LANG_CACHE_VERSION",
+               "NEAR_DUPE_DEFAULT_THRESHOLD", "NESTED_JAR_DEPTH", "NESTED_JAR_FOLDERS", "NORMALIZE_CACHE_SIZE",
+               "PARALLEL_MIN_JARS", "REGISTRY_DUMP_FOLDERS", "REPORT_BUFFER_SIZE", "RESULTS_DB_NAME",
+               "RUN_METRICS_NAME", "RUN_METRICS_VERSION", "RUN_PROFILE_NAME", "SERVE_HOST", "SERVE_PORT",
+               "SNAPSHOT_NAME", "SNAPSHOT_VERSION", "STREAM_CHUNK_SIZE", "STREAM_MIN_BYTES",
+               "UNKNOWN_KIND", "WATCH_INTERVAL", "count_stat", "extract_ids_from_json", "infer_kind_from_path",
+               "lang_key_for", "prettify_from_id", "registry_folder_kind", "temp_path_for", "warn_to_stderr"),
+    "registry": ("JsonStream", "NameTable", "RegistryStore", "collect_dump_files_by_kind",
+                 "discover_registry_folders", "find_registry_candidates", "iter_dump_ids", "read_dump_ids",
+                 "scan_registry_files", "scan_registry_folder"),
+    "langs": ("JarStore", "JarStoreView", "LangCache", "file_sha1", "jar_fingerprint", "lang_entry_covers",
+              "lang_file_locale", "list_mod_jars", "load_mod_langs", "load_resource_pack_langs",
+              "load_resource_pack_stack", "namespaces_of", "needed_lang_keys", "parse_rp_stack",
+              "read_jar_langs", "read_jars_parallel", "resolve_worker_count"),
+    "names": ("NameNormalizer", "build_mod_index", "changed_name_ids", "compute_display_names",
+              "count_cross_mod_groups", "cross_mod_group_names", "fold_whitespace", "group_dupes_by_name",
+              "name_normalizer", "nfkc", "normalize_name_for_compare", "strip_formatting_codes",
+              "underscores_to_spaces"),
+    "reports": ("format_after_rp_blocks", "report_settings_line", "write_after_rp_master", "write_reports"),
+    "near_dupes": ("bounded_edit_distance", "find_near_duplicates", "write_near_duplicates_report"),
+    "what_if": ("WhatIfBaseline", "parse_what_if_stacks", "write_what_if_report"),
+    "results": ("RESULTS_DB_INDEXES", "RESULTS_DB_SCHEMA", "ResultsIndex", "write_reports_from_db",
+                "write_results_db"),
+    "options": ("ScanOptions", "parse_locale_list", "parse_mod_list"),
+    "incremental": ("diff_mod_jars", "jar_lang_namespaces", "load_snapshot", "resolve_names_incremental",
+                    "save_snapshot", "snapshot_settings", "update_dupe_groups", "write_delta_report"),
+    "metrics": ("RunMetrics", "peak_memory_bytes", "write_profile"),
+    "pipeline": ("ScanCancelled", "run_scan", "validate_scan_options"),
+    "watch": ("LiveAfterRP", "RPWatcher", "rp_lang_signature", "scan_kind_stores", "stores_lang_keys",
+              "watch_resource_pack"),
+    "batch": ("load_batch_file", "run_batch", "write_batch_summary"),
+    "service": ("NameService", "NameServiceHandler", "make_name_server"),
+    "config": ("load_config", "load_config_file", "save_config"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+__all__ = sorted(_MODULE_OF)
+
+def __getattr__(name: str):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | _MODULE_OF.keys())
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, List, Optional, Set, Callable
+
+from .common import BATCH_SUMMARY_NAME, DEFAULT_LOCALE, warn_to_stderr
+from .langs import JarStore, list_mod_jars
+from .options import ScanOptions, parse_locale_list
+from .pipeline import run_scan, validate_scan_options
+
+##############################
+# Batch
+##############################
+
+def load_batch_file(batch_path: str) -> Tuple[dict, List[dict]]:
+    """
+    (defaults, instances) from a batch file: either a list of instances or {"defaults": {...}, "instances": [...]}.
+    Instances are mmdc.json-style dicts plus an optional "name".
+    """
+    with open(batch_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"instances": data}
+    instances = data.get("instances")
+    if not isinstance(instances, list) or not all(isinstance(inst, dict) for inst in instances):
+        raise ValueError("a batch file needs a list of instance objects")
+    return data.get("defaults") or {}, instances
+
+def run_batch(instances: List[dict],
+              defaults: Optional[dict] = None,
+              summary_dir: str = ".",
+              jar_store_path: Optional[str] = None,
+              instance_workers: int = 2,
+              log: Callable[[str], None] = print,
+              warn: Callable[[str], None] = warn_to_stderr) -> dict:
+    """
+    Scans several modpack instances in one go. Each instance is a settings dict layered over `defaults`.
+    Every jar of every instance is hashed first and each distinct content is parsed once into a shared JarStore
+    (persisted to `jar_store_path`); then `instance_workers` instances run at a time, each writing its own reports.
+    "nested_jar_depth" is a batch-wide setting, taken from `defaults`.
+    Writes <summary_dir>/BATCH_summary.txt and returns {"instances", "jars", "unique_jars", "parsed_jars", "summary"},
+    where "instances" holds {"name", "opts" (ScanOptions), "error", "result", "jars", "shared_jars", "seconds"} per instance.
+    """
+    batch_opts = ScanOptions.from_dict(defaults or {})
+    depth = batch_opts.nested_jar_depth
+    rows = []
+    for i, inst in enumerate(instances):
+        settings = batch_opts.to_dict()
+        settings.update(inst)
+        name = str(settings.pop("name", "") or f"instance{i + 1}")
+        opts = ScanOptions.from_dict(settings)
+        if opts.nested_jar_depth != depth:
+            log(f"[{name}] nested_jar_depth is batch-wide, using {depth}.")
+            opts = opts.replace(nested_jar_depth=depth)
+        err = validate_scan_options(opts)
+        rows.append({"name": name, "opts": opts, "error": err.replace("\n", " ") if err else None, "result": None,
+                     "jars": 0, "shared_jars": 0, "seconds": 0.0})
+    runnable = [row for row in rows if row["error"] is None]
+    for row in rows:
+        if row["error"] is not None:
+            log(f"[{row['name']}] skipped: {row['error']}")
+
+    # translations fall back to en_us, so it is always parsed
+    locales: Optional[Set[str]] = {DEFAULT_LOCALE}
+    jar_paths: List[str] = []
+    jars_by_row = []
+    for row in runnable:
+        wanted = parse_locale_list(row["opts"].locales)
+        locales = None if wanted is None or locales is None else locales | set(wanted)
+        row_jars = [os.path.abspath(p) for p in list_mod_jars(row["opts"].mods_folder)]
+        jars_by_row.append(row_jars)
+        jar_paths.extend(row_jars)
+    jar_paths = list(dict.fromkeys(jar_paths))
+    store = JarStore(jar_store_path, nested_depth=depth)
+    started = time.perf_counter()
+    workers = batch_opts.lang_workers
+    hashes, parsed = store.prefill(jar_paths, workers, locales)
+    unique = len(set(hashes.values()))
+    log(f"{len(jar_paths)} jars in {len(runnable)} instances, {unique} distinct; parsed {parsed}, "
+        f"reused {unique - parsed} from the jar store ({time.perf_counter() - started:.2f}s).")
+
+    instances_with: Dict[str, Set[int]] = {}
+    for i, row_jars in enumerate(jars_by_row):
+        for p in row_jars:
+            if p in hashes:
+                instances_with.setdefault(hashes[p], set()).add(i)
+    for row, row_jars in zip(runnable, jars_by_row):
+        row["jars"] = len(row_jars)
+        row["shared_jars"] = sum(1 for p in row_jars if p in hashes and len(instances_with[hashes[p]]) > 1)
+
+    def scan(row: dict):
+        name = row["name"]
+        scan_started = time.perf_counter()
+        try:
+            row["result"] = run_scan(row["opts"], log=lambda line: log(f"[{name}] {line}"), jar_store=store,
+                                     warn=lambda line: warn(f"[{name}] {line}"))
+        except Exception as ex:
+            row["error"] = f"{type(ex).__name__}: {ex}"
+            log(f"[{name}] failed: {row['error']}")
+        row["seconds"] = time.perf_counter() - scan_started
+
+    if runnable:
+        with ThreadPoolExecutor(max_workers=min(max(1, instance_workers), len(runnable))) as pool:
+            for future in [pool.submit(scan, row) for row in runnable]:
+                future.result()
+    if not store.save():
+        log(f"Warning: could not save the jar store {jar_store_path}.")
+    summary = write_batch_summary(summary_dir, rows, len(jar_paths), unique, parsed)
+    log(f"Batch summary written to {summary}")
+    return {"instances": rows, "jars": len(jar_paths), "unique_jars": unique, "parsed_jars": parsed, "summary": summary}
+
+def write_batch_summary(output_dir: str, rows: List[dict], jars: int, unique_jars: int, parsed_jars: int) -> str:
+    """
+    BATCH_summary.txt: one line per instance, then the cross-mod AFTER RP duplicate names found in several instances.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    seen_in: Dict[str, List[str]] = {}
+    for row in rows:
+        result = row["result"]
+        if result is None:
+            continue
+        for kind_result in result["kinds"].values():
+            where = kind_result["kind"] if kind_result["locale"] == DEFAULT_LOCALE else f"{kind_result['locale']}/{kind_result['kind']}"
+            for name in kind_result.get("after_cross_mod_names", ()):
+                label = f"{where}: {name}"
+                seen_in.setdefault(label, []).append(row["name"])
+    shared = sorted(((label, names) for label, names in seen_in.items() if len(names) > 1),
+                    key=lambda item: (-len(item[1]), item[0].lower()))
+
+    summary_file = os.path.join(output_dir, BATCH_SUMMARY_NAME)
+    with open(summary_file, "w", encoding="utf-8") as f:
+        f.write(f"# Batch summary | {time.strftime('%Y-%m-%d %H:%M:%S')} | {len(rows)} instances\n")
+        f.write(f"# Jars: {jars} | Distinct contents: {unique_jars} | Parsed this run: {parsed_jars}\n\n")
+        f.write("## Instances\n\n")
+        for row in rows:
+            result = row["result"]
+            if row["error"] is not None:
+                f.write(f"- {row['name']}: ERROR {row['error']}\n")
+            elif result is None or not result["reports"]:
+                f.write(f"- {row['name']}: no IDs found\n")
+            else:
+                f.write(f"- {row['name']}: {result['ids']} IDs | cross-mod groups before RP {result['before_cross_mod']}, "
+                        f"after RP {result['after_cross_mod']} | {row['jars']} jars ({row['shared_jars']} shared) | "
+                        f"{row['seconds']:.2f}s | {row['opts'].output_folder}\n")
+        f.write(f"\n## Cross-mod duplicates AFTER RP in several instances ({len(shared)})\n\n")
+        for label, names in shared:
+            f.write(f"{label}  [{len(names)}: {', '.join(names)}]\n")
+    return summary_file
@@ -0,0 +1,142 @@
+import os
+import re
+import sys
+import threading
+from typing import Iterable, Dict, Optional
+
+APP_NAME = "StarTools - Minecraft Modding Duplicate Checker"
+CONFIG_NAME = "mmdc.json"
+LANG_CACHE_NAME = "mmdc_langcache.json"
+LANG_CACHE_VERSION = 4
+JAR_STORE_NAME = "mmdc_jarstore.json"
+JAR_STORE_VERSION = 1
+BATCH_SUMMARY_NAME = "BATCH_summary.txt"
+REPORT_BUFFER_SIZE = 1 << 20
+RESULTS_DB_NAME = "mmdc_results.sqlite"
+RUN_METRICS_NAME = "run_metrics.json"
+RUN_METRICS_VERSION = 2
+RUN_PROFILE_NAME = "run_profile.pstats"
+SNAPSHOT_NAME = "mmdc_snapshot.json"
+SNAPSHOT_VERSION = 2
+# below this many uncached jars, starting worker processes costs more than it saves
+PARALLEL_MIN_JARS = 8
+# jar-in-jar levels read_jar_langs follows (0 = top-level entries only); bundled jars are read from memory
+NESTED_JAR_DEPTH = 2
+NESTED_JAR_FOLDERS = ("META-INF/jars/", "META-INF/jarjar/")
+# seconds between two looks at the RP in watch mode
+WATCH_INTERVAL = 0.25
+# where the serve command listens by default (local only)
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8765
+# bounds of the Dump Root discovery (folders deep, folders listed, files counted per folder)
+DISCOVERY_MAX_DEPTH = 4
+DISCOVERY_MAX_CANDIDATES = 200
+DISCOVERY_COUNT_LIMIT = 100000
+# dump files from this size on are streamed instead of json.load()ed, STREAM_CHUNK_SIZE characters at a time
+STREAM_MIN_BYTES = 4 << 20
+STREAM_CHUNK_SIZE = 1 << 16
+# distinct display strings a NameNormalizer remembers
+NORMALIZE_CACHE_SIZE = 1 << 18
+# similarity a near-duplicate pair needs by default
+NEAR_DUPE_DEFAULT_THRESHOLD = 0.85
+
+##############################
+# Utility / Core logic
+##############################
+
+def prettify_from_id(item_id: str) -> str:
+    if not isinstance(item_id, str):
+        return "Unknown"
+    s = item_id.split(":", 1)[1] if ":" in item_id else item_id
+    s = s.strip().replace("/", "_")
+    parts = re.split(r"[_\-\.]+", s)
+    parts = [p for p in parts if p]
+    return " ".join(w.capitalize() for w in parts) if parts else s.capitalize()
+
+def infer_kind_from_path(path_str: str) -> str:
+    """
+    The KINDS entry a registry folder (or dump file) path names, or UNKNOWN_KIND for registries MMDC
+    has no lang keys for (fluids, enchantments, effects, sound_events, ...); those are never taken as items.
+    """
+    p = path_str.lower().replace("\\", "/")
+    if "block" in p:
+        return "block"
+    # "mob" only as a whole word, so mob_effect/ stays unknown
+    if "entity" in p or "entities" in p or re.search(r"\bmobs?\b", p):
+        return "entity"
+    if "biome" in p:
+        return "biome"
+    if "worldgen" in p or "structure" in p or "feature" in p:
+        return "worldgen"
+    if "item" in p:
+        return "item"
+    return UNKNOWN_KIND
+
+def registry_folder_kind(path_str: str) -> str:
+    """
+    The kind of a registry folder the user picked: infer_kind_from_path, with any name it can't place
+    ("registry", "minecraft", ...) scanned as items like always. Only dump-root discovery skips unknown kinds.
+    """
+    kind = infer_kind_from_path(path_str)
+    return "item" if kind == UNKNOWN_KIND else kind
+
+# the game falls back to this locale for keys a translation doesn't have
+DEFAULT_LOCALE = "en_us"
+KINDS = ("item", "block", "entity", "biome", "worldgen")
+# what infer_kind_from_path returns for a registry outside KINDS
+UNKNOWN_KIND = "unknown"
+# top-level folders of a Registry Dump export
+REGISTRY_DUMP_FOLDERS = {"items", "blocks", "entities", "biomes", "worldgen", "fluids", "enchantments", "effects"}
+
+def lang_key_for(kind: str, modid: str, path: str) -> str:
+    if kind == "block":
+        return f"block.{modid}.{path}"
+    if kind == "entity":
+        return f"entity.{modid}.{path}"
+    if kind == "biome":
+        return f"biome.{modid}.{path}"
+    if kind == "worldgen":
+        return f"worldgen.{modid}.{path}"
+    return f"item.{modid}.{path}"
+
+# keys whose string value is taken as a registry ID
+DUMP_ID_KEYS = ("id", "identifier", "registry_name", "registryName")
+
+def extract_ids_from_json(obj) -> Iterable[str]:
+    if isinstance(obj, list):
+        for v in obj:
+            if isinstance(v, str):
+                yield v
+            elif isinstance(v, dict):
+                for k in DUMP_ID_KEYS:
+                    if k in v and isinstance(v[k], str):
+                        yield v[k]
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            if isinstance(v, list):
+                for x in extract_ids_from_json(v):
+                    yield x
+        for k in DUMP_ID_KEYS:
+            if k in obj and isinstance(obj[k], str):
+                yield obj[k]
+
+def count_stat(stats: Optional[Dict[str, float]], key: str, n: float = 1):
+    """
+    Adds n to stats[key]; the stats dict is optional everywhere, so this is a no-op without one.
+    """
+    if stats is not None:
+        stats[key] = stats.get(key, 0) + n
+
+def warn_to_stderr(line: str):
+    """
+    Default sink for warnings a run must not swallow (check_missing_lang): stderr, whatever the run's log
+    is, so a quiet CLI run still shows them.
+    """
+    print(line, file=sys.stderr)
+
+def temp_path_for(path: str) -> str:
+    """
+    Temp file next to `path` to write it through (then os.replace). The name is unique to this process
+    and thread, so two runs saving the same cache at once can't write into each other's temp file.
+    """
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
@@ -0,0 +1,29 @@
+import os
+import json
+
+from .common import CONFIG_NAME
+
+##############################
+# Config IO
+##############################
+
+def load_config(script_dir: str) -> dict:
+    return load_config_file(os.path.join(script_dir, CONFIG_NAME))
+
+def load_config_file(cfg_path: str) -> dict:
+    if os.path.isfile(cfg_path):
+        try:
+            with open(cfg_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+def save_config(script_dir: str, data: dict) -> bool:
+    cfg_path = os.path.join(script_dir, CONFIG_NAME)
+    try:
+        with open(cfg_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        return True
+    except Exception:
+        return False
@@ -0,0 +1,213 @@
+import os
+import json
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Dict, Tuple, List, Optional, Set, Callable
+
+from .common import NESTED_JAR_DEPTH, SNAPSHOT_NAME, SNAPSHOT_VERSION, lang_key_for, temp_path_for
+from .registry import NameTable, RegistryStore
+from .langs import jar_fingerprint, list_mod_jars, namespaces_of, read_jar_langs
+from .names import NameNormalizer, compute_display_names, name_normalizer
+from .options import ScanOptions, parse_locale_list, parse_mod_list
+
+##############################
+# Incremental snapshots
+##############################
+
+def snapshot_settings(opts: ScanOptions, scanned: str) -> dict:
+    """
+    Settings a snapshot is only valid for; anything else changing is picked up as a delta.
+    """
+    return {
+        "scanned": os.path.abspath(scanned),
+        "scan_all_kinds": opts.scan_all_kinds,
+        "case_insensitive": opts.case_insensitive,
+        "underscores_as_spaces": opts.underscores_as_spaces,
+        "normalize": opts.normalizer().label,
+        "exclude_mods": sorted(parse_mod_list(opts.exclude_mods)),
+        "locales": parse_locale_list(opts.locales) or "all",
+        "nested_jar_depth": opts.nested_jar_depth,
+    }
+
+def load_snapshot(output_dir: str) -> Optional[dict]:
+    snap_path = os.path.join(output_dir, SNAPSHOT_NAME)
+    if not os.path.isfile(snap_path):
+        return None
+    try:
+        with open(snap_path, "r", encoding="utf-8") as f:
+            snap = json.load(f)
+    except Exception:
+        return None
+    return snap if snap.get("version") == SNAPSHOT_VERSION else None
+
+def save_snapshot(output_dir: str, snap: dict) -> bool:
+    snap_path = os.path.join(output_dir, SNAPSHOT_NAME)
+    tmp_path = temp_path_for(snap_path)
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(snap, version=SNAPSHOT_VERSION), f, separators=(",", ":"))
+        os.replace(tmp_path, snap_path)
+        return True
+    except Exception:
+        return False
+
+def jar_lang_namespaces(jar_path: str, nested_depth: int = NESTED_JAR_DEPTH) -> List[str]:
+    """
+    Namespaces a jar (and the jars bundled in it) ships lang files for (any locale), from central directories only.
+    """
+    try:
+        return namespaces_of(read_jar_langs(jar_path, namespaces=set(), nested_depth=nested_depth)[1])
+    except Exception:
+        return []
+
+def diff_mod_jars(prev_jars: Dict[str, list],
+                  mods_folder: str,
+                  nested_depth: int = NESTED_JAR_DEPTH) -> Tuple[Dict[str, list], Set[str], int]:
+    """
+    Compares the mods folder with a snapshot's jar table ({abs path: [size, mtime_ns, namespaces]}).
+    Returns (current jar table, modids whose lang sources changed, number of added/removed/changed jars).
+    """
+    jars: Dict[str, list] = {}
+    affected: Set[str] = set()
+    changed = 0
+    for jar_path in list_mod_jars(mods_folder):
+        key = os.path.abspath(jar_path)
+        try:
+            size, mtime_ns = jar_fingerprint(jar_path)
+        except OSError:
+            continue
+        old = prev_jars.get(key)
+        if old is not None and old[0] == size and old[1] == mtime_ns:
+            jars[key] = old
+            continue
+        namespaces = jar_lang_namespaces(jar_path, nested_depth)
+        jars[key] = [size, mtime_ns, namespaces]
+        affected.update(namespaces)
+        if old is not None:
+            affected.update(old[2])
+        changed += 1
+    for key, old in prev_jars.items():
+        if key not in jars:
+            affected.update(old[2])
+            changed += 1
+    return jars, affected, changed
+
+def resolve_names_incremental(kind: str,
+                              store: RegistryStore,
+                              prev_names: Dict[str, list],
+                              mod_langs: Dict[str, Dict[str, str]],
+                              rp_overrides: Dict[str, str],
+                              affected_mods: Set[str],
+                              changed_rp_keys: Set[str],
+                              fallback_langs: Optional[Dict[str, Dict[str, str]]] = None,
+                              fallback_overrides: Optional[Dict[str, str]] = None,
+                              stats: Optional[Dict[str, float]] = None,
+                              warn_missing: Optional[Callable[[str], None]] = None) -> Tuple[NameTable, NameTable, Set[str]]:
+    """
+    Like compute_display_names, but IDs whose mod langs and RP key are unchanged keep their snapshot names.
+    mod_langs only needs the affected mods and the new IDs (and, for a translation, the IDs whose RP key changed:
+    whether the RP override applies there depends on the mod's own translation).
+    Returns (before_names, after_names, touched_ids), touched including removed IDs.
+    """
+    recompute: List[int] = []
+    reuse: List[Tuple[int, list, bool]] = []
+    touched: Set[str] = set()
+    for r, item_id, modid, path in store.rows():
+        old = prev_names.get(item_id)
+        if old is None or modid in affected_mods:
+            recompute.append(r)
+            touched.add(item_id)
+        else:
+            rp_changed = lang_key_for(kind, modid, path) in changed_rp_keys
+            if rp_changed and fallback_langs is not None:
+                recompute.append(r)
+            else:
+                reuse.append((r, old, rp_changed))
+            if rp_changed:
+                touched.add(item_id)
+    before, after = compute_display_names(kind, store, mod_langs, rp_overrides, rows=recompute,
+                                          fallback_langs=fallback_langs, fallback_overrides=fallback_overrides,
+                                          stats=stats, warn_missing=warn_missing)
+    for r, old, rp_changed in reuse:
+        before.names[r] = old[0]
+        if rp_changed:
+            after.names[r] = rp_overrides.get(lang_key_for(kind, store.modid(r), store.path(r)), old[0])
+        else:
+            after.names[r] = old[1]
+    touched.update(i for i in prev_names if i not in store)
+    return before, after, touched
+
+def update_dupe_groups(prev_groups: Dict[str, List[str]],
+                       names: Mapping,
+                       prev_names: Dict[str, str],
+                       touched_ids: Set[str],
+                       case_insensitive: bool,
+                       treat_underscores_as_spaces: bool,
+                       normalizer: Optional[NameNormalizer] = None) -> Dict[str, List[str]]:
+    """
+    group_dupes_by_name(names) given the previous groups: only groups whose normalized name
+    gained or lost a touched ID are rebuilt, every other group is carried over as is.
+    prev_names only needs the touched IDs.
+    """
+    normalize = (normalizer or name_normalizer(case_insensitive, treat_underscores_as_spaces)).normalize
+    touched_norms = set()
+    for item_id in touched_ids:
+        if item_id in prev_names:
+            touched_norms.add(normalize(prev_names[item_id]))
+        if item_id in names:
+            touched_norms.add(normalize(names[item_id]))
+    groups = {n: ids for n, ids in prev_groups.items() if n not in touched_norms}
+    if not touched_norms:
+        return groups
+    members = defaultdict(list)
+    for item_id, nm in names.items():
+        k = normalize(nm)
+        if k in touched_norms:
+            members[k].append(item_id)
+    groups.update((n, lst) for n, lst in members.items() if len(lst) >= 2)
+    return groups
+
+def write_delta_report(output_dir: str,
+                       kind: str,
+                       prev_dupes: Dict[str, List[str]],
+                       after_dupes: Dict[str, List[str]],
+                       after_names: Mapping,
+                       prev_time: str) -> str:
+    """
+    Cross-mod AFTER RP duplicate groups that appeared, disappeared or changed members since the snapshot.
+    """
+    def cross_mod(groups):
+        return {n: set(ids) for n, ids in groups.items() if len({i.split(":", 1)[0] for i in ids}) >= 2}
+
+    old = cross_mod(prev_dupes)
+    new = cross_mod(after_dupes)
+    added = sorted((n for n in new if n not in old), key=lambda s: s.lower())
+    resolved = sorted((n for n in old if n not in new), key=lambda s: s.lower())
+    changed = sorted((n for n in new if n in old and new[n] != old[n]), key=lambda s: s.lower())
+
+    delta_file = os.path.join(output_dir, "DELTA_since_last_run.txt")
+    with open(delta_file, "w", encoding="utf-8") as f:
+        f.write(f"# Duplicate changes AFTER RP since the previous run ({prev_time}) | kind={kind}\n")
+        f.write(f"# New groups: {len(added)} | Resolved groups: {len(resolved)} | Changed groups: {len(changed)}\n\n")
+        f.write("## New duplicates\n\n")
+        for norm_name in added:
+            f.write(f"{norm_name}\n")
+            for item_id in sorted(new[norm_name]):
+                f.write(f"  - {item_id}  -> \"{after_names.get(item_id, '')}\"\n")
+            f.write("\n")
+        f.write("## Resolved duplicates\n\n")
+        for norm_name in resolved:
+            f.write(f"{norm_name}\n")
+            for item_id in sorted(old[norm_name]):
+                now = after_names.get(item_id)
+                f.write(f"  - {item_id}  -> \"{now}\"\n" if now is not None else f"  - {item_id}  (removed)\n")
+            f.write("\n")
+        f.write("## Changed groups\n\n")
+        for norm_name in changed:
+            f.write(f"{norm_name}\n")
+            for item_id in sorted(new[norm_name] - old[norm_name]):
+                f.write(f"  + {item_id}\n")
+            for item_id in sorted(old[norm_name] - new[norm_name]):
+                f.write(f"  - {item_id}\n")
+            f.write("\n")
+    return delta_file
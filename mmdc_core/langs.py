@@ -0,0 +1,658 @@
+import os
+import json
+import time
+import hashlib
+import io
+import zipfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Dict, Tuple, List, Optional, Set, Callable
+
+from .common import (
+    DEFAULT_LOCALE,
+    JAR_STORE_VERSION,
+    LANG_CACHE_VERSION,
+    NESTED_JAR_DEPTH,
+    NESTED_JAR_FOLDERS,
+    PARALLEL_MIN_JARS,
+    count_stat,
+    lang_key_for,
+    temp_path_for,
+)
+from .registry import RegistryStore
+
+##############################
+# Mod and RP langs
+##############################
+
+def jar_fingerprint(jar_path: str) -> Tuple[int, int]:
+    """
+    (size, mtime_ns) of a jar; cheap enough to check on every run.
+    """
+    st = os.stat(jar_path)
+    return st.st_size, st.st_mtime_ns
+
+def file_sha1(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def lang_file_locale(name: str) -> Optional[str]:
+    """
+    "assets/<modid>/lang/zh_cn.json" -> "zh_cn"; None if the path is not a lang file.
+    """
+    head, _, fn = name.rpartition("/")
+    if not head.endswith("lang") or not fn.endswith(".json") or len(fn) <= 5:
+        return None
+    return fn[:-5]
+
+def read_jar_langs(jar_path: str,
+                   namespaces: Optional[Set[str]] = None,
+                   locales: Optional[Set[str]] = None,
+                   stats: Optional[Dict[str, float]] = None,
+                   nested_depth: int = NESTED_JAR_DEPTH) -> Tuple[Dict[str, Dict[str, Dict[str, str]]], Dict[str, List[str]]]:
+    """
+    Returns (langs, present) for a single jar/zip, from one pass over its central directory:
+    langs is locale -> modid -> { lang_key: text }, limited to `namespaces` and `locales` when given;
+    present is locale -> every namespace that ships a lang file for it, parsed or not.
+    Jars bundled under META-INF/jars/ or META-INF/jarjar/ are opened from memory and read the same way,
+    up to `nested_depth` levels deep; keys the outer jar defines itself win over bundled ones.
+    With `stats`, counts jars_opened, nested_jars_opened, zip_entries, lang_files_parsed, lang_bytes_decompressed
+    and the seconds spent inflating (zip_inflate_seconds) and parsing (json_parse_seconds).
+    """
+    langs: Dict[str, Dict[str, Dict[str, str]]] = {}
+    present: Dict[str, List[str]] = {}
+    with zipfile.ZipFile(jar_path, "r") as zf:
+        count_stat(stats, "jars_opened")
+        _read_zip_langs(zf, langs, present, namespaces, locales, stats, nested_depth)
+    return langs, present
+
+def _read_zip_langs(zf: zipfile.ZipFile,
+                    langs: Dict[str, Dict[str, Dict[str, str]]],
+                    present: Dict[str, List[str]],
+                    namespaces: Optional[Set[str]],
+                    locales: Optional[Set[str]],
+                    stats: Optional[Dict[str, float]],
+                    nested_depth: int):
+    # read_jar_langs body, for the outer jar and every bundled one alike
+    names = zf.namelist()
+    count_stat(stats, "zip_entries", len(names))
+    nested: List[str] = []
+    for name in names:
+        if nested_depth > 0 and name.startswith(NESTED_JAR_FOLDERS) and name.endswith(".jar"):
+            nested.append(name)
+            continue
+        locale = lang_file_locale(name)
+        if locale is None:
+            continue
+        parts = name.split("/")
+        if len(parts) < 4 or parts[0] != "assets":
+            continue
+        modid = parts[1]
+        shipped = present.setdefault(locale, [])
+        if modid not in shipped:
+            shipped.append(modid)
+        if locales is not None and locale not in locales:
+            continue
+        if namespaces is not None and modid not in namespaces:
+            continue
+        # an unparseable file still counts as read, so the cache doesn't retry it forever
+        table = langs.setdefault(locale, {}).setdefault(modid, {})
+        try:
+            if stats is None:
+                with zf.open(name) as f:
+                    lang = json.load(f)
+            else:
+                started = time.perf_counter()
+                with zf.open(name) as f:
+                    raw = f.read()
+                parsing = time.perf_counter()
+                lang = json.loads(raw)
+                count_stat(stats, "zip_inflate_seconds", parsing - started)
+                count_stat(stats, "json_parse_seconds", time.perf_counter() - parsing)
+                count_stat(stats, "lang_files_parsed")
+                count_stat(stats, "lang_bytes_decompressed", len(raw))
+            table.update(lang)
+        except Exception:
+            continue
+    for name in nested:
+        inner_langs: Dict[str, Dict[str, Dict[str, str]]] = {}
+        inner_present: Dict[str, List[str]] = {}
+        try:
+            # ZipFile needs to seek, which a compressed member can't do cheaply: inflate it into a buffer
+            with zipfile.ZipFile(io.BytesIO(zf.read(name)), "r") as inner:
+                count_stat(stats, "nested_jars_opened")
+                _read_zip_langs(inner, inner_langs, inner_present, namespaces, locales, stats, nested_depth - 1)
+        except Exception:
+            count_stat(stats, "nested_jars_failed")
+            continue
+        for locale, modids in inner_present.items():
+            shipped = present.setdefault(locale, [])
+            shipped.extend(m for m in modids if m not in shipped)
+        for locale, tables in inner_langs.items():
+            for modid, lang in tables.items():
+                table = langs.setdefault(locale, {}).setdefault(modid, {})
+                for key, text in lang.items():
+                    table.setdefault(key, text)
+
+def lang_entry_covers(entry: dict, namespaces: Optional[Set[str]], locales: Optional[Set[str]]) -> bool:
+    """
+    Whether a cached {"namespaces", "langs"} entry holds every wanted locale/namespace its jar ships.
+    """
+    shipped = entry["namespaces"]
+    wanted_locales = shipped if locales is None else [l for l in locales if l in shipped]
+    return all(m in entry["langs"].get(l, {})
+               for l in wanted_locales
+               for m in shipped[l] if namespaces is None or m in namespaces)
+
+class LangCache:
+    """
+    On-disk cache of parsed jar lang tables.
+    Entries are keyed by absolute jar path and checked against (size, mtime) and the nested jar depth
+    they were read with; with use_hash, a fingerprint mismatch falls back to comparing SHA-1 of the content.
+    An entry may hold only some of a jar's locales and namespaces (targeted loads); it grows as more are requested.
+    """
+    def __init__(self, cache_path: str, use_hash: bool = False, nested_depth: int = NESTED_JAR_DEPTH):
+        self.cache_path = cache_path
+        self.use_hash = use_hash
+        self.nested_depth = nested_depth
+        self.jars: Dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.dirty = False
+        if os.path.isfile(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == LANG_CACHE_VERSION:
+                    self.jars = data.get("jars", {})
+            except Exception:
+                self.jars = {}
+
+    def _valid_entry(self, jar_path: str) -> Optional[dict]:
+        key = os.path.abspath(jar_path)
+        entry = self.jars.get(key)
+        if entry is None:
+            return None
+        size, mtime_ns = jar_fingerprint(jar_path)
+        # an entry read with another nested jar depth may lack bundled langs, or hold ones no longer wanted
+        if entry.get("nested_depth") == self.nested_depth:
+            if entry.get("size") == size and entry.get("mtime_ns") == mtime_ns:
+                return entry
+            if self.use_hash and entry.get("sha1") and entry.get("size") == size:
+                # touched/copied but identical content: refresh the fingerprint and reuse
+                if file_sha1(jar_path) == entry["sha1"]:
+                    entry["mtime_ns"] = mtime_ns
+                    self.dirty = True
+                    return entry
+        # stale: drop it now, put() will store the fresh parse
+        del self.jars[key]
+        self.evicted += 1
+        self.dirty = True
+        return None
+
+    def get(self,
+            jar_path: str,
+            namespaces: Optional[Set[str]] = None,
+            locales: Optional[Set[str]] = None) -> Optional[Dict[str, Dict[str, Dict[str, str]]]]:
+        """
+        Cached langs (locale -> modid -> table) for the jar if it is unchanged and every wanted
+        locale/namespace it ships was parsed before. The result may hold more than was asked for.
+        """
+        entry = self._valid_entry(jar_path)
+        if entry is not None and lang_entry_covers(entry, namespaces, locales):
+            self.hits += 1
+            return entry["langs"]
+        self.misses += 1
+        return None
+
+    def present_namespaces(self, jar_path: str) -> Optional[Dict[str, List[str]]]:
+        """
+        locale -> namespaces the jar ships lang files for, as recorded by the last put().
+        """
+        entry = self.jars.get(os.path.abspath(jar_path))
+        return entry["namespaces"] if entry is not None else None
+
+    def put(self, jar_path: str, langs: Dict[str, Dict[str, Dict[str, str]]], present: Dict[str, List[str]]):
+        key = os.path.abspath(jar_path)
+        entry = self.jars.get(key)
+        if entry is not None:
+            # same fingerprint (get() already evicted stale ones): add the newly parsed locales/namespaces
+            for locale, tables in langs.items():
+                entry["langs"].setdefault(locale, {}).update(tables)
+            entry["namespaces"] = present
+        else:
+            size, mtime_ns = jar_fingerprint(jar_path)
+            entry = {"size": size, "mtime_ns": mtime_ns, "nested_depth": self.nested_depth,
+                     "namespaces": present, "langs": langs}
+            if self.use_hash:
+                entry["sha1"] = file_sha1(jar_path)
+            self.jars[key] = entry
+        self.dirty = True
+
+    def evict_missing(self):
+        for key in [k for k in self.jars if not os.path.isfile(k)]:
+            del self.jars[key]
+            self.evicted += 1
+            self.dirty = True
+
+    def save(self) -> bool:
+        self.evict_missing()
+        if not self.dirty:
+            return True
+        tmp_path = temp_path_for(self.cache_path)
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": LANG_CACHE_VERSION, "jars": self.jars}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+            return True
+        except Exception:
+            return False
+
+class JarStore:
+    """
+    Parsed jar lang tables keyed by content (SHA-1), shared by the instances of a batch run:
+    a jar found in several mods folders is parsed once. Paths map to hashes through (size, mtime),
+    so unchanged jars are not re-hashed either. Persists to `store_path` when given.
+    Runs use it through view(), which looks like a LangCache to load_mod_langs.
+    """
+    def __init__(self, store_path: Optional[str] = None, nested_depth: int = NESTED_JAR_DEPTH):
+        self.store_path = store_path
+        self.nested_depth = nested_depth
+        self.jars: Dict[str, dict] = {}
+        self.paths: Dict[str, list] = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        if store_path and os.path.isfile(store_path):
+            try:
+                with open(store_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == JAR_STORE_VERSION and data.get("nested_depth") == nested_depth:
+                    self.jars = data.get("jars", {})
+                    self.paths = data.get("paths", {})
+            except Exception:
+                self.jars, self.paths = {}, {}
+
+    def jar_hash(self, jar_path: str) -> str:
+        key = os.path.abspath(jar_path)
+        size, mtime_ns = jar_fingerprint(jar_path)
+        known = self.paths.get(key)
+        if known is not None and known[0] == size and known[1] == mtime_ns:
+            return known[2]
+        sha1 = file_sha1(jar_path)
+        with self.lock:
+            self.paths[key] = [size, mtime_ns, sha1]
+            self.dirty = True
+        return sha1
+
+    def get(self,
+            jar_path: str,
+            namespaces: Optional[Set[str]] = None,
+            locales: Optional[Set[str]] = None) -> Optional[Dict[str, Dict[str, Dict[str, str]]]]:
+        entry = self.jars.get(self.jar_hash(jar_path))
+        if entry is not None and lang_entry_covers(entry, namespaces, locales):
+            return entry["langs"]
+        return None
+
+    def present_namespaces(self, jar_path: str) -> Optional[Dict[str, List[str]]]:
+        entry = self.jars.get(self.jar_hash(jar_path))
+        return entry["namespaces"] if entry is not None else None
+
+    def put(self, jar_path: str, langs: Dict[str, Dict[str, Dict[str, str]]], present: Dict[str, List[str]]):
+        sha1 = self.jar_hash(jar_path)
+        with self.lock:
+            entry = self.jars.get(sha1)
+            if entry is None:
+                self.jars[sha1] = {"namespaces": present, "langs": langs}
+            else:
+                for locale, tables in langs.items():
+                    entry["langs"].setdefault(locale, {}).update(tables)
+                entry["namespaces"] = present
+            self.dirty = True
+
+    def prefill(self,
+                jar_paths: List[str],
+                workers: int = 1,
+                locales: Optional[Set[str]] = None,
+                stats: Optional[Dict[str, float]] = None) -> Tuple[Dict[str, str], int]:
+        """
+        Hashes jar_paths and parses each content the store doesn't hold yet once, every namespace,
+        for `locales` (None = all), in a pool of `workers` processes.
+        Returns (abs jar path -> hash for the readable jars, number of contents parsed).
+        """
+        def hash_of(jar_path: str) -> Optional[str]:
+            try:
+                return self.jar_hash(jar_path)
+            except OSError:
+                return None
+
+        # hashlib releases the GIL on large buffers, so threads are enough here
+        with ThreadPoolExecutor(max_workers=min(8, resolve_worker_count(0))) as pool:
+            hashes = dict(zip((os.path.abspath(p) for p in jar_paths), pool.map(hash_of, jar_paths)))
+        todo: Dict[str, str] = {}
+        for jar_path, sha1 in hashes.items():
+            if sha1 is None or sha1 in todo:
+                continue
+            entry = self.jars.get(sha1)
+            if entry is None or not lang_entry_covers(entry, None, locales):
+                todo[sha1] = jar_path
+        paths = list(todo.values())
+        for jar_path, result in zip(paths, read_jars_parallel(paths, workers, None, None, locales, stats, self.nested_depth)):
+            if result is not None:
+                self.put(jar_path, *result)
+        return {p: h for p, h in hashes.items() if h is not None}, len(paths)
+
+    def view(self) -> "JarStoreView":
+        return JarStoreView(self)
+
+    def save(self) -> bool:
+        """
+        Writes the store, minus jars whose files are gone and contents no remaining path refers to.
+        """
+        for key in [k for k in self.paths if not os.path.isfile(k)]:
+            del self.paths[key]
+            self.dirty = True
+        used = {known[2] for known in self.paths.values()}
+        for sha1 in [h for h in self.jars if h not in used]:
+            del self.jars[sha1]
+            self.dirty = True
+        if not self.store_path or not self.dirty:
+            return True
+        tmp_path = temp_path_for(self.store_path)
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": JAR_STORE_VERSION, "nested_depth": self.nested_depth,
+                           "paths": self.paths, "jars": self.jars}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.store_path)
+            self.dirty = False
+            return True
+        except Exception:
+            return False
+
+class JarStoreView:
+    """
+    One run's LangCache-compatible front of a JarStore, with its own hit/miss counters.
+    save() is a no-op: the batch saves the store once, after every instance.
+    """
+    def __init__(self, store: JarStore):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get(self,
+            jar_path: str,
+            namespaces: Optional[Set[str]] = None,
+            locales: Optional[Set[str]] = None) -> Optional[Dict[str, Dict[str, Dict[str, str]]]]:
+        langs = self.store.get(jar_path, namespaces, locales)
+        if langs is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return langs
+
+    def present_namespaces(self, jar_path: str) -> Optional[Dict[str, List[str]]]:
+        return self.store.present_namespaces(jar_path)
+
+    def put(self, jar_path: str, langs: Dict[str, Dict[str, Dict[str, str]]], present: Dict[str, List[str]]):
+        self.store.put(jar_path, langs, present)
+
+    def save(self) -> bool:
+        return True
+
+def _read_jar_langs_safe(jar_path: str,
+                         namespaces: Optional[Set[str]] = None,
+                         locales: Optional[Set[str]] = None,
+                         nested_depth: int = NESTED_JAR_DEPTH):
+    # process pool entry point: a broken jar must not take the whole map() down.
+    # The jar's counters travel back with the result, since workers can't write to the caller's dict.
+    stats: Dict[str, float] = {}
+    try:
+        return read_jar_langs(jar_path, namespaces, locales, stats, nested_depth), stats
+    except Exception:
+        count_stat(stats, "jars_failed")
+        return None, stats
+
+def resolve_worker_count(workers: int) -> int:
+    """
+    0 (or less) means one worker per CPU.
+    """
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+def read_jars_parallel(jar_paths: List[str],
+                       workers: int,
+                       namespaces: Optional[Set[str]] = None,
+                       progress: Optional[Callable[[int], None]] = None,
+                       locales: Optional[Set[str]] = None,
+                       stats: Optional[Dict[str, float]] = None,
+                       nested_depth: int = NESTED_JAR_DEPTH) -> list:
+    """
+    read_jar_langs over jar_paths, results in the same order as jar_paths (None for unreadable jars).
+    Falls back to reading in-process if a pool can't be started.
+    progress(n) is called after each jar; an exception raised from it stops the reads.
+    With `stats`, the per-jar counters of every read are added to it.
+    """
+    results = []
+
+    def collect(outcome):
+        result, jar_stats = outcome
+        if stats is not None:
+            for key, n in jar_stats.items():
+                count_stat(stats, key, n)
+        results.append(result)
+
+    workers = min(resolve_worker_count(workers), len(jar_paths))
+    if workers > 1 and len(jar_paths) >= PARALLEL_MIN_JARS:
+        try:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError):
+            pool = None
+        if pool is not None:
+            try:
+                chunksize = max(1, len(jar_paths) // (workers * 4))
+                for outcome in pool.map(_read_jar_langs_safe, jar_paths, [namespaces] * len(jar_paths),
+                                        [locales] * len(jar_paths), [nested_depth] * len(jar_paths),
+                                        chunksize=chunksize):
+                    collect(outcome)
+                    if progress is not None:
+                        progress(len(results))
+                return results
+            except BrokenProcessPool:
+                pass
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+    for p in jar_paths[len(results):]:
+        collect(_read_jar_langs_safe(p, namespaces, locales, nested_depth))
+        if progress is not None:
+            progress(len(results))
+    return results
+
+def needed_lang_keys(kind: str, store: RegistryStore, rows: Optional[Iterable[int]] = None) -> Dict[str, Set[str]]:
+    """
+    modid -> { lang keys compute_display_names will look up for the store (or just `rows` of it) }
+    """
+    needed: Dict[str, Set[str]] = {}
+    for _, _, modid, path in store.rows(rows):
+        needed.setdefault(modid, set()).add(lang_key_for(kind, modid, path))
+    return needed
+
+def list_mod_jars(mods_folder: str) -> List[str]:
+    """
+    .jar/.zip files in the mods folder, in directory order (the order langs are merged in).
+    """
+    return [os.path.join(mods_folder, fn) for fn in os.listdir(mods_folder)
+            if fn.endswith(".jar") or fn.endswith(".zip")]
+
+def load_mod_langs(mods_folder: str,
+                   cache: Optional[LangCache] = None,
+                   workers: int = 1,
+                   needed: Optional[Dict[str, Set[str]]] = None,
+                   progress: Optional[Callable[[int, int], None]] = None,
+                   jar_namespaces: Optional[Dict[str, List[str]]] = None,
+                   locales: Optional[Iterable[str]] = (DEFAULT_LOCALE,),
+                   stats: Optional[Dict[str, float]] = None,
+                   nested_depth: int = NESTED_JAR_DEPTH) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """
+    locale -> modid -> { lang_key: text }, for `locales` (None = every locale the jars ship).
+    Each jar is opened once for all locales. Jars are merged in directory order;
+    with a cache, unchanged jars skip the zip entirely.
+    Cache misses are parsed by a pool of `workers` processes (1 = in-process, 0 = one per CPU).
+    With `needed` (see needed_lang_keys), only those namespaces are parsed and only those keys are kept.
+    progress(jars_done, jars_total) is called as jars are processed.
+    If given, jar_namespaces is filled with abs jar path -> namespaces that jar ships lang files for (any locale).
+    With `stats`, counts jars and jars_cached plus the read_jar_langs counters of the jars actually opened.
+    Jars bundled inside a jar are read up to `nested_depth` levels deep and merged into it (see read_jar_langs).
+    """
+    namespaces = set(needed) if needed is not None else None
+    locales = set(locales) if locales is not None else None
+    jar_paths = list_mod_jars(mods_folder)
+    per_jar: Dict[str, Optional[Dict[str, Dict[str, Dict[str, str]]]]] = {}
+    misses: List[str] = []
+    for jar_path in jar_paths:
+        try:
+            langs = cache.get(jar_path, namespaces, locales) if cache is not None else None
+        except Exception:
+            # a malformed cache entry (or a jar gone since the listing) is a miss: parse it, don't drop it
+            langs = None
+        if langs is None:
+            misses.append(jar_path)
+        else:
+            per_jar[jar_path] = langs
+            if jar_namespaces is not None:
+                jar_namespaces[os.path.abspath(jar_path)] = namespaces_of(cache.present_namespaces(jar_path) or {})
+    hits = len(jar_paths) - len(misses)
+    count_stat(stats, "jars", len(jar_paths))
+    count_stat(stats, "jars_cached", hits)
+    if progress is not None:
+        progress(hits, len(jar_paths))
+        on_jar = lambda n: progress(hits + n, len(jar_paths))
+    else:
+        on_jar = None
+    for jar_path, result in zip(misses, read_jars_parallel(misses, workers, namespaces, on_jar, locales, stats,
+                                                                  nested_depth)):
+        if result is None:
+            continue
+        langs, present = result
+        per_jar[jar_path] = langs
+        if jar_namespaces is not None:
+            jar_namespaces[os.path.abspath(jar_path)] = namespaces_of(present)
+        if cache is not None:
+            try:
+                cache.put(jar_path, langs, present)
+            except Exception:
+                pass
+
+    # merge in the main process, in directory order, exactly like a serial walk would
+    lang_sets: Dict[str, Dict[str, Dict[str, str]]] = {}
+    for jar_path in jar_paths:
+        langs = per_jar.get(jar_path)
+        if not langs:
+            continue
+        for locale, tables in langs.items():
+            if locales is not None and locale not in locales:
+                continue
+            mod_langs = lang_sets.setdefault(locale, {})
+            for modid, lang in tables.items():
+                if needed is None:
+                    mod_langs.setdefault(modid, {}).update(lang)
+                    continue
+                keys = needed.get(modid)
+                if not keys:
+                    continue
+                if len(keys) < len(lang):
+                    picked = {k: lang[k] for k in keys if k in lang}
+                else:
+                    picked = {k: v for k, v in lang.items() if k in keys}
+                mod_langs.setdefault(modid, {}).update(picked)
+    return lang_sets
+
+def namespaces_of(present: Dict[str, List[str]]) -> List[str]:
+    """
+    Every namespace in a locale -> namespaces table, sorted.
+    """
+    return sorted({m for shipped in present.values() for m in shipped})
+
+def load_resource_pack_langs(rp_path: str,
+                             locales: Optional[Iterable[str]] = (DEFAULT_LOCALE,),
+                             stats: Optional[Dict[str, float]] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Merge all assets/*/lang/<locale>.json files found in a resource pack folder or zip/jar.
+    Return locale -> { lang_key: string } (RP overrides) for `locales` (None = every locale in the pack).
+    With `stats`, counts rp_lang_files_parsed.
+    """
+    overrides: Dict[str, Dict[str, str]] = {}
+    if not rp_path or rp_path.lower() == "none":
+        return overrides
+    wanted = {l.lower() for l in locales} if locales is not None else None
+    if os.path.isdir(rp_path):
+        for root, _, files in os.walk(rp_path):
+            for fn in files:
+                locale = fn.lower()[:-5] if fn.lower().endswith(".json") else None
+                if not locale:
+                    continue
+                p = os.path.join(root, fn)
+                if wanted is None:
+                    # without an explicit list, only files in a lang/ folder count as lang files
+                    if os.path.basename(root).lower() != "lang":
+                        continue
+                elif locale not in wanted:
+                    continue
+                if "assets" not in p.replace("\\","/").lower():
+                    continue
+                try:
+                    with open(p, "r", encoding="utf-8") as f:
+                        lang = json.load(f)
+                    overrides.setdefault(locale, {}).update(lang)
+                    count_stat(stats, "rp_lang_files_parsed")
+                except Exception:
+                    pass
+    else:
+        try:
+            with zipfile.ZipFile(rp_path, "r") as zf:
+                for name in zf.namelist():
+                    locale = lang_file_locale(name)
+                    if locale is None or (wanted is not None and locale not in wanted):
+                        continue
+                    if "/assets/" in f"/{name}":
+                        try:
+                            with zf.open(name) as f:
+                                lang = json.load(f)
+                            overrides.setdefault(locale, {}).update(lang)
+                            count_stat(stats, "rp_lang_files_parsed")
+                        except Exception:
+                            continue
+        except Exception:
+            pass
+    return overrides
+
+def parse_rp_stack(text: str) -> List[str]:
+    """
+    "top.zip; base.zip" -> ["top.zip", "base.zip"]: an RP stack as listed in game, highest priority first.
+    """
+    return [p.strip() for p in (text or "").split(";") if p.strip()]
+
+def load_resource_pack_stack(rp_paths: List[str],
+                             locales: Optional[Iterable[str]] = (DEFAULT_LOCALE,),
+                             loaded: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None,
+                             stats: Optional[Dict[str, float]] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Overrides of a whole RP stack (highest priority first): packs are applied bottom to top, so a key
+    in a higher pack wins, as in game. `loaded` caches each pack's langs by path across several stacks.
+    """
+    merged: Dict[str, Dict[str, str]] = {}
+    for rp_path in reversed(rp_paths):
+        langs = loaded.get(rp_path) if loaded is not None else None
+        if langs is None:
+            langs = load_resource_pack_langs(rp_path, locales, stats)
+            if loaded is not None:
+                loaded[rp_path] = langs
+        for locale, overrides in langs.items():
+            merged.setdefault(locale, {}).update(overrides)
+    return merged
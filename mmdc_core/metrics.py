@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import platform
+import pstats
+from contextlib import contextmanager
+from typing import Dict, Tuple, List, Optional
+
+from .common import RUN_METRICS_NAME, RUN_METRICS_VERSION, RUN_PROFILE_NAME, count_stat
+
+##############################
+# Run metrics
+##############################
+
+def peak_memory_bytes(children: bool = False) -> Optional[int]:
+    """
+    Peak resident memory of this process (or, with children, of its largest finished worker process)
+    over its lifetime, or None where the platform doesn't tell.
+    """
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, kilobytes everywhere else
+        return peak if sys.platform == "darwin" else peak * 1024
+    if sys.platform == "win32" and not children:
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+            if ctypes.windll.psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.PeakWorkingSetSize
+        except Exception:
+            pass
+    return None
+
+class RunMetrics:
+    """
+    Wall and CPU time per pipeline stage plus counters for one run, saved as run_metrics.json.
+    A stage entered several times (once per kind/locale) accumulates. Wall time and the counters are the run's
+    own; CPU time and peak memory can only be read for the whole process, so they are named process_*:
+    they include runs sharing the process (GUI, batch instances, serve) and, for memory, earlier ones.
+    Jar parser workers show up in the counters (zip_inflate_seconds, json_parse_seconds) instead.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.stages: Dict[str, List[float]] = {}
+        self.counters: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, [0.0, 0.0, 0])
+            entry[0] += time.perf_counter() - wall
+            entry[1] += time.process_time() - cpu
+            entry[2] += 1
+
+    def count(self, key: str, n: float = 1):
+        count_stat(self.counters, key, n)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": RUN_METRICS_VERSION,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "process_cpu_seconds": round(time.process_time() - self.cpu_started, 6),
+            "process_peak_memory_bytes": peak_memory_bytes(),
+            "process_peak_worker_memory_bytes": peak_memory_bytes(children=True),
+            "stages": {name: {"wall_seconds": round(wall, 6), "process_cpu_seconds": round(cpu, 6), "calls": calls}
+                       for name, (wall, cpu, calls) in self.stages.items()},
+            "counters": {key: round(n, 6) if isinstance(n, float) else n for key, n in self.counters.items()},
+        }
+
+    def summary_lines(self, data: Optional[dict] = None) -> List[str]:
+        data = data or self.to_dict()
+        peak = data["process_peak_memory_bytes"]
+        lines = [f"Run metrics: {data['wall_seconds']:.2f}s wall, {data['process_cpu_seconds']:.2f}s process CPU"
+                 + (f", process peak memory {peak / (1 << 20):.0f} MB." if peak else ".")]
+        for name, st in data["stages"].items():
+            lines.append(f"  {name:<18} {st['wall_seconds']:>8.3f}s wall {st['process_cpu_seconds']:>8.3f}s process CPU")
+        counters = [f"{key}={n:.2f}" if isinstance(n, float) else f"{key}={n}" for key, n in data["counters"].items()]
+        if counters:
+            lines.append("  " + ", ".join(counters))
+        return lines
+
+    def save(self, output_dir: str, data: Optional[dict] = None) -> str:
+        path = os.path.join(output_dir, RUN_METRICS_NAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data or self.to_dict(), f, indent=2)
+        return path
+
+def write_profile(output_dir: str, profiler: cProfile.Profile, limit: int = 40) -> Tuple[str, str]:
+    """
+    Saves a run's profile as run_profile.pstats (for snakeviz & co) and the top `limit` functions
+    by cumulative time as run_profile.txt.
+    """
+    stats_path = os.path.join(output_dir, RUN_PROFILE_NAME)
+    text_path = os.path.splitext(stats_path)[0] + ".txt"
+    profiler.dump_stats(stats_path)
+    with open(text_path, "w", encoding="utf-8") as f:
+        pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(limit)
+    return stats_path, text_path
@@ -0,0 +1,211 @@
+import re
+import functools
+import unicodedata
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Iterable, Dict, Tuple, List, Optional, Set, Callable
+
+from .common import NORMALIZE_CACHE_SIZE, count_stat, lang_key_for, prettify_from_id
+from .registry import NameTable, RegistryStore
+
+##############################
+# Display names
+##############################
+
+# a formatting code is "§" plus one character (§l, §6, §r...); a lone trailing "§" goes too
+_FORMATTING_CODE = re.compile("\u00a7.?", re.DOTALL)
+
+def strip_formatting_codes(text: str) -> str:
+    return _FORMATTING_CODE.sub("", text) if "\u00a7" in text else text
+
+def nfkc(text: str) -> str:
+    return unicodedata.normalize("NFKC", text)
+
+def underscores_to_spaces(text: str) -> str:
+    return text.replace("_", " ")
+
+def fold_whitespace(text: str) -> str:
+    return " ".join(text.split())
+
+class NameNormalizer:
+    """
+    Turns a display name into the key duplicates are grouped by: `steps` (str -> str) applied in order.
+    Results are memoized in a bounded LRU cache, so a display string is normalized once no matter how many
+    tables (before/after RP, kinds, locales) it appears in. `normalize` is the cached function, for hot loops.
+    `settings` holds the name_normalizer arguments it was built from (empty for a hand-made one).
+    """
+    def __init__(self,
+                 steps: Iterable[Callable[[str], str]],
+                 label: str = "",
+                 cache_size: int = NORMALIZE_CACHE_SIZE,
+                 settings: Optional[Dict[str, bool]] = None):
+        self.steps = tuple(steps)
+        self.label = label
+        self.settings = dict(settings or {})
+        self.normalize = functools.lru_cache(maxsize=cache_size)(self._apply)
+
+    def _apply(self, text: str) -> str:
+        for step in self.steps:
+            text = step(text)
+        return text
+
+    def __call__(self, text: str) -> str:
+        return self.normalize(text)
+
+    def cache_info(self):
+        return self.normalize.cache_info()
+
+    def copy(self) -> "NameNormalizer":
+        """
+        Same steps and settings with a cache of its own, so its cache_info() counts one run's calls only,
+        whatever else shares the original.
+        """
+        return NameNormalizer(self.steps, self.label, self.normalize.cache_info().maxsize, self.settings)
+
+def name_normalizer(case_insensitive: bool = True,
+                    treat_underscores_as_spaces: bool = True,
+                    nfkc_forms: bool = False,
+                    strip_formatting: bool = False,
+                    fold_spaces: bool = False) -> NameNormalizer:
+    """
+    The NameNormalizer for a set of compare settings; equal settings share one instance, and so one cache.
+    Steps run in this order: formatting codes, NFKC, underscores, case, whitespace.
+    The NFKC, formatting-code and whitespace steps are opt-in, so the default compares names as MMDC always has.
+    """
+    # always positional, so lru_cache sees equal settings as one key however they were passed
+    return _shared_name_normalizer(bool(case_insensitive), bool(treat_underscores_as_spaces), bool(nfkc_forms),
+                                   bool(strip_formatting), bool(fold_spaces))
+
+@functools.lru_cache(maxsize=16)
+def _shared_name_normalizer(case_insensitive: bool,
+                            treat_underscores_as_spaces: bool,
+                            nfkc_forms: bool,
+                            strip_formatting: bool,
+                            fold_spaces: bool) -> NameNormalizer:
+    steps: List[Callable[[str], str]] = []
+    if strip_formatting:
+        steps.append(strip_formatting_codes)
+    if nfkc_forms:
+        steps.append(nfkc)
+    if treat_underscores_as_spaces:
+        steps.append(underscores_to_spaces)
+    if case_insensitive:
+        steps.append(str.lower)
+    if fold_spaces:
+        steps.append(fold_whitespace)
+    # opt-in steps are only named when on, so reports of a default scan keep their old settings line
+    label = f"case_insensitive={case_insensitive}, underscores_as_spaces={treat_underscores_as_spaces}"
+    for name, on in (("nfkc", nfkc_forms), ("strip_formatting_codes", strip_formatting), ("fold_whitespace", fold_spaces)):
+        if on:
+            label += f", {name}=True"
+    settings = {"case_insensitive": case_insensitive, "treat_underscores_as_spaces": treat_underscores_as_spaces,
+                "nfkc_forms": nfkc_forms, "strip_formatting": strip_formatting, "fold_spaces": fold_spaces}
+    return NameNormalizer(steps, label, settings=settings)
+
+def normalize_name_for_compare(text: str,
+                               case_insensitive: bool,
+                               treat_underscores_as_spaces: bool,
+                               normalizer: Optional[NameNormalizer] = None) -> str:
+    return (normalizer or name_normalizer(case_insensitive, treat_underscores_as_spaces)).normalize(text)
+
+def compute_display_names(kind: str,
+                          store: RegistryStore,
+                          mod_langs: Dict[str, Dict[str, str]],
+                          rp_overrides: Dict[str, str],
+                          rows: Optional[Iterable[int]] = None,
+                          fallback_langs: Optional[Dict[str, Dict[str, str]]] = None,
+                          fallback_overrides: Optional[Dict[str, str]] = None,
+                          stats: Optional[Dict[str, float]] = None,
+                          warn_missing: Optional[Callable[[str], None]] = None) -> Tuple[NameTable, NameTable]:
+    """
+    Returns (before_names, after_names): id -> name, as NameTables over the store.
+    With `rows`, only those rows are resolved; the rest are left as None for the caller to fill.
+    Equal names share one string object.
+    For a translation, mod_langs/rp_overrides are that locale's and fallback_langs/fallback_overrides
+    the en_us ones, layered like the game does: RP locale > mod locale > RP en_us > mod en_us.
+    With `stats`, counts missing_lang_keys (resolved IDs that fell back to a prettified ID);
+    with `warn_missing`, each of them is also reported through it ("check_missing_lang").
+    """
+    before: List[Optional[str]] = [None] * len(store)
+    after: List[Optional[str]] = [None] * len(store)
+    pool: Dict[str, str] = {}
+    missing = 0
+    for r, item_id, modid, path in store.rows(rows):
+        key = lang_key_for(kind, modid, path)
+        base_name = None
+        lang = mod_langs.get(modid)
+        if lang is not None and key in lang:
+            base_name = lang[key]
+        translated = bool(base_name)
+        if not base_name and fallback_langs is not None:
+            lang = fallback_langs.get(modid)
+            if lang is not None and key in lang:
+                base_name = lang[key]
+        if not base_name:
+            if warn_missing is not None:
+                warn_missing(f"[WARN] Missing lang key for {item_id} ({key})")
+            base_name = prettify_from_id(item_id)
+            missing += 1
+        base_name = pool.setdefault(base_name, base_name)
+        before[r] = base_name
+        new_name = rp_overrides.get(key)
+        if new_name is None and not translated and fallback_overrides is not None:
+            new_name = fallback_overrides.get(key)
+        after[r] = base_name if new_name is None else pool.setdefault(new_name, new_name)
+    count_stat(stats, "missing_lang_keys", missing)
+    return NameTable(store, before), NameTable(store, after)
+
+def group_dupes_by_name(ids_to_names: Mapping,
+                        case_insensitive: bool,
+                        treat_underscores_as_spaces: bool,
+                        normalizer: Optional[NameNormalizer] = None) -> Dict[str, List[str]]:
+    """
+    normalized name -> IDs, for every name 2+ IDs share. A `normalizer` replaces the two compare flags.
+    """
+    normalize = (normalizer or name_normalizer(case_insensitive, treat_underscores_as_spaces)).normalize
+    name_groups = defaultdict(list)
+    for item_id, nm in ids_to_names.items():
+        name_groups[normalize(nm)].append(item_id)
+    return {n: lst for n, lst in name_groups.items() if len(lst) >= 2}
+
+def cross_mod_group_names(dupe_groups: Dict[str, List[str]]) -> List[str]:
+    """
+    Sorted names of the groups whose IDs come from 2+ different mods.
+    """
+    names = []
+    for name, ids in dupe_groups.items():
+        first = ids[0].split(":", 1)[0]
+        if any(i.split(":", 1)[0] != first for i in ids):
+            names.append(name)
+    return sorted(names)
+
+def count_cross_mod_groups(dupe_groups: Dict[str, List[str]]) -> int:
+    """
+    Number of groups whose IDs come from 2+ different mods.
+    """
+    count = 0
+    for ids in dupe_groups.values():
+        first = ids[0].split(":", 1)[0]
+        if any(i.split(":", 1)[0] != first for i in ids):
+            count += 1
+    return count
+
+def build_mod_index(dupe_groups: Dict[str, List[str]]) -> Dict[str, Dict[str, List[str]]]:
+    per_mod = defaultdict(lambda: defaultdict(list))
+    for norm_name, ids in dupe_groups.items():
+        mods_present = {i.split(":",1)[0] for i in ids}
+        if len(mods_present) < 2:
+            continue
+        for m in mods_present:
+            per_mod[m][norm_name] = ids
+    return per_mod
+
+def changed_name_ids(before_names: Mapping, after_names: Mapping) -> Set[str]:
+    """
+    IDs whose name differs between the two tables (or that only one of them has).
+    """
+    if isinstance(before_names, NameTable) and isinstance(after_names, NameTable) and before_names.store is after_names.store:
+        return {i for i, b, a in zip(before_names.store.ids, before_names.names, after_names.names) if b != a}
+    changed = {i for i, b in before_names.items() if after_names.get(i) != b}
+    changed.update(i for i in after_names if i not in before_names)
+    return changed
@@ -0,0 +1,175 @@
+import os
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Dict, Tuple, List, Optional, Set
+
+from .common import NEAR_DUPE_DEFAULT_THRESHOLD
+from .names import NameNormalizer, name_normalizer
+from .reports import _write_report_file
+
+##############################
+# Near duplicates
+##############################
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"\x01\x01{text}\x02\x02"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _char_masks(pattern: str) -> Dict[str, int]:
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(pattern):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+def _bit_parallel_distance(masks: Dict[str, int], pattern_len: int, text: str, limit: int) -> int:
+    """
+    Levenshtein distance between the pattern behind `masks` and `text` (Myers' bit-vector algorithm,
+    one column per character of text), or limit + 1 as soon as it cannot end up <= limit.
+    """
+    if pattern_len == 0:
+        return min(len(text), limit + 1)
+    full = (1 << pattern_len) - 1
+    top = 1 << (pattern_len - 1)
+    pv, mv, score = full, 0, pattern_len
+    remaining = len(text)
+    for ch in text:
+        eq = masks.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & top:
+            score += 1
+        elif mh & top:
+            score -= 1
+        remaining -= 1
+        if score - remaining > limit:
+            return limit + 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return min(score, limit + 1)
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance of a and b, or limit + 1 if it is larger than `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    return _bit_parallel_distance(_char_masks(a), len(a), b, limit)
+
+def _segment_bounds(length: int, count: int) -> List[Tuple[int, int]]:
+    """
+    (start, length) of `count` near-equal segments covering a string of `length` characters.
+    """
+    short, extra = divmod(length, count)
+    bounds = []
+    pos = 0
+    for i in range(count):
+        seg_len = short + (1 if i >= count - extra else 0)
+        bounds.append((pos, seg_len))
+        pos += seg_len
+    return bounds
+
+def find_near_duplicates(ids_to_names: Mapping,
+                         case_insensitive: bool,
+                         treat_underscores_as_spaces: bool,
+                         threshold: float = NEAR_DUPE_DEFAULT_THRESHOLD,
+                         normalizer: Optional[NameNormalizer] = None) -> List[Tuple[str, str, float, List[str], List[str]]]:
+    """
+    Pairs of different compare-names whose edit similarity (1 - distance / longer length) is >= threshold
+    and whose IDs come from 2+ different mods. Exact matches are left to group_dupes_by_name.
+    Returns (name_a, name_b, similarity, ids_a, ids_b), most similar first.
+
+    Names are visited shortest first; each one probes two indexes of the shorter names seen so far and is
+    then added to them, sized for the longest partner it can still have (len / threshold). For k edits:
+    - segments: a name cut into k + 1 parts keeps one part intact, within k characters of its old position;
+    - rare trigrams: one edit destroys at most 3 trigrams, so the pair shares one of the 3 * k + 1 rarest.
+    Only names found in both, that also pass the full trigram count, get the bit-parallel edit distance.
+    """
+    normalize = (normalizer or name_normalizer(case_insensitive, treat_underscores_as_spaces)).normalize
+    by_norm = defaultdict(list)
+    for item_id, nm in ids_to_names.items():
+        if nm:
+            by_norm[normalize(nm)].append(item_id)
+    names = sorted(by_norm, key=lambda s: (len(s), s))
+    mods = [{i.split(":", 1)[0] for i in by_norm[n]} for n in names]
+    masks: List[Optional[Dict[str, int]]] = [None] * len(names)
+    grams = [_trigrams(n) for n in names]
+    doc_freq = defaultdict(int)
+    for gs in grams:
+        for g in gs:
+            doc_freq[g] += 1
+
+    # (length, segment number, segment text) -> names of that length with that segment
+    index: Dict[Tuple[int, int, str], List[int]] = defaultdict(list)
+    segments: Dict[int, List[Tuple[int, int]]] = {}
+    # trigram -> names that have it among their rarest trigrams
+    rare_index: Dict[str, List[int]] = defaultdict(list)
+    pairs = []
+    for a, name_a in enumerate(names):
+        len_a = len(name_a)
+        limit = int((1.0 - threshold) * len_a + 1e-9)
+        partner_limit = int((1.0 - threshold) * len_a / threshold + 1e-9)
+        if partner_limit <= 0:
+            continue
+        rarest = sorted(grams[a], key=lambda g: (doc_freq[g], g))
+        if limit > 0:
+            candidates = set()
+            for len_b in range(max(1, len_a - limit), len_a + 1):
+                for seg_no, (pos, seg_len) in enumerate(segments.get(len_b, ())):
+                    for s in range(max(0, pos - limit), min(len_a - seg_len, pos + limit) + 1):
+                        found = index.get((len_b, seg_no, name_a[s:s + seg_len]))
+                        if found:
+                            candidates.update(found)
+            grams_a = grams[a]
+            min_shared = len(grams_a) - 3 * limit
+            # very short names may share no trigram at all within the limit
+            if min_shared > 0:
+                shares_rare = set()
+                for g in rarest[:3 * limit + 1]:
+                    found = rare_index.get(g)
+                    if found:
+                        shares_rare.update(found)
+                candidates &= shares_rare
+            mods_a = mods[a]
+            single_mod = len(mods_a) == 1
+            for b in candidates:
+                if single_mod and mods[b] == mods_a:
+                    continue
+                # one edit destroys at most 3 trigrams; a cheap set test before the real distance
+                if len(grams_a & grams[b]) < min_shared:
+                    continue
+                d = _bit_parallel_distance(masks[b], len(names[b]), name_a, limit)
+                if d <= limit:
+                    pairs.append((names[b], name_a, 1.0 - d / len_a, sorted(by_norm[names[b]]), sorted(by_norm[name_a])))
+        if len_a not in segments:
+            segments[len_a] = _segment_bounds(len_a, min(len_a, partner_limit + 1))
+        masks[a] = _char_masks(name_a)
+        for seg_no, (pos, seg_len) in enumerate(segments[len_a]):
+            index[(len_a, seg_no, name_a[pos:pos + seg_len])].append(a)
+        for g in rarest[:3 * partner_limit + 1]:
+            rare_index[g].append(a)
+    pairs.sort(key=lambda p: (-p[2], p[0].lower(), p[1].lower()))
+    return pairs
+
+def write_near_duplicates_report(output_dir: str,
+                                 registry_folder: str,
+                                 kind: str,
+                                 after_names: Mapping,
+                                 pairs: List[Tuple[str, str, float, List[str], List[str]]],
+                                 threshold: float) -> str:
+    near_file = os.path.join(output_dir, "AFTER_RP_near_duplicates.txt")
+    blocks = []
+    for name_a, name_b, similarity, ids_a, ids_b in pairs:
+        lines = [f"{name_a}  ~  {name_b}  ({similarity:.0%})\n"]
+        for item_id in ids_a + ids_b:
+            lines.append(f"  - {item_id}  -> \"{after_names.get(item_id, '')}\"\n")
+        lines.append("\n")
+        blocks.append("".join(lines))
+    header = (f"# Near-duplicate names AFTER RP (similarity >= {threshold:.0%}, cross-mod only) | kind={kind}\n"
+              f"# Scanned: {os.path.abspath(registry_folder)}\n"
+              f"# Pairs: {len(pairs)}\n\n")
+    _write_report_file(near_file, header, blocks)
+    return near_file
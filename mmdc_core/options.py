@@ -0,0 +1,109 @@
+from typing import List, Optional
+
+from .common import DEFAULT_LOCALE, NEAR_DUPE_DEFAULT_THRESHOLD, NESTED_JAR_DEPTH
+from .names import NameNormalizer, name_normalizer
+
+##############################
+# Run settings
+##############################
+
+def parse_mod_list(text: str) -> List[str]:
+    return [m.strip() for m in text.split(",") if m.strip()]
+
+def parse_locale_list(text: str) -> Optional[List[str]]:
+    """
+    "en_us, zh_cn" -> ["en_us", "zh_cn"]; "all" -> None (every locale the jars or RP ship); empty -> en_us.
+    """
+    locales = []
+    for l in text.replace(";", ",").split(","):
+        l = l.strip().lower().replace("-", "_")
+        if l == "all":
+            return None
+        if l and l not in locales:
+            locales.append(l)
+    return locales or [DEFAULT_LOCALE]
+
+class ScanOptions:
+    """
+    The settings of one run (a scan, watch, serve or batch instance): the mmdc.json keys as attributes,
+    read and type-checked once. Every entry point takes one (or a settings dict it turns into one) and hands
+    it down, so nothing a run depends on lives in a module global and runs can share a process.
+    """
+    # mmdc.json key -> default
+    DEFAULTS = {
+        "registry_folder": "",
+        "dump_root": "",
+        "mods_folder": "",
+        "rp_path": "",
+        "output_folder": "",
+        "exclude_mods": "",
+        "locales": DEFAULT_LOCALE,
+        "what_if_stacks": (),
+        "scan_all_kinds": False,
+        "case_insensitive": True,
+        "underscores_as_spaces": True,
+        "normalize_nfkc": False,
+        "strip_formatting_codes": False,
+        "fold_whitespace": False,
+        "enable_rp": True,
+        "check_missing_lang": False,
+        "use_lang_cache": True,
+        "lang_cache_hash": False,
+        "targeted_langs": True,
+        "incremental": False,
+        "write_sqlite": False,
+        "near_duplicates": False,
+        "near_threshold": NEAR_DUPE_DEFAULT_THRESHOLD,
+        "profile": False,
+        "lang_workers": 0,
+        "report_workers": 4,
+        "nested_jar_depth": NESTED_JAR_DEPTH,
+    }
+    __slots__ = tuple(DEFAULTS)
+
+    def __init__(self, **settings):
+        for key, default in self.DEFAULTS.items():
+            value = settings.pop(key, default)
+            if isinstance(default, bool):
+                value = bool(value)
+            elif isinstance(default, str):
+                value = str(value or "").strip()
+            elif key in ("lang_workers", "report_workers"):
+                # a config or GUI value that is no number ("auto", "") falls back to the default
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    value = default
+            setattr(self, key, value)
+        if settings:
+            raise TypeError("unknown settings: " + ", ".join(sorted(settings)))
+        # jar-in-jar levels to read langs from (0 = top-level jars only); a bad value falls back to the default
+        try:
+            self.nested_jar_depth = max(0, int(self.nested_jar_depth))
+        except (TypeError, ValueError):
+            self.nested_jar_depth = NESTED_JAR_DEPTH
+
+    @classmethod
+    def from_dict(cls, opts) -> "ScanOptions":
+        """
+        `opts` as ScanOptions: a ScanOptions is returned as is; keys of a settings dict that are not
+        run settings (GUI state such as the theme) are ignored.
+        """
+        if isinstance(opts, ScanOptions):
+            return opts
+        return cls(**{k: v for k, v in opts.items() if k in cls.DEFAULTS})
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.DEFAULTS}
+
+    def replace(self, **changes) -> "ScanOptions":
+        settings = self.to_dict()
+        settings.update(changes)
+        return ScanOptions(**settings)
+
+    def normalizer(self) -> NameNormalizer:
+        """
+        The (shared) NameNormalizer for the compare settings.
+        """
+        return name_normalizer(self.case_insensitive, self.underscores_as_spaces, self.normalize_nfkc,
+                               self.strip_formatting_codes, self.fold_whitespace)
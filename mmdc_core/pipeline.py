@@ -0,0 +1,497 @@
+import os
+import time
+import cProfile
+import threading
+from typing import Dict, Tuple, List, Optional, Set, Callable
+
+from .common import (
+    DEFAULT_LOCALE,
+    RESULTS_DB_NAME,
+    RUN_METRICS_NAME,
+    lang_key_for,
+    registry_folder_kind,
+    warn_to_stderr,
+)
+from .registry import RegistryStore, collect_dump_files_by_kind, scan_registry_files, scan_registry_folder
+from .langs import (
+    JarStore,
+    LangCache,
+    jar_fingerprint,
+    load_mod_langs,
+    load_resource_pack_stack,
+    needed_lang_keys,
+    parse_rp_stack,
+)
+from .names import compute_display_names, count_cross_mod_groups, cross_mod_group_names, group_dupes_by_name
+from .reports import write_reports
+from .near_dupes import find_near_duplicates, write_near_duplicates_report
+from .what_if import WhatIfBaseline, parse_what_if_stacks, write_what_if_report
+from .results import ResultsIndex, write_results_db
+from .options import ScanOptions, parse_locale_list, parse_mod_list
+from .incremental import (
+    diff_mod_jars,
+    load_snapshot,
+    resolve_names_incremental,
+    save_snapshot,
+    snapshot_settings,
+    update_dupe_groups,
+    write_delta_report,
+)
+from .metrics import RunMetrics, write_profile
+
+##############################
+# Pipeline
+##############################
+
+class ScanCancelled(Exception):
+    pass
+
+def validate_scan_options(opts) -> Optional[str]:
+    """
+    Error message for unusable paths in `opts` (ScanOptions or a settings dict), or None if a scan can start.
+    """
+    opts = ScanOptions.from_dict(opts)
+    reg = opts.registry_folder
+    dump_root = opts.dump_root
+    mods = opts.mods_folder
+    out = opts.output_folder
+    rp = opts.rp_path
+    if opts.scan_all_kinds:
+        if not os.path.isdir(dump_root):
+            return f"Dump Root not found:\n{dump_root}"
+    elif not os.path.isdir(reg):
+        return f"Registry folder not found:\n{reg}"
+    if not os.path.isdir(mods):
+        return f"Mods folder not found:\n{mods}"
+    for rp_path in parse_rp_stack(rp):
+        if rp_path.lower() != "none" and not (os.path.isdir(rp_path) or os.path.isfile(rp_path)):
+            return f"Resource pack path not found:\n{rp_path}"
+    for stack in parse_what_if_stacks(opts.what_if_stacks):
+        for rp_path in stack:
+            if not (os.path.isdir(rp_path) or os.path.isfile(rp_path)):
+                return f"What-if resource pack not found:\n{rp_path}"
+    if not out:
+        return "Choose an Output folder."
+    if opts.near_duplicates:
+        try:
+            threshold = float(opts.near_threshold)
+        except (TypeError, ValueError):
+            threshold = -1.0
+        if not 0.5 <= threshold < 1.0:
+            return "Near-duplicate threshold must be between 0.5 and 0.99."
+    return None
+
+def run_scan(opts,
+             lang_cache_path: Optional[str] = None,
+             log: Callable[[str], None] = print,
+             progress: Optional[Callable[[str, int, int], None]] = None,
+             cancel: Optional[threading.Event] = None,
+             jar_store: Optional[JarStore] = None,
+             keep_results: bool = False,
+             warn: Callable[[str], None] = warn_to_stderr) -> dict:
+    """
+    The whole Start Scan pipeline. `opts` is a ScanOptions or a settings dict (mmdc.json keys).
+    With "scan_all_kinds", every registry folder under "dump_root" is scanned in one run:
+    mod langs and RP overrides are loaded once and each kind gets its own <output>/<kind>/ report tree.
+    "locales" ("en_us, zh_cn", "all") picks the languages; with more than one, each gets <output>/<locale>/.
+    progress(stage, done, total) reports "registry", "langs", "names" and "reports".
+    Setting `cancel` stops the run with ScanCancelled between stages (and between jars).
+    Returns {"kind", "ids", "reports", "before_cross_mod", "after_cross_mod", "kinds", "locales"},
+    where "kinds" holds the same counters (and report paths) per kind, keyed "<locale>/<kind>" for several locales;
+    "reports" is empty when no IDs were found.
+    Stage timings and counters go to <output>/run_metrics.json ("metrics" in the result) and a summary to `log`;
+    with "profile", the run is also profiled with cProfile into run_profile.pstats/.txt.
+    With a `jar_store` (batch runs), mod langs come from it instead of the lang cache.
+    With `keep_results`, each "kinds" entry also holds a ResultsIndex ("index") for browsing the groups.
+    "check_missing_lang" warnings go to `warn` (default stderr), not `log`, so a quiet run still shows them.
+    """
+    opts = ScanOptions.from_dict(opts)
+    metrics = RunMetrics()
+    profiler = cProfile.Profile() if opts.profile else None
+    if profiler is not None:
+        try:
+            profiler.enable()
+        except ValueError as ex:
+            # another profiler (a debugger, an outer cProfile) already owns this thread
+            log(f"Profiling unavailable: {ex}")
+            profiler = None
+    try:
+        result = _run_scan_stages(opts, metrics, lang_cache_path, log, progress, cancel, jar_store, keep_results, warn)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    out = opts.output_folder
+    data = metrics.to_dict()
+    for line in metrics.summary_lines(data):
+        log(line)
+    try:
+        result["metrics"] = metrics.save(out, data)
+    except Exception as ex:
+        log(f"Warning: could not write {RUN_METRICS_NAME}: {ex}")
+    if profiler is not None:
+        stats_path, text_path = write_profile(out, profiler)
+        log(f"Profile written to {text_path} (and {os.path.basename(stats_path)}).")
+    return result
+
+def _run_scan_stages(opts: ScanOptions,
+                     metrics: RunMetrics,
+                     lang_cache_path: Optional[str],
+                     log: Callable[[str], None],
+                     progress: Optional[Callable[[str, int, int], None]],
+                     cancel: Optional[threading.Event],
+                     jar_store: Optional[JarStore] = None,
+                     keep_results: bool = False,
+                     warn: Callable[[str], None] = warn_to_stderr) -> dict:
+    """
+    run_scan without the metrics/profile wrapping; every stage runs inside metrics.stage().
+    """
+    all_kinds = opts.scan_all_kinds
+    reg = opts.registry_folder
+    dump_root = opts.dump_root
+    mods = opts.mods_folder
+    out = opts.output_folder
+    rp = opts.rp_path
+    case_insensitive = opts.case_insensitive
+    underscores_as_spaces = opts.underscores_as_spaces
+    # a cache of the run's own: the shared one's hit/miss counts would include overlapping runs
+    normalizer = opts.normalizer().copy()
+    warn_missing = warn if opts.check_missing_lang else None
+
+    def checkpoint():
+        if cancel is not None and cancel.is_set():
+            raise ScanCancelled()
+
+    def report(stage: str, done: int, total: int):
+        checkpoint()
+        if progress is not None:
+            progress(stage, done, total)
+
+    os.makedirs(out, exist_ok=True)
+    result = {"kind": "all" if all_kinds else registry_folder_kind(reg), "ids": 0, "reports": (),
+              "before_cross_mod": 0, "after_cross_mod": 0, "kinds": {}}
+
+    stores: Dict[str, RegistryStore] = {}
+    exclude_list = parse_mod_list(opts.exclude_mods)
+    if all_kinds:
+        log("Scanning dump root for registry folders...")
+        report("registry", 0, 1)
+        with metrics.stage("registry"):
+            skipped: List[str] = []
+            files_by_kind = collect_dump_files_by_kind(dump_root, skipped)
+            scanned = dump_root
+            for i, (kind, files) in enumerate(files_by_kind.items()):
+                stores[kind] = scan_registry_files(files, dump_root, metrics.counters)
+                report("registry", i + 1, len(files_by_kind))
+        if skipped:
+            log(f"Skipped registries of no known kind: {', '.join(skipped)}")
+    else:
+        log("Scanning registry folder...")
+        report("registry", 0, 1)
+        with metrics.stage("registry"):
+            stores[result["kind"]] = scan_registry_folder(
+                reg,
+                treat_underscores_as_spaces=underscores_as_spaces,
+                case_insensitive=case_insensitive,
+                stats=metrics.counters
+            )
+        scanned = reg
+        report("registry", 1, 1)
+    for kind in list(stores):
+        store = stores[kind]
+        if exclude_list:
+            before_count = len(store)
+            store = store.without_mods(exclude_list)
+            log(f"Excluded mods: {exclude_list} ({before_count - len(store)} {kind} IDs removed)")
+        if store:
+            stores[kind] = store
+        else:
+            del stores[kind]
+    if not stores:
+        log("No IDs found.")
+        return result
+    result["ids"] = sum(len(store) for store in stores.values())
+    metrics.count("ids_found", result["ids"])
+    if all_kinds:
+        log("Kinds found: " + ", ".join(f"{kind} ({len(store)} IDs)" for kind, store in stores.items()))
+
+    incremental = opts.incremental
+    prev = None
+    if incremental:
+        with metrics.stage("snapshot_load"):
+            prev = load_snapshot(out)
+        if prev is None:
+            log("No previous run snapshot, doing a full scan.")
+        elif prev.get("settings") != snapshot_settings(opts, scanned):
+            log("Previous run used different settings, doing a full scan.")
+            prev = None
+
+    locales = parse_locale_list(opts.locales)
+    nested_depth = opts.nested_jar_depth
+    what_if = parse_what_if_stacks(opts.what_if_stacks)
+    # translations fall back to en_us, so it is always loaded
+    load_locales = None if locales is None else set(locales) | {DEFAULT_LOCALE}
+    targeted = opts.targeted_langs
+    needed = None
+    if targeted or incremental:
+        needed = {}
+        for kind, store in stores.items():
+            for modid, keys in needed_lang_keys(kind, store).items():
+                needed.setdefault(modid, set()).update(keys)
+
+    rp_langs: Dict[str, Dict[str, str]] = {}
+    rp_loaded: Dict[str, Dict[str, Dict[str, str]]] = {}
+    if opts.enable_rp:
+        if rp:
+            log("RP filtering enabled, loading overrides…")
+            rp_stack = parse_rp_stack(rp)
+            with metrics.stage("rp_langs"):
+                rp_langs = load_resource_pack_stack(rp_stack, load_locales, loaded=rp_loaded, stats=metrics.counters)
+            log(f"Loaded {sum(len(o) for o in rp_langs.values())} RP override entries"
+                + (f" from a stack of {len(rp_stack)} packs" if len(rp_stack) > 1 else "")
+                + (f" ({', '.join(sorted(rp_langs))})." if len(rp_langs) > 1 or locales != [DEFAULT_LOCALE] else "."))
+        else:
+            log("RP filtering enabled but no RP selected.")
+    else:
+        log("RP filtering disabled (ignored).")
+    rp_relevant: Dict[str, Dict[str, str]] = {}
+    changed_rp_keys: Dict[str, Set[str]] = {}
+    if incremental:
+        rp_relevant = {locale: {k: overrides[k] for keys in needed.values() for k in keys if k in overrides}
+                       for locale, overrides in rp_langs.items()}
+    if prev is not None:
+        prev_rp = prev.get("rp", {})
+        for locale in prev_rp.keys() | rp_relevant.keys():
+            old, new = prev_rp.get(locale, {}), rp_relevant.get(locale, {})
+            changed_rp_keys[locale] = {k for k in old.keys() | new.keys() if old.get(k) != new.get(k)}
+        log(f"{sum(len(keys) for keys in changed_rp_keys.values())} relevant RP overrides changed since the last run.")
+    checkpoint()
+
+    jar_table: Dict[str, list] = {}
+    affected_mods: Set[str] = set()
+    if prev is not None:
+        # only mods whose jars changed, plus IDs the previous run didn't have, need their langs
+        jar_table, affected_mods, jars_changed = diff_mod_jars(prev.get("jars", {}), mods, nested_depth)
+        load_needed = {m: needed[m] for m in affected_mods if m in needed}
+        prev_locales = locales if locales is not None else prev.get("locales", [DEFAULT_LOCALE])
+        translated_rp_keys = set()
+        if any(l != DEFAULT_LOCALE for l in prev_locales):
+            for keys in changed_rp_keys.values():
+                translated_rp_keys |= keys
+        for kind, store in stores.items():
+            prev_names = [prev["kinds"].get(f"{l}/{kind}", {}).get("names", {}) for l in prev_locales]
+            for _, item_id, modid, path in store.rows():
+                key = lang_key_for(kind, modid, path)
+                if key in translated_rp_keys or any(item_id not in names for names in prev_names):
+                    load_needed.setdefault(modid, set()).add(key)
+        if what_if and any(l != DEFAULT_LOCALE for l in prev_locales):
+            # what-if needs to know which IDs each translation covers, for every mod
+            load_needed = needed
+        log(f"Found {result['ids']} IDs. Since the last run {jars_changed} jars were added, removed or changed "
+            f"({len(affected_mods)} mods affected); loading langs for {len(load_needed)} mods...")
+    elif targeted:
+        load_needed = needed
+        log(f"Found {result['ids']} IDs across {len(needed)} mods. Loading needed mod langs...")
+    else:
+        load_needed = None
+        log(f"Found {result['ids']} IDs. Loading mod langs...")
+    lang_sets: Dict[str, Dict[str, Dict[str, str]]] = {}
+    cache = None
+    if jar_store is not None:
+        cache = jar_store.view()
+    elif lang_cache_path and opts.use_lang_cache:
+        cache = LangCache(lang_cache_path, use_hash=opts.lang_cache_hash, nested_depth=nested_depth)
+    if load_needed is None or load_needed:
+        jar_namespaces = {} if incremental and prev is None else None
+        with metrics.stage("mod_langs"):
+            lang_sets = load_mod_langs(mods, cache=cache, workers=opts.lang_workers, needed=load_needed,
+                                       progress=lambda done, total: report("langs", done, total),
+                                       jar_namespaces=jar_namespaces, locales=load_locales, stats=metrics.counters,
+                                       nested_depth=nested_depth)
+        log(f"Loaded langs for {len(lang_sets.get(DEFAULT_LOCALE, {}))} mods"
+            + (f", {len(lang_sets)} locales." if len(lang_sets) > 1 else "."))
+        if cache is not None:
+            with metrics.stage("lang_cache_save"):
+                cache.save()
+            log(f"Lang cache: {cache.hits} hits, {cache.misses} misses, {cache.evicted} evicted.")
+        if jar_namespaces is not None:
+            for jar_path, namespaces in jar_namespaces.items():
+                size, mtime_ns = jar_fingerprint(jar_path)
+                jar_table[jar_path] = [size, mtime_ns, namespaces]
+    checkpoint()
+
+    if locales is None:
+        # "all": every locale found this run, plus the ones an incremental run carried over
+        found = set(lang_sets) | set(rp_langs) | {DEFAULT_LOCALE}
+        if prev is not None:
+            found.update(prev.get("locales", []))
+        scan_locales = sorted(found)
+        log("Locales: " + ", ".join(scan_locales))
+        if prev is not None and not found.issubset(prev.get("locales", [])):
+            log("New locales since the last run, loading all needed langs...")
+            with metrics.stage("mod_langs"):
+                lang_sets = load_mod_langs(mods, cache=cache, workers=opts.lang_workers, needed=needed,
+                                           progress=lambda done, total: report("langs", done, total), locales=None,
+                                           stats=metrics.counters, nested_depth=nested_depth)
+            if cache is not None:
+                with metrics.stage("lang_cache_save"):
+                    cache.save()
+    else:
+        scan_locales = locales
+    per_locale_out = len(scan_locales) > 1
+    result["locales"] = scan_locales
+
+    what_if_stacks: List[Tuple[str, Dict[str, Dict[str, str]]]] = []
+    with metrics.stage("rp_langs"):
+        for paths in what_if:
+            what_if_stacks.append((" ; ".join(paths), load_resource_pack_stack(paths, load_locales, loaded=rp_loaded,
+                                                                               stats=metrics.counters)))
+    if what_if_stacks:
+        log(f"What-if: {len(what_if_stacks)} candidate RP stacks ({len(rp_loaded)} packs read).")
+    checkpoint()
+
+    def report_file_written(done: int, total: int):
+        metrics.count("files_written")
+        report("reports", done, total)
+
+    reports = []
+    snap_kinds = {}
+    for locale in scan_locales:
+        if locale == DEFAULT_LOCALE:
+            mod_langs, fallback_langs = lang_sets.get(locale, {}), None
+            rp_overrides, fallback_overrides = rp_langs.get(locale, {}), None
+            locale_rp_keys = changed_rp_keys.get(locale, set())
+        else:
+            mod_langs, fallback_langs = lang_sets.get(locale, {}), lang_sets.get(DEFAULT_LOCALE, {})
+            rp_overrides, fallback_overrides = rp_langs.get(locale, {}), rp_langs.get(DEFAULT_LOCALE, {})
+            locale_rp_keys = changed_rp_keys.get(locale, set()) | changed_rp_keys.get(DEFAULT_LOCALE, set())
+        locale_out = os.path.join(out, locale) if per_locale_out else out
+        for kind, store in stores.items():
+            kind_out = os.path.join(locale_out, kind) if all_kinds else locale_out
+            result_key = f"{locale}/{kind}" if per_locale_out else kind
+            label = result_key if all_kinds or per_locale_out else None
+            log(f"Computing display names ({label})..." if label else "Computing display names...")
+            prev_kind = prev["kinds"].get(f"{locale}/{kind}") if prev is not None else None
+            if prev_kind is not None:
+                prev_names = prev_kind["names"]
+                with metrics.stage("names"):
+                    before, after, touched = resolve_names_incremental(kind, store, prev_names, mod_langs, rp_overrides,
+                                                                       affected_mods, locale_rp_keys,
+                                                                       fallback_langs=fallback_langs,
+                                                                       fallback_overrides=fallback_overrides,
+                                                                       stats=metrics.counters, warn_missing=warn_missing)
+                log(f"{label or kind}: {len(touched)} IDs recomputed, "
+                    f"{len(before) - len(touched & before.keys())} reused from the last run.")
+                with metrics.stage("grouping"):
+                    before_dupes = update_dupe_groups(prev_kind["before_groups"], before,
+                                                      {i: prev_names[i][0] for i in touched if i in prev_names}, touched,
+                                                      case_insensitive, underscores_as_spaces, normalizer)
+                    after_dupes = update_dupe_groups(prev_kind["after_groups"], after,
+                                                     {i: prev_names[i][1] for i in touched if i in prev_names}, touched,
+                                                     case_insensitive, underscores_as_spaces, normalizer)
+            else:
+                with metrics.stage("names"):
+                    before, after = compute_display_names(kind, store, mod_langs, rp_overrides,
+                                                          fallback_langs=fallback_langs, fallback_overrides=fallback_overrides,
+                                                          stats=metrics.counters, warn_missing=warn_missing)
+                with metrics.stage("grouping"):
+                    before_dupes = group_dupes_by_name(before, case_insensitive, underscores_as_spaces, normalizer)
+                    after_dupes = group_dupes_by_name(after, case_insensitive, underscores_as_spaces, normalizer)
+            report("names", len(before), len(before))
+            kind_result = {
+                "kind": kind,
+                "locale": locale,
+                "ids": len(store),
+                "before_cross_mod": count_cross_mod_groups(before_dupes),
+                "after_cross_mod_names": cross_mod_group_names(after_dupes),
+            }
+            kind_result["after_cross_mod"] = len(kind_result["after_cross_mod_names"])
+            if keep_results:
+                kind_result["index"] = ResultsIndex(kind, before, after, after_dupes)
+
+            log(f"Writing {label} reports to {kind_out}..." if label else "Writing reports...")
+            started = time.perf_counter()
+            with metrics.stage("reports"):
+                kind_result["reports"] = write_reports(
+                    kind_out, scanned, kind, before, after,
+                    case_insensitive=case_insensitive,
+                    treat_underscores_as_spaces=underscores_as_spaces,
+                    progress=report_file_written,
+                    before_dupes=before_dupes,
+                    after_dupes=after_dupes,
+                    workers=opts.report_workers,
+                    normalizer=normalizer
+                )
+            # the extras below log their own timings
+            log(f"Reports written in {time.perf_counter() - started:.2f}s.")
+            if prev_kind is not None:
+                with metrics.stage("delta_report"):
+                    delta_file = write_delta_report(kind_out, kind, prev_kind["after_groups"], after_dupes, after, prev.get("time", "?"))
+                kind_result["reports"] += (delta_file,)
+                metrics.count("files_written")
+            if opts.near_duplicates:
+                threshold = float(opts.near_threshold)
+                near_started = time.perf_counter()
+                with metrics.stage("near_duplicates"):
+                    near_pairs = find_near_duplicates(after, case_insensitive, underscores_as_spaces, threshold, normalizer)
+                    kind_result["near_pairs"] = len(near_pairs)
+                    kind_result["reports"] += (write_near_duplicates_report(kind_out, scanned, kind, after, near_pairs, threshold),)
+                metrics.count("files_written")
+                log(f"Near duplicates: {len(near_pairs)} pair(s) at >= {threshold:.0%} "
+                    f"({time.perf_counter() - near_started:.2f}s).")
+            if what_if_stacks:
+                whatif_started = time.perf_counter()
+                with metrics.stage("what_if"):
+                    translated = None
+                    if fallback_langs is not None:
+                        translated = {r for r, _, modid, path in store.rows()
+                                      if (mod_langs.get(modid) or {}).get(lang_key_for(kind, modid, path))}
+                    baseline = WhatIfBaseline(kind, store, before, case_insensitive, underscores_as_spaces, translated,
+                                              normalizer)
+                    scored = []
+                    if rp_langs:
+                        scored.append(("Current RP", baseline.evaluate(rp_overrides, fallback_overrides)))
+                    for label, stack_langs in what_if_stacks:
+                        scored.append((label, baseline.evaluate(stack_langs.get(locale, {}),
+                                                                stack_langs.get(DEFAULT_LOCALE) if fallback_langs is not None else None)))
+                    kind_result["what_if"] = {label: res["cross_mod"] for label, res in scored}
+                    kind_result["reports"] += (write_what_if_report(kind_out, kind, baseline, scored),)
+                metrics.count("files_written")
+                log(f"What-if: {len(scored)} stacks scored in {time.perf_counter() - whatif_started:.2f}s.")
+            if opts.write_sqlite:
+                sqlite_started = time.perf_counter()
+                with metrics.stage("sqlite"):
+                    db_path = write_results_db(os.path.join(locale_out, RESULTS_DB_NAME), kind, scanned, store, before, after,
+                                               before_dupes, after_dupes, case_insensitive, underscores_as_spaces,
+                                               normalizer)
+                if db_path not in reports:
+                    reports.append(db_path)
+                    metrics.count("files_written")
+                log(f"Results database written in {time.perf_counter() - sqlite_started:.2f}s.")
+            if incremental:
+                snap_kinds[f"{locale}/{kind}"] = {
+                    "names": {i: [b, a] for i, b, a in zip(store.ids, before.names, after.names)},
+                    "before_groups": before_dupes,
+                    "after_groups": after_dupes,
+                }
+            result["kinds"][result_key] = kind_result
+            result["before_cross_mod"] += kind_result["before_cross_mod"]
+            result["after_cross_mod"] += kind_result["after_cross_mod"]
+            reports.extend(kind_result["reports"])
+    result["reports"] = tuple(reports)
+    if incremental:
+        with metrics.stage("snapshot_save"):
+            saved = save_snapshot(out, {
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "settings": snapshot_settings(opts, scanned),
+                "jars": jar_table,
+                "rp": rp_relevant,
+                "locales": scan_locales,
+                "kinds": snap_kinds,
+            })
+        if not saved:
+            log("Warning: could not save the run snapshot.")
+    normalized = normalizer.cache_info()
+    metrics.count("names_normalized", normalized.misses)
+    metrics.count("normalize_cache_hits", normalized.hits)
+    log("Done.")
+    return result
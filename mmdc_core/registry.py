@@ -0,0 +1,519 @@
+import os
+import re
+import json
+import threading
+from json.decoder import scanstring as json_scanstring
+from array import array
+from collections.abc import Mapping
+from typing import Iterable, Iterator, Dict, Tuple, List, Optional
+
+from .common import (
+    DISCOVERY_COUNT_LIMIT,
+    DISCOVERY_MAX_CANDIDATES,
+    DISCOVERY_MAX_DEPTH,
+    DUMP_ID_KEYS,
+    KINDS,
+    REGISTRY_DUMP_FOLDERS,
+    STREAM_CHUNK_SIZE,
+    STREAM_MIN_BYTES,
+    UNKNOWN_KIND,
+    count_stat,
+    extract_ids_from_json,
+    infer_kind_from_path,
+)
+
+##############################
+# Streaming dump reader
+##############################
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# everything up to the next bracket or escaped string: plain strings and scalars are stepped over in one match
+_SKIPPABLE = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*")*')
+_SCALAR = re.compile(r"[^ \t\n\r,\]}]*")
+# a run of plain "string", entries (no escapes): the flat Registry Dump list format
+_STRING_RUN = re.compile(r'(?:"[^"\\\x00-\x1f]*"[ \t\n\r]*,[ \t\n\r]*)+')
+_PLAIN_STRING = re.compile(r'"([^"\\\x00-\x1f]*)"')
+
+class JsonStream:
+    """
+    A pull reader over a JSON text file that holds one chunk in memory at a time.
+    Strings are decoded by json's own scanstring; values nobody asks for are skipped without being built.
+    Skipped values are only checked for balanced brackets, not fully validated.
+    """
+    __slots__ = ("f", "chunk_size", "buf", "pos")
+
+    def __init__(self, f, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+
+    def more(self) -> bool:
+        """
+        Drops what was consumed and appends the next chunk; False at the end of the file.
+        """
+        data = self.f.read(self.chunk_size)
+        if not data:
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        The next non-whitespace character (not consumed), or "" at the end of the file.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ""
+
+    def expect(self, ch: str):
+        if self.peek() != ch:
+            raise ValueError(f"expected {ch!r}")
+        self.pos += 1
+
+    def string(self) -> str:
+        if self.peek() != '"':
+            raise ValueError("expected a string")
+        while True:
+            try:
+                text, self.pos = json_scanstring(self.buf, self.pos + 1, True)
+                return text
+            except ValueError:
+                # the string runs past the chunk (or is broken, then the end of the file says so)
+                if not self.more():
+                    raise
+
+    def skip(self):
+        """
+        Skips one value of any type.
+        """
+        c = self.peek()
+        if c == '"':
+            self.string()
+        elif c in ("[", "{"):
+            depth = 0
+            while True:
+                self.pos = _SKIPPABLE.match(self.buf, self.pos).end()
+                if self.pos == len(self.buf):
+                    if not self.more():
+                        raise ValueError("unexpected end of data")
+                    continue
+                ch = self.buf[self.pos]
+                if ch == '"':
+                    self.string()
+                    continue
+                self.pos += 1
+                if ch in "[{":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return
+        else:
+            while True:
+                end = _SCALAR.match(self.buf, self.pos).end()
+                if end < len(self.buf) or not self.more():
+                    break
+            if end == self.pos:
+                raise ValueError("expected a value")
+            self.pos = end
+
+    def string_run(self) -> List[str]:
+        """
+        Fast path: consumes a run of plain string entries ("a", "b", ...) at C speed.
+        Returns [] when the next entry isn't one (escapes, objects, the last entry before "]").
+        """
+        # every matched entry is complete (closing quote and comma seen), even at the end of the chunk
+        m = _STRING_RUN.match(self.buf, self.pos)
+        if m is None:
+            return []
+        self.pos = m.end()
+        return _PLAIN_STRING.findall(m.group())
+
+def _stream_object_ids(js: JsonStream) -> List[str]:
+    """
+    The id-like string values of one object (last one wins for a repeated key), skipping everything else.
+    """
+    own: Dict[str, str] = {}
+    js.expect("{")
+    if js.peek() == "}":
+        js.pos += 1
+        return []
+    while True:
+        key = js.string()
+        js.expect(":")
+        if key in DUMP_ID_KEYS and js.peek() == '"':
+            own[key] = js.string()
+        else:
+            own.pop(key, None)
+            js.skip()
+        c = js.peek()
+        js.pos += 1
+        if c == "}":
+            return [own[k] for k in DUMP_ID_KEYS if k in own]
+        if c != ",":
+            raise ValueError("expected ',' or '}'")
+
+def _stream_list_ids(js: JsonStream) -> Iterator[str]:
+    js.expect("[")
+    if js.peek() == "]":
+        js.pos += 1
+        return
+    while True:
+        c = js.peek()
+        if c == '"':
+            run = js.string_run()
+            if run:
+                yield from run
+                continue
+            yield js.string()
+        elif c == "{":
+            yield from _stream_object_ids(js)
+        else:
+            js.skip()
+        c = js.peek()
+        js.pos += 1
+        if c == "]":
+            return
+        if c != ",":
+            raise ValueError("expected ',' or ']'")
+
+def iter_dump_ids(f) -> Iterator[str]:
+    """
+    The IDs extract_ids_from_json(json.load(f)) would return, read incrementally from the open text file:
+    memory stays at a chunk plus the IDs themselves, however large the file.
+    Raises ValueError on malformed JSON (possibly after yielding some IDs).
+    """
+    js = JsonStream(f)
+    c = js.peek()
+    if c == "[":
+        yield from _stream_list_ids(js)
+    elif c == "{":
+        own: Dict[str, str] = {}
+        js.pos += 1
+        if js.peek() == "}":
+            js.pos += 1
+        else:
+            while True:
+                key = js.string()
+                js.expect(":")
+                v = js.peek()
+                if v == "[":
+                    own.pop(key, None)
+                    yield from _stream_list_ids(js)
+                elif key in DUMP_ID_KEYS and v == '"':
+                    own[key] = js.string()
+                else:
+                    own.pop(key, None)
+                    js.skip()
+                c = js.peek()
+                js.pos += 1
+                if c == "}":
+                    break
+                if c != ",":
+                    raise ValueError("expected ',' or '}'")
+        for k in DUMP_ID_KEYS:
+            if k in own:
+                yield own[k]
+    else:
+        # a bare scalar holds no IDs (json.load would still validate it)
+        js.skip()
+    if js.peek() != "":
+        raise ValueError("extra data after the JSON value")
+
+def read_dump_ids(path: str, stream_min_bytes: int = STREAM_MIN_BYTES) -> List[str]:
+    """
+    IDs in one dump file. Files of stream_min_bytes and up are streamed with iter_dump_ids,
+    smaller ones go through json.load, which is faster when the whole tree fits easily.
+    Raises on unreadable or malformed files.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if os.fstat(f.fileno()).st_size < stream_min_bytes:
+            return list(extract_ids_from_json(json.load(f)))
+        return list(iter_dump_ids(f))
+
+##############################
+# Compact registry store
+##############################
+
+class RegistryStore:
+    """
+    Scanned registry IDs, one row per distinct ID, kept in columns:
+    ids (list of str), mod_index / source_index (arrays into the interned modids / sources tables).
+    The path part of an ID is sliced off on demand instead of being stored.
+    """
+    __slots__ = ("ids", "mod_index", "source_index", "modids", "sources", "_rows", "_mod_rows", "_source_rows")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.mod_index = array("I")
+        self.source_index = array("I")
+        self.modids: List[str] = []
+        self.sources: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._mod_rows: Dict[str, int] = {}
+        self._source_rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, item_id) -> bool:
+        return item_id in self._rows
+
+    def add(self, modid: str, path: str, source_file: str) -> bool:
+        """
+        Adds modid:path unless it is already stored (the first source file wins). True if it was new.
+        """
+        item_id = f"{modid}:{path}"
+        if item_id in self._rows:
+            return False
+        m = self._mod_rows.get(modid)
+        if m is None:
+            m = self._mod_rows[modid] = len(self.modids)
+            self.modids.append(modid)
+        s = self._source_rows.get(source_file)
+        if s is None:
+            s = self._source_rows[source_file] = len(self.sources)
+            self.sources.append(source_file)
+        self._rows[item_id] = len(self.ids)
+        self.ids.append(item_id)
+        self.mod_index.append(m)
+        self.source_index.append(s)
+        return True
+
+    def row(self, item_id: str) -> int:
+        return self._rows[item_id]
+
+    def modid(self, row: int) -> str:
+        return self.modids[self.mod_index[row]]
+
+    def path(self, row: int) -> str:
+        return self.ids[row][len(self.modids[self.mod_index[row]]) + 1:]
+
+    def source_file(self, row: int) -> str:
+        return self.sources[self.source_index[row]]
+
+    def rows(self, rows: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, str, str, str]]:
+        """
+        (row, id, modid, path) for every row, or just the given ones.
+        """
+        ids, mod_index, modids = self.ids, self.mod_index, self.modids
+        for r in (range(len(ids)) if rows is None else rows):
+            modid = modids[mod_index[r]]
+            item_id = ids[r]
+            yield r, item_id, modid, item_id[len(modid) + 1:]
+
+    def without_mods(self, modids: Iterable[str]) -> "RegistryStore":
+        excluded = set(modids)
+        store = RegistryStore()
+        for r, _, modid, path in self.rows():
+            if modid not in excluded:
+                store.add(modid, path, self.source_file(r))
+        return store
+
+class NameTable(Mapping):
+    """
+    id -> display name over a RegistryStore, stored as one column aligned with the store's rows.
+    Behaves like the read-only dict the reporting code used to get.
+    """
+    __slots__ = ("store", "names")
+
+    def __init__(self, store: RegistryStore, names: List[Optional[str]]):
+        self.store = store
+        self.names = names
+
+    def __getitem__(self, item_id: str) -> str:
+        try:
+            return self.names[self.store.row(item_id)]
+        except KeyError:
+            raise KeyError(item_id) from None
+
+    def __contains__(self, item_id) -> bool:
+        return item_id in self.store
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.ids)
+
+    def __len__(self) -> int:
+        return len(self.store.ids)
+
+    def items(self):
+        return zip(self.store.ids, self.names)
+
+def scan_registry_files(files: Iterable[str], base_folder: str, stats: Optional[Dict[str, float]] = None) -> RegistryStore:
+    """
+    Returns a RegistryStore of the IDs in the given dump files (each ID once),
+    source_file being relative to base_folder.
+    With `stats`, counts registry_files and registry_bytes.
+    """
+    store = RegistryStore()
+    for p in files:
+        try:
+            if stats is not None:
+                count_stat(stats, "registry_files")
+                count_stat(stats, "registry_bytes", os.path.getsize(p))
+            ids = read_dump_ids(p)
+        except Exception:
+            continue
+        source_file = os.path.relpath(p, base_folder)
+        for full_id in ids:
+            if not isinstance(full_id, str):
+                continue
+            full_id = full_id.strip()
+            if ":" in full_id:
+                modid, path = full_id.split(":", 1)
+            else:
+                modid, path = "minecraft", full_id
+            # optional normalization settings affect only name comparison later; keep raw id
+            store.add(modid, path, source_file)
+    return store
+
+def scan_registry_folder(registry_folder: str, treat_underscores_as_spaces: bool=False, case_insensitive: bool=False,
+                         stats: Optional[Dict[str, float]] = None) -> RegistryStore:
+    """
+    Returns a RegistryStore of every ID under the folder.
+    Display names are NOT resolved here; just the IDs.
+    """
+    files = []
+    for root, _, fns in os.walk(registry_folder):
+        for fn in fns:
+            if fn.lower().endswith(".json"):
+                files.append(os.path.join(root, fn))
+    return scan_registry_files(files, registry_folder, stats)
+
+def find_registry_candidates(dump_root: str) -> List[str]:
+    """
+    Every folder under dump_root (itself included) that directly holds .json files, sorted.
+    """
+    candidates: List[str] = []
+    for dirpath, dirnames, filenames in os.walk(dump_root):
+        if any(fn.lower().endswith(".json") for fn in filenames):
+            candidates.append(dirpath)
+    return sorted(set(candidates))
+
+def _dump_signature(dump_root: str) -> Tuple[int, ...]:
+    """
+    mtime_ns of dump_root and its direct subfolders: changes when the dump is regenerated or a kind folder is added.
+    """
+    stamps = [os.stat(dump_root).st_mtime_ns]
+    with os.scandir(dump_root) as it:
+        for e in it:
+            if e.is_dir():
+                stamps.append(e.stat().st_mtime_ns)
+    return tuple(sorted(stamps))
+
+def _count_json_files(folder: str, max_depth: int, limit: int) -> int:
+    """
+    .json files in folder and its subfolders down to max_depth levels, counting stops at `limit`.
+    """
+    count = 0
+    pending = [(folder, 0)]
+    while pending and count < limit:
+        path, depth = pending.pop()
+        try:
+            with os.scandir(path) as it:
+                for e in it:
+                    if e.is_file():
+                        if e.name.lower().endswith(".json"):
+                            count += 1
+                    elif depth < max_depth and e.is_dir():
+                        pending.append((e.path, depth + 1))
+        except OSError:
+            continue
+    return min(count, limit)
+
+_discovery_cache: Dict[str, Tuple[Tuple[int, ...], List[Tuple[str, int, str]]]] = {}
+_discovery_lock = threading.Lock()
+
+def discover_registry_folders(dump_root: str,
+                              max_depth: int = DISCOVERY_MAX_DEPTH,
+                              max_candidates: int = DISCOVERY_MAX_CANDIDATES,
+                              refresh: bool = False) -> List[Tuple[str, int, str]]:
+    """
+    Registry folders worth offering for dump_root, as (folder, json_files, likely_kind), sorted by folder.
+    A Registry Dump layout (items/, blocks/, entities/, worldgen/... at the top) is recognized from the first
+    directory listing: each top-level folder is one candidate and its subfolders (worldgen/*) are not listed,
+    since scanning a folder includes them. Any other layout is searched breadth-first with os.scandir, at most
+    max_depth levels deep and up to max_candidates folders. File counts stop at DISCOVERY_COUNT_LIMIT.
+    Results are cached per dump root until it or one of its top-level folders changes.
+    likely_kind is resolved the way collect_dump_files_by_kind resolves it, so registries it would skip
+    (fluids, enchantments, ...) come out as UNKNOWN_KIND, never as "item".
+    """
+    key = os.path.abspath(dump_root)
+    try:
+        signature = _dump_signature(key)
+    except OSError:
+        return []
+    with _discovery_lock:
+        cached = _discovery_cache.get(key)
+    if cached is not None and cached[0] == signature and not refresh:
+        return list(cached[1])
+
+    with os.scandir(key) as it:
+        entries = sorted(it, key=lambda e: e.name.lower())
+    top_dirs = [e for e in entries if e.is_dir()]
+    top_json = [e.name for e in entries if e.is_file() and e.name.lower().endswith(".json")]
+    candidates: List[Tuple[str, int, str]] = []
+    if top_json:
+        # like collect_dump_files_by_kind: files at the top are typed by their own names
+        top_kinds = {infer_kind_from_path(fn) for fn in top_json}
+        candidates.append((dump_root, len(top_json), top_kinds.pop() if len(top_kinds) == 1 else UNKNOWN_KIND))
+    if any(e.name.lower() in REGISTRY_DUMP_FOLDERS for e in top_dirs):
+        for e in top_dirs:
+            count = _count_json_files(e.path, max_depth - 1, DISCOVERY_COUNT_LIMIT)
+            if count:
+                candidates.append((os.path.join(dump_root, e.name), count, infer_kind_from_path(e.name)))
+    else:
+        level = [(os.path.join(dump_root, e.name), e.name) for e in top_dirs]
+        depth = 1
+        while level and depth <= max_depth and len(candidates) < max_candidates:
+            next_level = []
+            for folder, rel in level:
+                count = 0
+                try:
+                    with os.scandir(folder) as it:
+                        for e in it:
+                            if e.is_file():
+                                if e.name.lower().endswith(".json"):
+                                    count += 1
+                            elif e.is_dir():
+                                next_level.append((os.path.join(folder, e.name), f"{rel}/{e.name}"))
+                except OSError:
+                    continue
+                if count:
+                    candidates.append((folder, min(count, DISCOVERY_COUNT_LIMIT), infer_kind_from_path(rel)))
+                    if len(candidates) >= max_candidates:
+                        break
+            level = sorted(next_level, key=lambda fr: fr[1].lower())
+            depth += 1
+    candidates.sort(key=lambda c: c[0].lower())
+    with _discovery_lock:
+        _discovery_cache[key] = (signature, candidates)
+    return list(candidates)
+
+def collect_dump_files_by_kind(dump_root: str, skipped: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """
+    kind -> dump files, for every registry folder under dump_root.
+    Each folder's kind is inferred from its path relative to dump_root (so worldgen/biome is "biome"),
+    files sitting directly in dump_root from their own name. Kinds come out in KINDS order.
+    Folders (and top-level files) of no known kind are left out and their relative paths added to `skipped`.
+    """
+    by_kind: Dict[str, List[str]] = {}
+    for folder in find_registry_candidates(dump_root):
+        rel = os.path.relpath(folder, dump_root)
+        for fn in sorted(os.listdir(folder)):
+            if not fn.lower().endswith(".json"):
+                continue
+            kind = infer_kind_from_path(fn if rel == "." else rel)
+            if kind not in KINDS:
+                if skipped is not None:
+                    name = fn if rel == "." else rel.replace("\\", "/")
+                    if name not in skipped:
+                        skipped.append(name)
+                continue
+            by_kind.setdefault(kind, []).append(os.path.join(folder, fn))
+    return {k: by_kind[k] for k in KINDS if k in by_kind}
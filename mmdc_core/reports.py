@@ -0,0 +1,157 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Mapping
+from typing import Iterable, Dict, Tuple, List, Optional, Set, Callable
+
+from .common import REPORT_BUFFER_SIZE
+from .langs import resolve_worker_count
+from .names import NameNormalizer, changed_name_ids, group_dupes_by_name, name_normalizer
+
+##############################
+# Reports
+##############################
+
+def _write_report_file(path: str, header: str, blocks: Iterable[str]):
+    with open(path, "w", encoding="utf-8", buffering=REPORT_BUFFER_SIZE) as f:
+        f.write(header)
+        f.writelines(blocks)
+
+def report_settings_line(case_insensitive: bool,
+                         treat_underscores_as_spaces: bool,
+                         normalizer: Optional[NameNormalizer] = None) -> str:
+    normalizer = normalizer or name_normalizer(case_insensitive, treat_underscores_as_spaces)
+    return f"# Compare settings: {normalizer.label}\n\n"
+
+def format_after_rp_blocks(after_dupes: Dict[str, List[str]],
+                           after_names: Mapping,
+                           changed: Set[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    (blocks, per_mod): the AFTER RP report block of every group, sorted by name,
+    and modid -> the blocks of its cross-mod groups, in the same order.
+    """
+    # one sort per group set; per-mod lists are filled in this order, so they come out sorted too
+    after_blocks: List[str] = []
+    per_mod: Dict[str, List[str]] = {}
+    for norm_name in sorted(after_dupes, key=str.lower):
+        ids = sorted(after_dupes[norm_name])
+        lines = [f"{norm_name}\n"]
+        for item_id in ids:
+            mark = " (changed)" if item_id in changed else ""
+            lines.append(f"  - {item_id}  -> \"{after_names.get(item_id, '')}\"{mark}\n")
+        lines.append("\n")
+        block = "".join(lines)
+        after_blocks.append(block)
+        mods_present = {i.split(":", 1)[0] for i in ids}
+        if len(mods_present) >= 2:
+            for m in mods_present:
+                per_mod.setdefault(m, []).append(block)
+    return after_blocks, per_mod
+
+def write_after_rp_master(output_dir: str, kind: str, after_blocks: List[str],
+                          case_insensitive: bool, treat_underscores_as_spaces: bool,
+                          normalizer: Optional[NameNormalizer] = None) -> str:
+    after_master = os.path.join(output_dir, "AFTER_RP_duplicates.txt")
+    _write_report_file(after_master,
+                       f"# Duplicates by name AFTER applying RP overrides | kind={kind}\n"
+                       + report_settings_line(case_insensitive, treat_underscores_as_spaces, normalizer),
+                       after_blocks)
+    return after_master
+
+def write_reports(output_dir: str,
+                  registry_folder: str,
+                  kind: str,
+                  before_names: Mapping,
+                  after_names: Mapping,
+                  case_insensitive: bool,
+                  treat_underscores_as_spaces: bool,
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  before_dupes: Optional[Dict[str, List[str]]] = None,
+                  after_dupes: Optional[Dict[str, List[str]]] = None,
+                  workers: int = 1,
+                  normalizer: Optional[NameNormalizer] = None) -> Tuple[str, str, str, str]:
+    """
+    progress(files_written, files_total) is called after each report file.
+    before_dupes/after_dupes may be passed in if the caller already grouped the names;
+    otherwise both are grouped with `normalizer` (default: the two compare flags), which is memoized,
+    so names that are the same before and after RP are normalized once.
+    Every group is sorted and formatted once; the AFTER RP blocks are shared by the master file
+    and the per-mod files, which are written by `workers` threads (1 = sequentially).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    if before_dupes is None:
+        before_dupes = group_dupes_by_name(before_names, case_insensitive, treat_underscores_as_spaces, normalizer)
+    if after_dupes is None:
+        after_dupes = group_dupes_by_name(after_names, case_insensitive, treat_underscores_as_spaces, normalizer)
+    changed = changed_name_ids(before_names, after_names)
+    after_blocks, per_mod = format_after_rp_blocks(after_dupes, after_names, changed)
+    mod_order = sorted(per_mod, key=str.lower)
+
+    files_total = 4 + len(per_mod)
+    files_written = 0
+
+    def file_done():
+        nonlocal files_written
+        files_written += 1
+        if progress is not None:
+            progress(files_written, files_total)
+
+    settings_line = report_settings_line(case_insensitive, treat_underscores_as_spaces, normalizer)
+
+    # 1) Baseline master
+    base_master = os.path.join(output_dir, "BASELINE_duplicates.txt")
+    _write_report_file(
+        base_master,
+        f"# Baseline duplicates by name (before RP) | kind={kind} | scanned: {os.path.abspath(registry_folder)}\n" + settings_line,
+        ("".join([f"{norm_name}\n"] + [f"  - {item_id}\n" for item_id in sorted(before_dupes[norm_name])] + ["\n"])
+         for norm_name in sorted(before_dupes, key=str.lower))
+    )
+    file_done()
+
+    # 2) After-RP master
+    after_master = write_after_rp_master(output_dir, kind, after_blocks, case_insensitive, treat_underscores_as_spaces, normalizer)
+    file_done()
+
+    # 3) Per-mod after-RP
+    by_mod_dir = os.path.join(output_dir, "by_mod_AFTER_RP")
+    os.makedirs(by_mod_dir, exist_ok=True)
+    index_path = os.path.join(by_mod_dir, "_index.txt")
+    _write_report_file(index_path, "# Per-Mod duplicate report (AFTER RP)\n", (f"{modid}: {modid}.txt\n" for modid in mod_order))
+    file_done()
+    # a mod left without duplicates since the last run into this folder must not keep its old file
+    current = {f"{modid}.txt" for modid in mod_order}
+    for fn in os.listdir(by_mod_dir):
+        if fn.endswith(".txt") and fn != "_index.txt" and fn not in current:
+            try:
+                os.remove(os.path.join(by_mod_dir, fn))
+            except OSError:
+                pass
+    jobs = [(os.path.join(by_mod_dir, f"{modid}.txt"), f"# Duplicates for mod AFTER RP: {modid}\n\n", per_mod[modid])
+            for modid in mod_order]
+    workers = min(resolve_worker_count(workers), len(jobs))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_write_report_file, *job) for job in jobs]
+            try:
+                for fut in as_completed(futures):
+                    fut.result()
+                    file_done()
+            except BaseException:
+                for fut in futures:
+                    fut.cancel()
+                raise
+    else:
+        for job in jobs:
+            _write_report_file(*job)
+            file_done()
+
+    # 4) Diff of changes
+    changed_file = os.path.join(output_dir, "RP_changes_diff.txt")
+    _write_report_file(
+        changed_file,
+        "# Items whose display name changed due to RP\n\n",
+        (f"{item_id}\n  BEFORE: {before_names.get(item_id)}\n  AFTER : {after_names.get(item_id)}\n\n" for item_id in sorted(changed))
+    )
+    file_done()
+
+    return base_master, after_master, by_mod_dir, changed_file
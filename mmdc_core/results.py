@@ -0,0 +1,273 @@
+import os
+import re
+import bisect
+import time
+import sqlite3
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Dict, Tuple, List, Optional, Set
+
+from .registry import RegistryStore
+from .names import NameNormalizer, build_mod_index, name_normalizer
+from .reports import write_reports
+
+##############################
+# SQLite results
+##############################
+
+RESULTS_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    kind TEXT PRIMARY KEY,
+    scanned TEXT NOT NULL,
+    case_insensitive INTEGER NOT NULL,
+    underscores_as_spaces INTEGER NOT NULL,
+    created TEXT NOT NULL,
+    nfkc INTEGER NOT NULL DEFAULT 0,
+    strip_formatting_codes INTEGER NOT NULL DEFAULT 0,
+    fold_whitespace INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS registry (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    modid TEXT NOT NULL,
+    path TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE TABLE IF NOT EXISTS names (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    before_name TEXT NOT NULL,
+    after_name TEXT NOT NULL,
+    before_norm TEXT NOT NULL,
+    after_norm TEXT NOT NULL,
+    changed INTEGER NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE TABLE IF NOT EXISTS dupe_groups (
+    group_id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    stage TEXT NOT NULL CHECK (stage IN ('before', 'after')),
+    norm_name TEXT NOT NULL,
+    mod_count INTEGER NOT NULL,
+    cross_mod INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dupe_members (
+    group_id INTEGER NOT NULL REFERENCES dupe_groups(group_id),
+    id TEXT NOT NULL,
+    modid TEXT NOT NULL
+);
+"""
+
+RESULTS_DB_INDEXES = """
+CREATE INDEX IF NOT EXISTS registry_modid ON registry (modid, kind);
+CREATE INDEX IF NOT EXISTS names_before_norm ON names (before_norm, kind);
+CREATE INDEX IF NOT EXISTS names_after_norm ON names (after_norm, kind);
+CREATE INDEX IF NOT EXISTS dupe_groups_lookup ON dupe_groups (kind, stage, norm_name);
+CREATE INDEX IF NOT EXISTS dupe_members_group ON dupe_members (group_id);
+CREATE INDEX IF NOT EXISTS dupe_members_id ON dupe_members (id);
+CREATE INDEX IF NOT EXISTS dupe_members_modid ON dupe_members (modid);
+"""
+
+# scans columns added after the first version of the file (column -> definition), added to older files on open;
+# a file without them was written before these normalizer steps existed, so 0 (off) is what it used
+RESULTS_DB_SCAN_COLUMNS = {
+    "nfkc": "INTEGER NOT NULL DEFAULT 0",
+    "strip_formatting_codes": "INTEGER NOT NULL DEFAULT 0",
+    "fold_whitespace": "INTEGER NOT NULL DEFAULT 0",
+}
+
+def _upgrade_results_db(conn: sqlite3.Connection):
+    """
+    Adds the RESULTS_DB_SCAN_COLUMNS an older database lacks to its scans table.
+    """
+    have = {row[1] for row in conn.execute("PRAGMA table_info(scans)")}
+    with conn:
+        for column, definition in RESULTS_DB_SCAN_COLUMNS.items():
+            if have and column not in have:
+                conn.execute(f"ALTER TABLE scans ADD COLUMN {column} {definition}")
+
+def write_results_db(db_path: str,
+                     kind: str,
+                     scanned: str,
+                     store: RegistryStore,
+                     before_names: Mapping,
+                     after_names: Mapping,
+                     before_dupes: Dict[str, List[str]],
+                     after_dupes: Dict[str, List[str]],
+                     case_insensitive: bool,
+                     treat_underscores_as_spaces: bool,
+                     normalizer: Optional[NameNormalizer] = None) -> str:
+    """
+    Stores one kind's scan in an indexed SQLite database, replacing that kind's previous rows.
+    Other kinds already in the file are kept, so an all-kinds run fills one database.
+    The compare settings (the two flags plus the normalizer's NFKC/formatting/whitespace steps) are stored
+    with the scan, so write_reports_from_db groups and labels the reports the same way.
+    """
+    normalizer = normalizer or name_normalizer(case_insensitive, treat_underscores_as_spaces)
+    steps = normalizer.settings
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(RESULTS_DB_SCHEMA)
+        _upgrade_results_db(conn)
+        with conn:
+            conn.execute("DELETE FROM dupe_members WHERE group_id IN (SELECT group_id FROM dupe_groups WHERE kind = ?)", (kind,))
+            for table in ("dupe_groups", "names", "registry", "scans"):
+                conn.execute(f"DELETE FROM {table} WHERE kind = ?", (kind,))
+            conn.execute("INSERT INTO scans (kind, scanned, case_insensitive, underscores_as_spaces, created, "
+                         "nfkc, strip_formatting_codes, fold_whitespace) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (kind, os.path.abspath(scanned), int(case_insensitive), int(treat_underscores_as_spaces),
+                          time.strftime("%Y-%m-%d %H:%M:%S"), int(steps.get("nfkc_forms", False)),
+                          int(steps.get("strip_formatting", False)), int(steps.get("fold_spaces", False))))
+            conn.executemany("INSERT INTO registry VALUES (?, ?, ?, ?, ?)",
+                             ((kind, item_id, modid, path, store.source_file(r)) for r, item_id, modid, path in store.rows()))
+
+            normalize = normalizer.normalize
+
+            def name_rows():
+                for item_id, b in before_names.items():
+                    a = after_names.get(item_id, b)
+                    yield (kind, item_id, b, a, normalize(b), normalize(a), int(a != b))
+            conn.executemany("INSERT INTO names VALUES (?, ?, ?, ?, ?, ?, ?)", name_rows())
+
+            for stage, groups in (("before", before_dupes), ("after", after_dupes)):
+                for norm_name, ids in groups.items():
+                    mods = {i.split(":", 1)[0] for i in ids}
+                    cur = conn.execute("INSERT INTO dupe_groups (kind, stage, norm_name, mod_count, cross_mod) VALUES (?, ?, ?, ?, ?)",
+                                       (kind, stage, norm_name, len(mods), int(len(mods) >= 2)))
+                    conn.executemany("INSERT INTO dupe_members VALUES (?, ?, ?)",
+                                     ((cur.lastrowid, i, i.split(":", 1)[0]) for i in ids))
+        conn.executescript(RESULTS_DB_INDEXES)
+    finally:
+        conn.close()
+    return db_path
+
+def write_reports_from_db(db_path: str, kind: str, output_dir: str, workers: int = 1) -> Tuple[str, str, str, str]:
+    """
+    Regenerates the text reports for one kind from a results database written by write_results_db,
+    with the compare settings (and so the normalizer) of the stored scan.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        _upgrade_results_db(conn)
+        row = conn.execute("SELECT scanned, case_insensitive, underscores_as_spaces, nfkc, strip_formatting_codes, "
+                           "fold_whitespace FROM scans WHERE kind = ?", (kind,)).fetchone()
+        if row is None:
+            raise ValueError(f"no {kind} scan in {db_path}")
+        scanned, case_insensitive, underscores_as_spaces = row[0], bool(row[1]), bool(row[2])
+        normalizer = name_normalizer(case_insensitive, underscores_as_spaces, bool(row[3]), bool(row[4]), bool(row[5]))
+        before_names: Dict[str, str] = {}
+        after_names: Dict[str, str] = {}
+        for item_id, b, a in conn.execute("SELECT id, before_name, after_name FROM names WHERE kind = ?", (kind,)):
+            before_names[item_id] = b
+            after_names[item_id] = a
+        dupes: Dict[str, Dict[str, List[str]]] = {"before": {}, "after": {}}
+        for stage, norm_name, item_id in conn.execute(
+                "SELECT g.stage, g.norm_name, m.id FROM dupe_groups g JOIN dupe_members m ON m.group_id = g.group_id "
+                "WHERE g.kind = ?", (kind,)):
+            dupes[stage].setdefault(norm_name, []).append(item_id)
+    finally:
+        conn.close()
+    return write_reports(output_dir, scanned, kind, before_names, after_names,
+                         case_insensitive=case_insensitive,
+                         treat_underscores_as_spaces=underscores_as_spaces,
+                         before_dupes=dupes["before"],
+                         after_dupes=dupes["after"],
+                         workers=workers,
+                         normalizer=normalizer)
+
+##############################
+# Results index
+##############################
+
+_WORD = re.compile(r"\w+")
+
+class ResultsIndex:
+    """
+    In-memory index over one kind's AFTER RP duplicate groups, so a finished scan can be browsed without
+    reading the reports back: word-prefix search over the group names and their members' names before RP,
+    per-mod drill-down from build_mod_index and whether the RP changed any member's name.
+    Rows are the groups sorted by name; every query returns row numbers.
+    """
+    def __init__(self, kind: str, before_names: Mapping, after_names: Mapping, after_dupes: Dict[str, List[str]]):
+        self.kind = kind
+        self.before = before_names
+        self.after = after_names
+        names = sorted(after_dupes, key=lambda s: s.lower())
+        self.groups: List[Tuple[str, List[str]]] = [(n, after_dupes[n]) for n in names]
+        row_of = {n: r for r, n in enumerate(names)}
+        self.mods: List[List[str]] = []
+        self.cross_mod: Set[int] = set()
+        self.changed: Set[int] = set()
+        token_rows: Dict[str, Set[int]] = defaultdict(set)
+        for r, (name, ids) in enumerate(self.groups):
+            mods = sorted({i.split(":", 1)[0] for i in ids})
+            self.mods.append(mods)
+            if len(mods) > 1:
+                self.cross_mod.add(r)
+            if any(before_names.get(i) != after_names.get(i) for i in ids):
+                self.changed.add(r)
+            for word in _WORD.findall(name.lower()):
+                token_rows[word].add(r)
+            for i in ids:
+                for word in _WORD.findall((before_names.get(i) or "").lower()):
+                    token_rows[word].add(r)
+        self.tokens = sorted(token_rows)
+        self.token_rows = token_rows
+        self.by_mod: Dict[str, List[int]] = {m: sorted(row_of[n] for n in groups)
+                                             for m, groups in build_mod_index(after_dupes).items()}
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def search(self, text: str) -> Optional[Set[int]]:
+        """
+        Rows where every word of `text` starts a word of the group name or a member's name before RP;
+        None for an empty search.
+        """
+        rows = None
+        for word in _WORD.findall(text.lower()):
+            matched: Set[int] = set()
+            start = bisect.bisect_left(self.tokens, word)
+            for token in self.tokens[start:]:
+                if not token.startswith(word):
+                    break
+                matched |= self.token_rows[token]
+            rows = matched if rows is None else rows & matched
+            if not rows:
+                return set()
+        return rows
+
+    def query(self,
+              text: str = "",
+              modid: Optional[str] = None,
+              changed: Optional[bool] = None,
+              cross_mod_only: bool = False) -> List[int]:
+        """
+        Sorted rows matching all given filters; `modid` keeps the cross-mod groups that mod takes part in.
+        """
+        rows: Optional[Set[int]] = self.search(text)
+        if modid:
+            in_mod = set(self.by_mod.get(modid, ()))
+            rows = in_mod if rows is None else rows & in_mod
+        if cross_mod_only:
+            rows = set(self.cross_mod) if rows is None else rows & self.cross_mod
+        if changed is not None:
+            if rows is None:
+                rows = set(range(len(self.groups)))
+            rows = rows & self.changed if changed else rows - self.changed
+        return list(range(len(self.groups))) if rows is None else sorted(rows)
+
+    def row_values(self, row: int) -> Tuple[str, int, str, str]:
+        """
+        (name, number of IDs, mods, "changed"/"unchanged") for a row.
+        """
+        name, ids = self.groups[row]
+        return name, len(ids), ", ".join(self.mods[row]), "changed" if row in self.changed else "unchanged"
+
+    def members(self, row: int) -> List[Tuple[str, str, str, str]]:
+        """
+        (id, modid, name before RP, name after RP) for every ID of a row's group.
+        """
+        return [(i, i.split(":", 1)[0], self.before.get(i) or "", self.after.get(i) or "") for i in self.groups[row][1]]
@@ -0,0 +1,369 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from collections import defaultdict
+from typing import Iterable, Dict, Tuple, List, Optional, Set, Callable
+
+from .common import DEFAULT_LOCALE, KINDS, SERVE_HOST, SERVE_PORT, lang_key_for, warn_to_stderr
+from .registry import NameTable, RegistryStore
+from .langs import LangCache, jar_fingerprint, load_mod_langs, parse_rp_stack
+from .names import compute_display_names
+from .options import ScanOptions
+from .incremental import diff_mod_jars
+from .watch import RPWatcher, scan_kind_stores, stores_lang_keys
+
+##############################
+# Query service
+##############################
+
+class NameService:
+    """
+    The duplicate state of one pack, loaded once and kept in memory for the serve command: per kind,
+    the BEFORE/AFTER RP names (en_us), their compare-names and the rows indexed by compare-name,
+    by mod and by lang key, so a query only touches the rows it returns.
+    refresh() re-reads just the jars whose size/mtime changed and the RP files that were saved,
+    and renames/regroups only the rows they affect. Safe to query from several threads.
+    """
+    def __init__(self,
+                 opts,
+                 lang_cache_path: Optional[str] = None,
+                 log: Callable[[str], None] = print,
+                 warn: Callable[[str], None] = warn_to_stderr):
+        self.opts = opts = ScanOptions.from_dict(opts)
+        self.lang_cache_path = lang_cache_path
+        self.log = log
+        self.mods = opts.mods_folder
+        self.workers = opts.lang_workers
+        self.nested_depth = opts.nested_jar_depth
+        self.normalizer = opts.normalizer()
+        self.warn_missing = warn if opts.check_missing_lang else None
+        # `lock` guards the query state; `update_lock` keeps load()/refresh() one at a time. Jars and RP files
+        # are read under update_lock only, so queries just wait for the (short) swap or regrouping.
+        self.lock = threading.Lock()
+        self.update_lock = threading.Lock()
+        self.scanned = ""
+        self.kinds: Dict[str, dict] = {}
+        self.needed: Dict[str, Set[str]] = {}
+        self.jar_table: Dict[str, list] = {}
+        self.mod_langs: Dict[str, Dict[str, str]] = {}
+        self.overrides: Dict[str, str] = {}
+        self.cache: Optional[LangCache] = None
+        self.watcher: Optional[RPWatcher] = None
+        self.loaded = 0.0
+        self.refreshed = 0.0
+
+    def _rp_stack(self) -> List[str]:
+        if not self.opts.enable_rp:
+            return []
+        return [p for p in parse_rp_stack(self.opts.rp_path) if p.lower() != "none"]
+
+    def _poll_rp(self, watcher: RPWatcher, kinds: Dict[str, dict]) -> Optional[Dict[str, str]]:
+        """
+        The overrides of the scanned keys if a pack of the stack changed since the last poll, else None.
+        """
+        overrides = watcher.poll()
+        for error in watcher.errors:
+            self.log(f"Warning: {error}")
+        watcher.errors.clear()
+        if overrides is None:
+            return None
+        return {k: v for k, v in overrides.items() if any(k in state["key_rows"] for state in kinds.values())}
+
+    def _kind_state(self, kind: str, store: RegistryStore) -> dict:
+        key_rows: Dict[str, List[int]] = defaultdict(list)
+        mod_rows: Dict[str, List[int]] = defaultdict(list)
+        for r, _, modid, path in store.rows():
+            key_rows[lang_key_for(kind, modid, path)].append(r)
+            mod_rows[modid].append(r)
+        return {"store": store, "key_rows": dict(key_rows), "mod_rows": dict(mod_rows)}
+
+    def _set_names(self, state: dict, before: NameTable, after: NameTable):
+        normalize = self.normalizer.normalize
+        state["before"] = before.names
+        state["after"] = after.names
+        state["norms"] = [normalize(nm) for nm in after.names]
+        members: Dict[str, Set[int]] = defaultdict(set)
+        for r, norm in enumerate(state["norms"]):
+            members[norm].add(r)
+        state["members"] = members
+
+    def _rename(self, state: dict, rows: Iterable[int], before: List[Optional[str]], after: List[Optional[str]]) -> int:
+        """
+        Takes the new names of `rows` and moves the renamed ones between compare-name groups. Returns how many were renamed.
+        """
+        normalize = self.normalizer.normalize
+        members, norms = state["members"], state["norms"]
+        renamed = 0
+        for r in rows:
+            state["before"][r] = before[r]
+            if after[r] == state["after"][r]:
+                continue
+            state["after"][r] = after[r]
+            renamed += 1
+            norm = normalize(after[r])
+            old = norms[r]
+            if norm != old:
+                members[old].discard(r)
+                if not members[old]:
+                    del members[old]
+                members[norm].add(r)
+                norms[r] = norm
+        return renamed
+
+    def load(self) -> dict:
+        """
+        (Re)loads everything: registry, mod langs (through the lang cache) and the RP stack.
+        Returns {"ids", "jars", "mods_with_langs", "rp_overrides", "seconds"}.
+        """
+        with self.update_lock:
+            started = time.perf_counter()
+            scanned, stores = scan_kind_stores(self.opts, self.log)
+            kinds = {kind: self._kind_state(kind, store) for kind, store in stores.items()}
+            # targeted whatever the settings: the service never needs more than the registry's own keys
+            needed = stores_lang_keys(stores)
+            cache = None
+            if self.lang_cache_path and self.opts.use_lang_cache:
+                cache = LangCache(self.lang_cache_path, use_hash=self.opts.lang_cache_hash,
+                                  nested_depth=self.nested_depth)
+            jar_namespaces: Dict[str, List[str]] = {}
+            mod_langs = load_mod_langs(self.mods, cache=cache, workers=self.workers, needed=needed,
+                                       jar_namespaces=jar_namespaces,
+                                       nested_depth=self.nested_depth).get(DEFAULT_LOCALE, {})
+            if cache is not None:
+                cache.save()
+            jar_table: Dict[str, list] = {}
+            for jar_path, namespaces in jar_namespaces.items():
+                try:
+                    size, mtime_ns = jar_fingerprint(jar_path)
+                except OSError:
+                    continue
+                jar_table[jar_path] = [size, mtime_ns, namespaces]
+            watcher = RPWatcher(self._rp_stack())
+            overrides = self._poll_rp(watcher, kinds) or {}
+            for kind, state in kinds.items():
+                self._set_names(state, *compute_display_names(kind, state["store"], mod_langs, overrides,
+                                                              warn_missing=self.warn_missing))
+            with self.lock:
+                self.scanned = scanned
+                self.kinds = kinds
+                self.needed = needed
+                self.jar_table = jar_table
+                self.mod_langs = mod_langs
+                self.overrides = overrides
+                self.cache = cache
+                self.watcher = watcher
+                self.loaded = self.refreshed = time.time()
+            seconds = time.perf_counter() - started
+            ids = sum(len(state["store"]) for state in kinds.values())
+            self.log(f"Loaded {ids} IDs ({', '.join(kinds) or 'no kinds'}), langs of {len(mod_langs)} mods "
+                     f"from {len(jar_table)} jars and {len(overrides)} relevant RP overrides in {seconds:.2f}s.")
+            return {"ids": ids, "jars": len(jar_table), "mods_with_langs": len(mod_langs),
+                    "rp_overrides": len(overrides), "seconds": seconds}
+
+    def refresh(self) -> dict:
+        """
+        Picks up changed jars and RP files without reloading the rest (the registry stays as loaded).
+        Returns {"jars_changed", "mods_affected", "rp_keys_changed", "ids_recomputed", "ids_renamed", "seconds"}.
+        """
+        with self.update_lock:
+            started = time.perf_counter()
+            jar_table, affected, jars_changed = diff_mod_jars(self.jar_table, self.mods, self.nested_depth)
+            mod_langs = self.mod_langs
+            load_needed = {m: self.needed[m] for m in affected if m in self.needed}
+            if affected:
+                mod_langs = {m: lang for m, lang in self.mod_langs.items() if m not in affected}
+            if load_needed:
+                mod_langs.update(load_mod_langs(self.mods, cache=self.cache, workers=self.workers, needed=load_needed,
+                                                nested_depth=self.nested_depth).get(DEFAULT_LOCALE, {}))
+                if self.cache is not None:
+                    self.cache.save()
+            polled = self._poll_rp(self.watcher, self.kinds)
+            overrides = self.overrides if polled is None else polled
+            changed_keys = [k for k in overrides.keys() | self.overrides.keys() if overrides.get(k) != self.overrides.get(k)]
+            recomputed = renamed = 0
+            with self.lock:
+                for kind, state in self.kinds.items():
+                    rows: Set[int] = set()
+                    for modid in affected:
+                        rows.update(state["mod_rows"].get(modid, ()))
+                    for key in changed_keys:
+                        rows.update(state["key_rows"].get(key, ()))
+                    if not rows:
+                        continue
+                    before, after = compute_display_names(kind, state["store"], mod_langs, overrides, rows=rows,
+                                                          warn_missing=self.warn_missing)
+                    recomputed += len(rows)
+                    renamed += self._rename(state, rows, before.names, after.names)
+                self.jar_table = jar_table
+                self.mod_langs = mod_langs
+                self.overrides = overrides
+                self.refreshed = time.time()
+            seconds = time.perf_counter() - started
+            self.log(f"Refreshed: {jars_changed} jars changed ({len(affected)} mods affected), {len(changed_keys)} RP "
+                     f"overrides changed; {recomputed} IDs recomputed, {renamed} renamed in {seconds * 1000:.0f} ms.")
+            return {"jars_changed": jars_changed, "mods_affected": len(affected), "rp_keys_changed": len(changed_keys),
+                    "ids_recomputed": recomputed, "ids_renamed": renamed, "seconds": seconds}
+
+    def _states(self, kind: Optional[str]) -> List[Tuple[str, dict]]:
+        if kind is None:
+            return list(self.kinds.items())
+        if kind not in KINDS:
+            raise ValueError(f"unknown kind: {kind}")
+        return [(kind, self.kinds[kind])] if kind in self.kinds else []
+
+    @staticmethod
+    def _row(kind: str, state: dict, r: int) -> dict:
+        store = state["store"]
+        return {"kind": kind, "id": store.ids[r], "mod": store.modid(r),
+                "name": state["after"][r], "before_rp": state["before"][r]}
+
+    def query_name(self, name: str, kind: Optional[str] = None) -> dict:
+        """
+        Every ID whose AFTER RP name compares equal to `name` (is the name taken?).
+        """
+        norm = self.normalizer.normalize(name)
+        with self.lock:
+            matches = [self._row(k, state, r) for k, state in self._states(kind)
+                       for r in sorted(state["members"].get(norm, ()))]
+        return {"query": name, "normalized": norm, "taken": bool(matches), "matches": matches}
+
+    def query_id(self, item_id: str, kind: Optional[str] = None) -> dict:
+        """
+        An ID's names and lang key per kind it is registered in, with the IDs sharing its AFTER RP name.
+        """
+        matches = []
+        with self.lock:
+            for k, state in self._states(kind):
+                store = state["store"]
+                if item_id not in store:
+                    continue
+                r = store.row(item_id)
+                row = self._row(k, state, r)
+                row["lang_key"] = lang_key_for(k, row["mod"], store.path(r))
+                row["duplicates"] = [self._row(k, state, o) for o in sorted(state["members"][state["norms"][r]]) if o != r]
+                matches.append(row)
+        return {"id": item_id, "found": bool(matches), "matches": matches}
+
+    def query_mod(self, modid: str, kind: Optional[str] = None) -> dict:
+        """
+        The AFTER RP duplicate groups a mod's IDs are in, cross-mod or not.
+        """
+        groups = []
+        ids = 0
+        with self.lock:
+            for k, state in self._states(kind):
+                rows = state["mod_rows"].get(modid, ())
+                ids += len(rows)
+                mod_index = state["store"].mod_index
+                seen: Set[str] = set()
+                for r in rows:
+                    norm = state["norms"][r]
+                    if norm in seen:
+                        continue
+                    seen.add(norm)
+                    members = sorted(state["members"][norm])
+                    if len(members) < 2:
+                        continue
+                    groups.append({"kind": k, "name": norm,
+                                   "cross_mod": any(mod_index[o] != mod_index[r] for o in members),
+                                   "members": [self._row(k, state, o) for o in members]})
+        return {"mod": modid, "ids": ids, "cross_mod_groups": sum(g["cross_mod"] for g in groups), "groups": groups}
+
+    def status(self) -> dict:
+        with self.lock:
+            kinds = {}
+            for k, state in self.kinds.items():
+                mod_index = state["store"].mod_index
+                groups = cross = 0
+                for rows in state["members"].values():
+                    if len(rows) < 2:
+                        continue
+                    groups += 1
+                    it = iter(rows)
+                    first = mod_index[next(it)]
+                    if any(mod_index[r] != first for r in it):
+                        cross += 1
+                kinds[k] = {"ids": len(state["store"]), "groups": groups, "cross_mod_groups": cross}
+            return {
+                "scanned": self.scanned,
+                "mods_folder": self.mods,
+                "kinds": kinds,
+                "jars": len(self.jar_table),
+                "mods_with_langs": len(self.mod_langs),
+                "rp_overrides": len(self.overrides),
+                "normalize": self.normalizer.label,
+                "loaded": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.loaded)),
+                "refreshed": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.refreshed)),
+            }
+
+class NameServiceHandler(BaseHTTPRequestHandler):
+    """
+    JSON over HTTP for the server's NameService. GET /name?q=<name>, /id?id=<modid:path>, /mod?mod=<modid>
+    (each with an optional &kind=) and /status answer from memory; POST /refresh and /reload update it.
+    """
+    server_version = "mmdc"
+
+    def _reply(self, code: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if code == 405:
+            self.send_header("Allow", "POST")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        service: NameService = self.server.service
+        kind = params.get("kind") or None
+        queries = {"/name": ("q", service.query_name), "/id": ("id", service.query_id), "/mod": ("mod", service.query_mod)}
+        try:
+            if url.path in queries:
+                param, query = queries[url.path]
+                if not params.get(param):
+                    self._reply(400, {"error": f"missing ?{param}="})
+                    return
+                self._reply(200, query(params[param], kind))
+            elif url.path == "/status":
+                self._reply(200, service.status())
+            elif url.path in ("/refresh", "/reload"):
+                self._reply(405, {"error": f"use POST for {url.path}"})
+            else:
+                self._reply(404, {"error": f"unknown path: {url.path}"})
+        except ValueError as ex:
+            self._reply(400, {"error": str(ex)})
+        except Exception as ex:
+            self._reply(500, {"error": f"{type(ex).__name__}: {ex}"})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        service: NameService = self.server.service
+        try:
+            if path == "/refresh":
+                self._reply(200, service.refresh())
+            elif path == "/reload":
+                self._reply(200, service.load())
+            else:
+                self._reply(404, {"error": f"unknown path: {path}"})
+        except Exception as ex:
+            self._reply(500, {"error": f"{type(ex).__name__}: {ex}"})
+
+    def log_message(self, format, *args):
+        # one line per query would drown the refresh/reload lines the service logs itself
+        pass
+
+def make_name_server(service: NameService, host: str = SERVE_HOST, port: int = SERVE_PORT) -> ThreadingHTTPServer:
+    """
+    An HTTP server (one thread per request) answering for `service`; call serve_forever() on it.
+    """
+    server = ThreadingHTTPServer((host, port), NameServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
@@ -0,0 +1,333 @@
+import os
+import json
+import time
+import zipfile
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple, List, Optional, Set, Callable
+
+from .common import DEFAULT_LOCALE, WATCH_INTERVAL, lang_key_for, registry_folder_kind, warn_to_stderr
+from .registry import (
+    NameTable,
+    RegistryStore,
+    collect_dump_files_by_kind,
+    scan_registry_files,
+    scan_registry_folder,
+)
+from .langs import LangCache, load_mod_langs, load_resource_pack_langs, needed_lang_keys, parse_rp_stack
+from .names import NameNormalizer, compute_display_names, name_normalizer
+from .reports import format_after_rp_blocks, write_after_rp_master
+from .options import ScanOptions, parse_locale_list, parse_mod_list
+
+##############################
+# Watch mode
+##############################
+
+def scan_kind_stores(opts, log: Optional[Callable[[str], None]] = None) -> Tuple[str, Dict[str, RegistryStore]]:
+    """
+    (scanned folder, kind -> store) for the long-running modes: the registry folder, or every kind under
+    the dump root with "scan_all_kinds"; excluded mods are dropped, kinds without IDs left out.
+    Dump folders of no known kind are skipped (and named to `log`).
+    """
+    opts = ScanOptions.from_dict(opts)
+    if opts.scan_all_kinds:
+        scanned = opts.dump_root
+        skipped: List[str] = []
+        files_by_kind = collect_dump_files_by_kind(scanned, skipped)
+        if skipped and log is not None:
+            log(f"Skipped registries of no known kind: {', '.join(skipped)}")
+        stores = {kind: scan_registry_files(files, scanned) for kind, files in files_by_kind.items()}
+    else:
+        scanned = opts.registry_folder
+        stores = {registry_folder_kind(scanned): scan_registry_folder(scanned)}
+    exclude_list = parse_mod_list(opts.exclude_mods)
+    if exclude_list:
+        stores = {kind: store.without_mods(exclude_list) for kind, store in stores.items()}
+    return scanned, {kind: store for kind, store in stores.items() if store}
+
+def stores_lang_keys(stores: Dict[str, RegistryStore]) -> Dict[str, Set[str]]:
+    """
+    needed_lang_keys over several kinds: modid -> every lang key their IDs use.
+    """
+    needed: Dict[str, Set[str]] = {}
+    for kind, store in stores.items():
+        for modid, keys in needed_lang_keys(kind, store).items():
+            needed.setdefault(modid, set()).update(keys)
+    return needed
+
+def rp_lang_signature(rp_path: str, locale: str = DEFAULT_LOCALE) -> Dict[str, Tuple[int, int]]:
+    """
+    path -> (mtime_ns, size) of what watch mode reloads for one pack: every assets/<namespace>/lang/<locale>.json
+    of an unpacked pack, or the zip itself. Cheap enough to call a few times a second.
+    """
+    signature: Dict[str, Tuple[int, int]] = {}
+    try:
+        if os.path.isdir(rp_path):
+            assets = os.path.join(rp_path, "assets")
+            with os.scandir(assets) as it:
+                namespaces = sorted(e.name for e in it if e.is_dir())
+            for namespace in namespaces:
+                p = os.path.join(assets, namespace, "lang", f"{locale}.json")
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                signature[p] = (st.st_mtime_ns, st.st_size)
+        else:
+            st = os.stat(rp_path)
+            signature[rp_path] = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        pass
+    return signature
+
+class RPWatcher:
+    """
+    Polls an RP stack (highest priority first) and returns its merged overrides whenever a lang file changed.
+    Unpacked packs are reloaded one lang file at a time, zips as a whole. A file that doesn't parse
+    (an editor mid-save, a stray comma) keeps its previous overrides until it does.
+    """
+    def __init__(self, rp_paths: List[str], locale: str = DEFAULT_LOCALE):
+        self.rp_paths = rp_paths
+        self.locale = locale
+        self.signatures: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self.tables: Dict[str, Dict[str, str]] = {}
+        self.errors: List[str] = []
+
+    def _load(self, rp_path: str, path: str):
+        if path == rp_path:
+            if not zipfile.is_zipfile(path):
+                self.errors.append(f"{path}: not a readable zip (yet), keeping its previous overrides.")
+                return
+            self.tables[path] = load_resource_pack_langs(path, [self.locale]).get(self.locale, {})
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lang = json.load(f)
+            if not isinstance(lang, dict):
+                raise ValueError("not a JSON object")
+        except Exception as ex:
+            self.errors.append(f"{path}: {ex}; keeping its previous overrides.")
+            return
+        self.tables[path] = lang
+
+    def poll(self) -> Optional[Dict[str, str]]:
+        """
+        The stack's overrides if any pack changed since the last poll (the first poll always returns them), else None.
+        """
+        changed = False
+        for rp_path in self.rp_paths:
+            signature = rp_lang_signature(rp_path, self.locale)
+            old = self.signatures.get(rp_path)
+            if signature == old:
+                continue
+            for path, stamp in signature.items():
+                if old is None or old.get(path) != stamp:
+                    self._load(rp_path, path)
+            for path in (old or {}):
+                if path not in signature:
+                    self.tables.pop(path, None)
+            self.signatures[rp_path] = signature
+            changed = True
+        if not changed:
+            return None
+        merged: Dict[str, str] = {}
+        for rp_path in reversed(self.rp_paths):
+            for path in self.signatures[rp_path]:
+                merged.update(self.tables.get(path, {}))
+        return merged
+
+class LiveAfterRP:
+    """
+    The AFTER RP duplicate groups of one kind, kept current while the overrides change.
+    The mod-lang (BEFORE RP) names stay in memory; apply() only renames and regroups
+    the rows whose override key changed, so a save costs time in proportion to the edit.
+    """
+    def __init__(self,
+                 kind: str,
+                 store: RegistryStore,
+                 before_names: NameTable,
+                 case_insensitive: bool,
+                 treat_underscores_as_spaces: bool,
+                 normalizer: Optional[NameNormalizer] = None):
+        self.kind = kind
+        self.store = store
+        self.before = before_names.names
+        self.after = list(self.before)
+        self.case_insensitive = case_insensitive
+        self.treat_underscores_as_spaces = treat_underscores_as_spaces
+        self.normalizer = normalizer or name_normalizer(case_insensitive, treat_underscores_as_spaces)
+        self.key_rows: Dict[str, List[int]] = defaultdict(list)
+        for r, _, modid, path in store.rows():
+            self.key_rows[lang_key_for(kind, modid, path)].append(r)
+        self.overrides: Dict[str, str] = {}
+        self.changed_rows: Set[int] = set()
+        self.norms = [self.normalizer.normalize(nm) for nm in self.before]
+        self.members: Dict[str, Set[int]] = defaultdict(set)
+        for r, norm in enumerate(self.norms):
+            self.members[norm].add(r)
+        self.groups: Dict[str, List[str]] = {}
+        self.cross: Set[str] = set()
+        for norm, rows in self.members.items():
+            self._regroup(norm, rows)
+
+    def _regroup(self, norm: str, rows: Set[int]) -> bool:
+        """
+        Refreshes groups/cross for one compare-name; True if it is a cross-mod group now.
+        """
+        if len(rows) < 2:
+            self.groups.pop(norm, None)
+            self.cross.discard(norm)
+            return False
+        ordered = sorted(rows)
+        self.groups[norm] = [self.store.ids[r] for r in ordered]
+        mods = self.store.mod_index
+        if any(mods[r] != mods[ordered[0]] for r in ordered):
+            self.cross.add(norm)
+            return True
+        self.cross.discard(norm)
+        return False
+
+    def after_names(self) -> NameTable:
+        return NameTable(self.store, self.after)
+
+    def apply(self, overrides: Dict[str, str]) -> dict:
+        """
+        Switches to a new set of overrides. Returns {"keys", "renamed", "cross_mod", "introduced", "resolved"}:
+        how many scanned keys changed, how many IDs got a new name, the cross-mod group count, and the
+        compare-names of cross-mod groups that this change created or resolved.
+        """
+        # walk the smaller side: the RP's keys or the scanned keys
+        if len(overrides) < len(self.key_rows):
+            relevant = {k: v for k, v in overrides.items() if k in self.key_rows}
+        else:
+            relevant = {k: overrides[k] for k in self.key_rows if k in overrides}
+        changed_keys = [k for k in relevant.keys() | self.overrides.keys() if relevant.get(k) != self.overrides.get(k)]
+        self.overrides = relevant
+        touched: Set[str] = set()
+        renamed = 0
+        for key in changed_keys:
+            text = relevant.get(key)
+            for r in self.key_rows[key]:
+                name = self.before[r] if text is None else text
+                if name == self.after[r]:
+                    continue
+                self.after[r] = name
+                renamed += 1
+                if name == self.before[r]:
+                    self.changed_rows.discard(r)
+                else:
+                    self.changed_rows.add(r)
+                norm = self.normalizer.normalize(name)
+                old = self.norms[r]
+                if norm != old:
+                    self.members[old].discard(r)
+                    if not self.members[old]:
+                        del self.members[old]
+                    self.members[norm].add(r)
+                    self.norms[r] = norm
+                    touched.update((old, norm))
+        introduced, resolved = [], []
+        for norm in touched:
+            was_cross = norm in self.cross
+            now_cross = self._regroup(norm, self.members.get(norm, set()))
+            if now_cross and not was_cross:
+                introduced.append(norm)
+            elif was_cross and not now_cross:
+                resolved.append(norm)
+        return {
+            "keys": len(changed_keys),
+            "renamed": renamed,
+            "cross_mod": len(self.cross),
+            "introduced": sorted(introduced, key=str.lower),
+            "resolved": sorted(resolved, key=str.lower),
+        }
+
+    def write_report(self, output_dir: str) -> str:
+        """
+        Rewrites AFTER_RP_duplicates.txt, byte for byte what a full scan with the same overrides writes.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        ids = self.store.ids
+        after_blocks, _ = format_after_rp_blocks(self.groups, self.after_names(), {ids[r] for r in self.changed_rows})
+        return write_after_rp_master(output_dir, self.kind, after_blocks, self.case_insensitive, self.treat_underscores_as_spaces,
+                                     self.normalizer)
+
+def watch_resource_pack(opts,
+                        lang_cache_path: Optional[str] = None,
+                        log: Callable[[str], None] = print,
+                        stop: Optional[threading.Event] = None,
+                        interval: float = WATCH_INTERVAL,
+                        warn: Callable[[str], None] = warn_to_stderr):
+    """
+    Watch mode for RP authors. The registry and mod langs are loaded once (en_us); after that, every save
+    of a lang file in the RP stack re-applies just the changed override keys, rewrites AFTER_RP_duplicates.txt
+    (per kind with "scan_all_kinds") and logs which cross-mod groups appeared or were resolved.
+    Runs until `stop` is set. `opts` is a ScanOptions or a settings dict (mmdc.json keys).
+    Missing-lang warnings go to `warn`, as in run_scan.
+    """
+    opts = ScanOptions.from_dict(opts)
+    all_kinds = opts.scan_all_kinds
+    mods = opts.mods_folder
+    out = opts.output_folder
+    rp_stack = parse_rp_stack(opts.rp_path)
+    case_insensitive = opts.case_insensitive
+    underscores_as_spaces = opts.underscores_as_spaces
+    normalizer = opts.normalizer()
+    stop = stop or threading.Event()
+
+    _, stores = scan_kind_stores(opts, log)
+    if not stores:
+        log("No IDs found.")
+        return
+    if parse_locale_list(opts.locales) != [DEFAULT_LOCALE]:
+        log(f"Watch mode checks {DEFAULT_LOCALE} only.")
+
+    nested_depth = opts.nested_jar_depth
+    needed = stores_lang_keys(stores) if opts.targeted_langs else None
+    cache = None
+    if lang_cache_path and opts.use_lang_cache:
+        cache = LangCache(lang_cache_path, use_hash=opts.lang_cache_hash, nested_depth=nested_depth)
+    log(f"Found {sum(len(s) for s in stores.values())} IDs. Loading mod langs...")
+    mod_langs = load_mod_langs(mods, cache=cache, workers=opts.lang_workers, needed=needed,
+                               nested_depth=nested_depth).get(DEFAULT_LOCALE, {})
+    if cache is not None:
+        cache.save()
+
+    trackers: Dict[str, LiveAfterRP] = {}
+    for kind, store in stores.items():
+        before, _ = compute_display_names(kind, store, mod_langs, {}, warn_missing=warn if opts.check_missing_lang else None)
+        trackers[kind] = LiveAfterRP(kind, store, before, case_insensitive, underscores_as_spaces, normalizer)
+    watcher = RPWatcher(rp_stack)
+    log(f"Watching {len(rp_stack)} resource pack(s) for {DEFAULT_LOCALE} changes"
+        + (f" ({', '.join(trackers)})" if all_kinds else "") + ". Stop to end watch mode.")
+    first = True
+    while not stop.is_set():
+        overrides = watcher.poll()
+        for error in watcher.errors:
+            log(f"Warning: {error}")
+        watcher.errors.clear()
+        if overrides is not None:
+            started = time.perf_counter()
+            updated = False
+            for kind, tracker in trackers.items():
+                delta = tracker.apply(overrides)
+                tracker.write_report(os.path.join(out, kind) if all_kinds else out)
+                label = f"{kind}: " if all_kinds else ""
+                if first:
+                    log(f"{label}{delta['cross_mod']} cross-mod groups after RP ({len(tracker.overrides)} relevant overrides).")
+                    continue
+                if not delta["keys"]:
+                    continue
+                updated = True
+                log(f"{label}{delta['keys']} override(s) changed, {delta['renamed']} IDs renamed; "
+                    f"{delta['cross_mod']} cross-mod groups after RP "
+                    f"(+{len(delta['introduced'])} new, -{len(delta['resolved'])} resolved).")
+                for norm in delta["introduced"]:
+                    log(f"  + {norm}: " + ", ".join(tracker.groups[norm]))
+                for norm in delta["resolved"]:
+                    log(f"  - {norm}")
+            if updated:
+                log(f"Updated in {(time.perf_counter() - started) * 1000:.0f} ms.")
+            first = False
+        stop.wait(interval)
+    log("Watch mode stopped.")
@@ -0,0 +1,118 @@
+import os
+from collections import defaultdict
+from typing import Dict, Tuple, List, Optional, Set
+
+from .common import REPORT_BUFFER_SIZE, lang_key_for
+from .registry import NameTable, RegistryStore
+from .langs import parse_rp_stack
+from .names import NameNormalizer, name_normalizer
+
+##############################
+# What-if RP stacks
+##############################
+
+class WhatIfBaseline:
+    """
+    The mod-lang names of one kind, grouped once, so candidate RP stacks can be scored by
+    re-applying only their own override keys (no jars are read again).
+    `translated` (rows whose mod has the key in this locale) enables the en_us fallback layer for translations.
+    """
+    def __init__(self,
+                 kind: str,
+                 store: RegistryStore,
+                 before_names: NameTable,
+                 case_insensitive: bool,
+                 treat_underscores_as_spaces: bool,
+                 translated: Optional[Set[int]] = None,
+                 normalizer: Optional[NameNormalizer] = None):
+        self.store = store
+        self.normalize = (normalizer or name_normalizer(case_insensitive, treat_underscores_as_spaces)).normalize
+        self.translated = translated
+        self.key_rows: Dict[str, List[int]] = defaultdict(list)
+        for r, _, modid, path in store.rows():
+            self.key_rows[lang_key_for(kind, modid, path)].append(r)
+        self.norms = [self.normalize(nm) for nm in before_names.names]
+        self.members: Dict[str, List[int]] = defaultdict(list)
+        for r, norm in enumerate(self.norms):
+            self.members[norm].append(r)
+        self.cross = {n for n, rows in self.members.items() if self._is_cross_mod(rows)}
+
+    def _is_cross_mod(self, rows: List[int]) -> bool:
+        mods = self.store.mod_index
+        return len(rows) >= 2 and any(mods[r] != mods[rows[0]] for r in rows)
+
+    def evaluate(self, overrides: Dict[str, str], fallback_overrides: Optional[Dict[str, str]] = None) -> dict:
+        """
+        Scores one RP stack: {"applied", "cross_mod", "resolved", "introduced"}, where resolved/introduced
+        are compare-names of cross-mod groups that the stack removes/creates, and introduced maps to row lists.
+        """
+        moved: Dict[int, str] = {}
+        applied = 0
+        layers = [(overrides, None)]
+        if fallback_overrides:
+            layers.append((fallback_overrides, self.translated or set()))
+        for layer, skip_rows in layers:
+            # walk the smaller side: the stack's keys or the scanned keys
+            if len(layer) < len(self.key_rows):
+                hits = ((k, self.key_rows.get(k), v) for k, v in layer.items())
+            else:
+                hits = ((k, rows, layer.get(k)) for k, rows in self.key_rows.items())
+            for key, rows, text in hits:
+                if not rows or text is None:
+                    continue
+                for r in rows:
+                    if r in moved or (skip_rows is not None and (r in skip_rows or key in overrides)):
+                        continue
+                    applied += 1
+                    norm = self.normalize(text)
+                    if norm != self.norms[r]:
+                        moved[r] = norm
+        arrivals: Dict[str, List[int]] = defaultdict(list)
+        for r, norm in moved.items():
+            arrivals[norm].append(r)
+        touched = set(arrivals)
+        touched.update(self.norms[r] for r in moved)
+        now_cross: Dict[str, List[int]] = {}
+        for norm in touched:
+            rows = [r for r in self.members.get(norm, ()) if r not in moved] + arrivals.get(norm, [])
+            if self._is_cross_mod(rows):
+                now_cross[norm] = rows
+        was_cross = self.cross & touched
+        return {
+            "applied": applied,
+            "cross_mod": len(self.cross) - len(was_cross) + len(now_cross),
+            "resolved": sorted(was_cross - now_cross.keys(), key=lambda s: s.lower()),
+            "introduced": {n: rows for n, rows in sorted(now_cross.items(), key=lambda kv: kv[0].lower()) if n not in self.cross},
+        }
+
+def parse_what_if_stacks(value) -> List[List[str]]:
+    """
+    Candidate RP stacks: a list of stack strings, or one string with stacks separated by "|".
+    """
+    stacks = value if isinstance(value, (list, tuple)) else str(value or "").split("|")
+    return [paths for paths in (parse_rp_stack(s) for s in stacks) if paths]
+
+def write_what_if_report(output_dir: str,
+                         kind: str,
+                         baseline: WhatIfBaseline,
+                         results: List[Tuple[str, dict]]) -> str:
+    whatif_file = os.path.join(output_dir, "WHATIF_rp_stacks.txt")
+    ids = baseline.store.ids
+    with open(whatif_file, "w", encoding="utf-8", buffering=REPORT_BUFFER_SIZE) as f:
+        f.write(f"# What-if: candidate RP stacks against the mod-lang baseline | kind={kind}\n")
+        f.write(f"# Baseline (no RP): {len(baseline.cross)} cross-mod duplicate groups\n")
+        f.write("# Stacks are listed highest priority first, like the in-game resource pack list.\n\n")
+        for label, res in results:
+            f.write(f"{label}: {res['cross_mod']} groups | resolved {len(res['resolved'])} | "
+                    f"new {len(res['introduced'])} | overrides applied {res['applied']}\n")
+        for label, res in results:
+            f.write(f"\n## {label}\n\n")
+            f.write("Resolved:\n")
+            for norm in res["resolved"]:
+                f.write(f"  - {norm}\n")
+            f.write("New duplicates:\n")
+            for norm, rows in res["introduced"].items():
+                f.write(f"  {norm}\n")
+                for item_id in sorted(ids[r] for r in rows):
+                    f.write(f"    - {item_id}\n")
+    return whatif_file
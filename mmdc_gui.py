@@ -0,0 +1,905 @@
+import os
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+import tkinter as tk
+from tkinter import filedialog, messagebox
+from tkinter import ttk
+
+from mmdc_core import (
+    APP_NAME,
+    KINDS,
+    LANG_CACHE_NAME,
+    NEAR_DUPE_DEFAULT_THRESHOLD,
+    NESTED_JAR_DEPTH,
+    RESULTS_DB_NAME,
+    RUN_METRICS_NAME,
+    ResultsIndex,
+    ScanCancelled,
+    discover_registry_folders,
+    load_config,
+    parse_rp_stack,
+    registry_folder_kind,
+    run_scan,
+    save_config,
+    validate_scan_options,
+    watch_resource_pack,
+)
+
+# how often the GUI drains the scan worker queue (ms)
+SCAN_POLL_MS = 100
+# typing pause before the Results tab re-filters (ms)
+RESULTS_FILTER_MS = 120
+RESULTS_ALL_MODS = "(all mods)"
+RESULTS_STATUS_FILTERS = {"All groups": None, "Renamed by RP": True, "Not renamed by RP": False}
+
+##############################
+# GUI
+##############################
+
+SCAN_STAGE_LABELS = {
+    "registry": "Scanning registry",
+    "langs": "Jars processed",
+    "names": "IDs resolved",
+    "reports": "Reports written",
+}
+
+class VirtualTree(ttk.Frame):
+    """
+    A Treeview that only holds the rows on screen: scrolling re-fills the same few items through fetch(row),
+    so a result list of 100k groups opens as fast as one of ten.
+    on_select(row) is called with the row number (not the item) when the selection moves.
+    """
+    # Treeview heading height, which the visible row count has to leave room for
+    HEADING_PX = 26
+
+    def __init__(self, master, columns: List[Tuple[str, str, int]], on_select: Optional[Callable[[int], None]] = None):
+        super().__init__(master)
+        self.tree = ttk.Treeview(self, columns=[key for key, _, _ in columns], show="headings", selectmode="browse", height=1)
+        for key, heading, width in columns:
+            self.tree.heading(key, text=heading, anchor="w")
+            self.tree.column(key, width=width, stretch=key == columns[0][0])
+        self.scroll = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scroll.grid(row=0, column=1, sticky="ns")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.on_select = on_select
+        self.fetch: Optional[Callable[[int], tuple]] = None
+        self.count = 0
+        self.top = 0
+        self.visible = 1
+        self.selected: Optional[int] = None
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+        for sequence in ("<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>"):
+            self.tree.bind(sequence, self.on_key)
+
+    def set_rows(self, count: int, fetch: Optional[Callable[[int], tuple]]):
+        self.count = count
+        self.fetch = fetch
+        self.top = 0
+        self.selected = None
+        self.render()
+
+    def row_height(self) -> int:
+        try:
+            return int(ttk.Style().lookup("Treeview", "rowheight")) or 20
+        except (tk.TclError, ValueError):
+            return 20
+
+    def render(self):
+        items = self.tree.get_children()
+        shown = max(0, min(self.visible, self.count - self.top))
+        if len(items) > shown:
+            self.tree.delete(*items[shown:])
+        for slot in range(shown):
+            values = self.fetch(self.top + slot)
+            if slot < len(items):
+                self.tree.item(items[slot], values=values)
+            else:
+                self.tree.insert("", "end", iid=f"slot{slot}", values=values)
+        if self.selected is not None and 0 <= self.selected - self.top < shown:
+            self.tree.selection_set(f"slot{self.selected - self.top}")
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        if self.count:
+            self.scroll.set(self.top / self.count, (self.top + shown) / self.count)
+        else:
+            self.scroll.set(0.0, 1.0)
+
+    def scroll_to(self, top: int):
+        top = max(0, min(top, self.count - self.visible))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def on_resize(self, event):
+        visible = max(1, (event.height - self.HEADING_PX) // self.row_height())
+        if visible != self.visible:
+            self.visible = visible
+            self.top = max(0, min(self.top, self.count - visible))
+            self.render()
+
+    def on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.count))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.scroll_to(self.top + (step * self.visible if args[2] == "pages" else step))
+
+    def on_wheel(self, event):
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            # Windows reports multiples of 120, macOS small deltas
+            step = -3 if event.delta > 0 else 3
+        self.scroll_to(self.top + step)
+        return "break"
+
+    def on_key(self, event):
+        current = self.selected if self.selected is not None else self.top - 1
+        target = {
+            "Up": current - 1,
+            "Down": current + 1,
+            "Prior": current - self.visible,
+            "Next": current + self.visible,
+            "Home": 0,
+            "End": self.count - 1,
+        }[event.keysym]
+        self.select_row(target)
+        return "break"
+
+    def select_row(self, row: int):
+        if not self.count:
+            return
+        row = max(0, min(row, self.count - 1))
+        self.selected = row
+        if row < self.top:
+            self.top = row
+        elif row >= self.top + self.visible:
+            self.top = row - self.visible + 1
+        self.render()
+        if self.on_select is not None:
+            self.on_select(row)
+
+    def on_tree_select(self, _event):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        row = self.top + self.tree.index(selection[0])
+        # render() re-selects the current row, which comes back here as an event
+        if row == self.selected:
+            return
+        self.selected = row
+        if self.on_select is not None:
+            self.on_select(row)
+
+class App(tb.Window):
+    def __init__(self):
+        # Load config BEFORE creating the window
+        self.script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.cfg = load_config(self.script_dir)
+
+        # Determine theme using plain Python values
+        dark_pref = self.cfg.get("dark_mode", True)
+        theme = "darkly" if dark_pref else "flatly"
+
+        # Now create the window
+        super().__init__(title=APP_NAME, themename=theme)
+        self.geometry("900x640")
+
+        # Now create Tk variables (window already exists)
+        self.case_insensitive = tk.BooleanVar(value=self.cfg.get("case_insensitive", True))
+        self.underscores_as_spaces = tk.BooleanVar(value=self.cfg.get("underscores_as_spaces", True))
+        self.strip_formatting_codes = tk.BooleanVar(value=self.cfg.get("strip_formatting_codes", False))
+        self.fold_whitespace = tk.BooleanVar(value=self.cfg.get("fold_whitespace", False))
+        self.normalize_nfkc = tk.BooleanVar(value=self.cfg.get("normalize_nfkc", False))
+
+        self.enable_rp = tk.BooleanVar(value=self.cfg.get("enable_rp", True))
+        self.check_missing_lang = tk.BooleanVar(value=self.cfg.get("check_missing_lang", False))
+        self.exclude_mods = tk.StringVar(value=self.cfg.get("exclude_mods", ""))
+        self.locales = tk.StringVar(value=self.cfg.get("locales", "en_us"))
+        what_if = self.cfg.get("what_if_stacks", "")
+        self.what_if_stacks = tk.StringVar(value=" | ".join(what_if) if isinstance(what_if, list) else what_if)
+        self.use_lang_cache = tk.BooleanVar(value=self.cfg.get("use_lang_cache", True))
+        self.lang_cache_hash = tk.BooleanVar(value=self.cfg.get("lang_cache_hash", False))
+        self.lang_workers = tk.IntVar(value=self.cfg.get("lang_workers", 0))
+        self.report_workers = tk.IntVar(value=self.cfg.get("report_workers", 4))
+        self.nested_jar_depth = tk.IntVar(value=self.cfg.get("nested_jar_depth", NESTED_JAR_DEPTH))
+        self.targeted_langs = tk.BooleanVar(value=self.cfg.get("targeted_langs", True))
+        self.incremental = tk.BooleanVar(value=self.cfg.get("incremental", False))
+        self.write_sqlite = tk.BooleanVar(value=self.cfg.get("write_sqlite", False))
+        self.near_duplicates = tk.BooleanVar(value=self.cfg.get("near_duplicates", False))
+        self.near_threshold = tk.DoubleVar(value=self.cfg.get("near_threshold", NEAR_DUPE_DEFAULT_THRESHOLD))
+        self.profile = tk.BooleanVar(value=self.cfg.get("profile", False))
+
+        self.dark_mode = tk.BooleanVar(value=dark_pref)
+
+        # Path vars
+        self.dump_root = tk.StringVar(value=self.cfg.get("dump_root", ""))
+        self.registry_folder = tk.StringVar(value=self.cfg.get("registry_folder", ""))
+        self.mods_folder = tk.StringVar(value=self.cfg.get("mods_folder", ""))
+        self.rp_path = tk.StringVar(value=self.cfg.get("rp_path", ""))
+        self.output_folder = tk.StringVar(value=self.cfg.get("output_folder", ""))
+
+        self.kind_inferred = tk.StringVar(value="(auto)")
+        self.candidate_info = tk.StringVar(value="")
+        self.candidates_by_path = {}
+        self.discovery_queue: "queue.Queue[tuple]" = queue.Queue()
+        self.scan_all_kinds = tk.BooleanVar(value=self.cfg.get("scan_all_kinds", False))
+
+        # Background scan state
+        self.scan_thread: Optional[threading.Thread] = None
+        self.scan_cancel: Optional[threading.Event] = None
+        self.scan_queue: "queue.Queue[tuple]" = queue.Queue()
+        self.progress_text = tk.StringVar(value="Idle")
+        self.progress_value = tk.DoubleVar(value=0.0)
+
+        # Watch mode state
+        self.watching = tk.BooleanVar(value=False)
+        self.watch_thread: Optional[threading.Thread] = None
+        self.watch_stop: Optional[threading.Event] = None
+        self.watch_queue: "queue.Queue[tuple]" = queue.Queue()
+
+        # Results tab state
+        self.results_indexes: Dict[str, ResultsIndex] = {}
+        self.results_rows: List[int] = []
+        self.results_key = tk.StringVar(value="")
+        self.results_search = tk.StringVar(value="")
+        self.results_mod = tk.StringVar(value=RESULTS_ALL_MODS)
+        self.results_status = tk.StringVar(value="All groups")
+        self.results_cross_mod = tk.BooleanVar(value=True)
+        self.results_count = tk.StringVar(value="Run a scan to browse its duplicate groups here.")
+        self.results_filter_job = None
+
+        nb = ttk.Notebook(self)
+        nb.pack(fill="both", expand=True)
+        self.notebook = nb
+
+        self.frame_home = ttk.Frame(nb)
+        self.frame_results = ttk.Frame(nb)
+        self.frame_settings = ttk.Frame(nb)
+        self.frame_help = ttk.Frame(nb)
+        nb.add(self.frame_home, text="Scan")
+        nb.add(self.frame_results, text="Results")
+        nb.add(self.frame_settings, text="Settings")
+        nb.add(self.frame_help, text="Help / About")
+
+        self.build_home()
+        self.build_results()
+        self.build_settings()
+        self.build_help()
+
+        self.update_kind_label()
+
+    def build_home(self):
+        f = self.frame_home
+
+        # Dump root + registry picker
+        row = 0
+        ttk.Label(f, text="Dump Root:").grid(row=row, column=0, sticky="e", padx=6, pady=6)
+        ttk.Entry(f, textvariable=self.dump_root, width=80).grid(row=row, column=1, sticky="we", padx=6, pady=6)
+        ttk.Button(f, text="Browse", command=self.pick_dump_root).grid(row=row, column=2, padx=6, pady=6)
+
+        row += 1
+        ttk.Label(f, text="Registry Folder (auto from Dump Root):").grid(row=row, column=0, sticky="e", padx=6, pady=6)
+        self.registry_combo = ttk.Combobox(f, textvariable=self.registry_folder, width=77, values=[])
+        self.registry_combo.grid(row=row, column=1, sticky="we", padx=6, pady=6)
+        self.registry_combo.bind("<<ComboboxSelected>>", lambda _e: self.show_candidate_info())
+        self.btn_discover = ttk.Button(f, text="Scan Dump Root", command=self.scan_dump_root_for_candidates)
+        self.btn_discover.grid(row=row, column=2, padx=6, pady=6)
+        row += 1
+        ttk.Label(f, textvariable=self.candidate_info).grid(row=row, column=1, sticky="w", padx=6)
+
+        # Mods / RP / Output
+        row += 1
+        ttk.Label(f, text="Mods Folder (.jar files):").grid(row=row, column=0, sticky="e", padx=6, pady=6)
+        ttk.Entry(f, textvariable=self.mods_folder, width=80).grid(row=row, column=1, sticky="we", padx=6, pady=6)
+        ttk.Button(f, text="Browse", command=self.pick_mods_folder).grid(row=row, column=2, padx=6, pady=6)
+
+        row += 1
+        ttk.Label(f, text="Resource Pack(s) (zip/folder, optional):").grid(row=row, column=0, sticky="e", padx=6, pady=6)
+        ttk.Entry(f, textvariable=self.rp_path, width=80).grid(row=row, column=1, sticky="we", padx=6, pady=6)
+        rp_buttons = ttk.Frame(f)
+        rp_buttons.grid(row=row, column=2, padx=6, pady=6)
+        ttk.Button(rp_buttons, text="Browse", command=self.pick_rp_path).pack(side="left")
+        ttk.Button(rp_buttons, text="Add Below", command=self.add_rp_to_stack).pack(side="left", padx=(4, 0))
+
+        row += 1
+        ttk.Label(f, text="Output Folder:").grid(row=row, column=0, sticky="e", padx=6, pady=6)
+        ttk.Entry(f, textvariable=self.output_folder, width=80).grid(row=row, column=1, sticky="we", padx=6, pady=6)
+        ttk.Button(f, text="Browse", command=self.pick_output_folder).grid(row=row, column=2, padx=6, pady=6)
+
+        # Kind + actions
+        row += 1
+        ttk.Label(f, text="Inferred kind:").grid(row=row, column=0, sticky="e", padx=6, pady=6)
+        kind_row = ttk.Frame(f)
+        kind_row.grid(row=row, column=1, sticky="w", padx=6, pady=6)
+        ttk.Label(kind_row, textvariable=self.kind_inferred).pack(side="left")
+        ttk.Checkbutton(kind_row, text="Scan all kinds under Dump Root (one report folder per kind)",
+                        variable=self.scan_all_kinds, command=self.update_kind_label).pack(side="left", padx=16)
+
+        row += 1
+        actions = ttk.Frame(f)
+        actions.grid(row=row, column=0, columnspan=3, sticky="we", padx=6, pady=6)
+        self.btn_scan = ttk.Button(actions, text="Start Scan", command=self.do_scan)
+        self.btn_scan.pack(side="left", padx=4)
+        self.btn_cancel = ttk.Button(actions, text="Cancel", command=self.cancel_scan, state="disabled")
+        self.btn_cancel.pack(side="left", padx=4)
+        ttk.Button(actions, text="Save Defaults", command=self.save_defaults).pack(side="left", padx=4)
+        ttk.Checkbutton(actions, text="Watch RP (live AFTER_RP_duplicates.txt)", variable=self.watching,
+                        command=self.toggle_watch).pack(side="left", padx=16)
+
+        # Progress
+        row += 1
+        ttk.Label(f, text="Progress:").grid(row=row, column=0, sticky="e", padx=6, pady=6)
+        ttk.Progressbar(f, variable=self.progress_value, maximum=100.0).grid(row=row, column=1, sticky="we", padx=6, pady=6)
+        ttk.Label(f, textvariable=self.progress_text, width=28).grid(row=row, column=2, sticky="w", padx=6, pady=6)
+
+        # Log box
+        row += 1
+        ttk.Label(f, text="Run Log:").grid(row=row, column=0, sticky="ne", padx=6, pady=6)
+        self.log_text = tk.Text(f, height=14)
+        self.log_text.grid(row=row, column=1, columnspan=2, sticky="nsew", padx=6, pady=6)
+        f.grid_columnconfigure(1, weight=1)
+        f.grid_rowconfigure(row, weight=1)
+
+    def build_results(self):
+        f = self.frame_results
+
+        filters = ttk.Frame(f)
+        filters.grid(row=0, column=0, sticky="we", padx=6, pady=6)
+        ttk.Label(filters, text="Results:").pack(side="left")
+        self.results_combo = ttk.Combobox(filters, textvariable=self.results_key, values=[], state="readonly", width=16)
+        self.results_combo.pack(side="left", padx=(4, 12))
+        ttk.Label(filters, text="Search:").pack(side="left")
+        ttk.Entry(filters, textvariable=self.results_search, width=24).pack(side="left", padx=(4, 12))
+        ttk.Label(filters, text="Mod:").pack(side="left")
+        self.results_mod_combo = ttk.Combobox(filters, textvariable=self.results_mod, values=[RESULTS_ALL_MODS],
+                                              state="readonly", width=20)
+        self.results_mod_combo.pack(side="left", padx=(4, 12))
+        ttk.Combobox(filters, textvariable=self.results_status, values=list(RESULTS_STATUS_FILTERS),
+                     state="readonly", width=17).pack(side="left", padx=(0, 12))
+        ttk.Checkbutton(filters, text="Cross-mod only", variable=self.results_cross_mod).pack(side="left")
+
+        ttk.Label(f, textvariable=self.results_count).grid(row=1, column=0, sticky="w", padx=6)
+        self.results_tree = VirtualTree(f, [("name", "Name (after RP)", 300), ("ids", "IDs", 50),
+                                            ("mods", "Mods", 320), ("status", "RP", 100)],
+                                        on_select=self.show_result_group)
+        self.results_tree.grid(row=2, column=0, sticky="nsew", padx=6, pady=6)
+
+        members = ttk.Frame(f)
+        members.grid(row=3, column=0, sticky="nsew", padx=6, pady=6)
+        self.results_members = ttk.Treeview(members, columns=("id", "mod", "before", "after"), show="headings", height=7)
+        for key, heading, width in (("id", "ID", 260), ("mod", "Mod", 120), ("before", "Before RP", 220), ("after", "After RP", 220)):
+            self.results_members.heading(key, text=heading, anchor="w")
+            self.results_members.column(key, width=width)
+        members_scroll = ttk.Scrollbar(members, orient="vertical", command=self.results_members.yview)
+        self.results_members.configure(yscrollcommand=members_scroll.set)
+        self.results_members.pack(side="left", fill="both", expand=True)
+        members_scroll.pack(side="left", fill="y")
+
+        f.grid_columnconfigure(0, weight=1)
+        f.grid_rowconfigure(2, weight=1)
+        self.results_key.trace_add("write", lambda *_: self.select_results())
+        for var in (self.results_search, self.results_mod, self.results_status, self.results_cross_mod):
+            var.trace_add("write", lambda *_: self.schedule_results_filter())
+
+    def build_settings(self):
+        f = self.frame_settings
+        ttk.Checkbutton(f, text="Case-insensitive name comparison", variable=self.case_insensitive).grid(row=0, column=0, sticky="w", padx=10, pady=10)
+        ttk.Checkbutton(f, text="Treat underscores as spaces during comparison", variable=self.underscores_as_spaces).grid(row=1, column=0, sticky="w", padx=10, pady=10)
+        normalize_row = ttk.Frame(f)
+        normalize_row.grid(row=2, column=0, sticky="w", padx=10, pady=10)
+        ttk.Checkbutton(normalize_row, text="Ignore \u00a7 formatting codes", variable=self.strip_formatting_codes).pack(side="left")
+        ttk.Checkbutton(normalize_row, text="Ignore repeated/trailing spaces", variable=self.fold_whitespace).pack(side="left", padx=16)
+        ttk.Checkbutton(normalize_row, text="Unicode NFKC (fullwidth, ligatures)", variable=self.normalize_nfkc).pack(side="left")
+        ttk.Label(f, text="Tip: These settings only affect how duplicates are detected, not how names are written.").grid(row=3, column=0, sticky="w", padx=10, pady=10)
+        row = 4
+        ttk.Checkbutton(f, text="Enable Resource Pack filtering", variable=self.enable_rp)\
+        .grid(row=row, column=0, sticky="w", padx=10, pady=10)
+
+        row += 1
+        ttk.Checkbutton(f, text="Check for missing lang keys (warn)", variable=self.check_missing_lang)\
+            .grid(row=row, column=0, sticky="w", padx=10, pady=10)
+
+        row += 1
+        ttk.Label(f, text="Exclude Mods (comma-separated):").grid(row=row, column=0, sticky="w", padx=10)
+        row += 1
+        ttk.Entry(f, textvariable=self.exclude_mods, width=60).grid(row=row, column=0, sticky="w", padx=10)
+
+        row += 1
+        ttk.Label(f, text="Locales (comma-separated, e.g. en_us, zh_cn, ru_ru — or 'all'):").grid(row=row, column=0, sticky="w", padx=10)
+        row += 1
+        ttk.Entry(f, textvariable=self.locales, width=60).grid(row=row, column=0, sticky="w", padx=10)
+
+        row += 1
+        ttk.Label(f, text="What-if RP stacks to compare (packs joined with ';', stacks separated by '|'):").grid(row=row, column=0, sticky="w", padx=10)
+        row += 1
+        ttk.Entry(f, textvariable=self.what_if_stacks, width=60).grid(row=row, column=0, sticky="w", padx=10)
+
+        row += 1
+        ttk.Checkbutton(f, text="Cache parsed mod langs between scans (mmdc_langcache.json)", variable=self.use_lang_cache)\
+            .grid(row=row, column=0, sticky="w", padx=10, pady=10)
+        row += 1
+        ttk.Checkbutton(f, text="Verify changed jars by content hash (slower, survives re-downloads)", variable=self.lang_cache_hash)\
+            .grid(row=row, column=0, sticky="w", padx=10)
+
+        row += 1
+        ttk.Checkbutton(f, text="Only load lang keys needed by the scanned IDs (faster, less memory)", variable=self.targeted_langs)\
+            .grid(row=row, column=0, sticky="w", padx=10, pady=10)
+
+        row += 1
+        ttk.Checkbutton(f, text="Incremental re-scan: reuse the last run's snapshot and write a delta report", variable=self.incremental)\
+            .grid(row=row, column=0, sticky="w", padx=10, pady=10)
+
+        row += 1
+        ttk.Checkbutton(f, text=f"Also write an indexed SQLite results database ({RESULTS_DB_NAME})", variable=self.write_sqlite)\
+            .grid(row=row, column=0, sticky="w", padx=10, pady=10)
+
+        row += 1
+        near_row = ttk.Frame(f)
+        near_row.grid(row=row, column=0, sticky="w", padx=10, pady=10)
+        ttk.Checkbutton(near_row, text="Also report near-duplicate names (e.g. \"Copper Nugget\" vs \"Copper Nuggets\"), similarity:",
+                        variable=self.near_duplicates).pack(side="left")
+        ttk.Spinbox(near_row, from_=0.5, to=0.99, increment=0.01, textvariable=self.near_threshold, width=6).pack(side="left", padx=6)
+
+        row += 1
+        workers_row = ttk.Frame(f)
+        workers_row.grid(row=row, column=0, sticky="w", padx=10, pady=10)
+        ttk.Label(workers_row, text="Parallel jar workers (0 = one per CPU, 1 = off):").pack(side="left")
+        ttk.Spinbox(workers_row, from_=0, to=64, textvariable=self.lang_workers, width=5).pack(side="left", padx=6)
+        ttk.Label(workers_row, text="Report writer threads (1 = off):").pack(side="left", padx=(16, 0))
+        ttk.Spinbox(workers_row, from_=1, to=64, textvariable=self.report_workers, width=5).pack(side="left", padx=6)
+
+        row += 1
+        nested_row = ttk.Frame(f)
+        nested_row.grid(row=row, column=0, sticky="w", padx=10, pady=10)
+        ttk.Label(nested_row, text="Read langs of jars bundled in jars (META-INF/jars, jarjar), levels deep (0 = off):")\
+            .pack(side="left")
+        ttk.Spinbox(nested_row, from_=0, to=8, textvariable=self.nested_jar_depth, width=5).pack(side="left", padx=6)
+
+        row += 1
+        ttk.Checkbutton(f, text="Profile scans with cProfile (run_profile.txt in the Output folder, for bug reports)", variable=self.profile)\
+            .grid(row=row, column=0, sticky="w", padx=10, pady=10)
+
+        row += 1
+        ttk.Checkbutton(f, text="Dark Mode (restart required)", variable=self.dark_mode)\
+            .grid(row=row, column=0, sticky="w", padx=10, pady=10)
+
+    def build_help(self):
+        f = self.frame_help
+        txt = tk.Text(f, wrap="word")
+        txt.pack(fill="both", expand=True, padx=10, pady=10)
+        msg = (
+            "How to use:\n"
+            "1) Use a registry dump mod to export IDs. Recommended: 'Registry Dump' on Modrinth (tested with this).\n"
+            "2) Click 'Browse' next to Dump Root, then 'Scan Dump Root' and pick the subfolder (items/blocks/entities...)\n"
+            "3) Pick your Mods folder (where .jar files are), Resource Pack path (zip/folder, optional. For ex, the Rename compat project), and Output folder (The folder where your files will be generated in).\n"
+            "4) Click 'Start Scan'. Reports will be written to the Output folder.\n"
+            "   Tick 'Scan all kinds' to scan items, blocks, entities, biomes and worldgen in one go; each kind gets its own subfolder in the Output folder.\n\n"
+            "Reports generated:\n"
+            "• BASELINE_duplicates.txt — duplicates by name BEFORE resource pack overrides.\n"
+            "• AFTER_RP_duplicates.txt — duplicates by name AFTER applying RP's en_us.json overrides. Lines marked (changed) were renamed by RP.\n"
+            "• by_mod_AFTER_RP/ — per-mod breakdown of duplicates after RP.\n"
+            "• RP_changes_diff.txt — list of IDs whose display names changed (before vs after RP).\n"
+            "• DELTA_since_last_run.txt — (incremental mode) duplicate groups that appeared, were resolved or changed since the previous run.\n"
+            "• AFTER_RP_near_duplicates.txt — (optional) pairs of cross-mod names that are almost equal after RP, such as singular/plural or one typo apart. Similarity is 1 - edit distance / length of the longer name; 0.85 allows about one edit per 7 characters.\n"
+            f"• {RUN_METRICS_NAME} — time and CPU spent per stage (registry, mod langs, names, reports…), counters (jars opened, bytes decompressed, lang files parsed, missing lang keys, files written) and peak memory of the run. The same summary is printed at the end of the run log.\n"
+            "• mmdc_results.sqlite — (optional) every scanned ID, its names before/after RP and all duplicate groups as indexed tables (registry, names, dupe_groups, dupe_members) for ad-hoc SQL queries. The text reports can be regenerated from it with: mmdc.py reports-from-db.\n\n"
+            "Results tab:\n"
+            "• After a scan, the Results tab lists every AFTER RP duplicate group without opening the reports. Search matches the start of words in the group name or in the members' names before RP; Mod narrows to the cross-mod groups that mod takes part in, like its by_mod_AFTER_RP file; the RP filter shows the groups the resource pack renamed (or didn't). Select a group to see its IDs with their names before and after RP.\n\n"
+            "Lang cache:\n"
+            "• Parsed lang files are cached per jar in mmdc_langcache.json (next to mmdc.json). Jars whose size and modified time are unchanged are not reopened. Delete the file to force a full reload.\n"
+            "• Jars bundled inside a mod jar (META-INF/jars/, META-INF/jarjar/) are read from memory and cached with it, so sub-mods get their real names. Settings sets how many jar-in-jar levels are followed.\n\n"
+            "Resource pack stacks:\n"
+            "• Several packs can be stacked in the Resource Pack field, separated by ';' and listed like the in-game list: the first pack has the highest priority. 'Add Below' appends a lower-priority pack.\n"
+            "• WHATIF_rp_stacks.txt — (optional, Settings → What-if) scores candidate stacks against the mod langs without re-reading any jar: cross-mod groups left, groups resolved and new duplicates each stack would create.\n\n"
+            "Watch mode (for RP authors):\n"
+            "• Tick 'Watch RP' on the Scan tab: mod langs are loaded once, then every save of an en_us.json in the resource pack(s) re-applies just the changed keys and rewrites AFTER_RP_duplicates.txt within a fraction of a second. The run log lists cross-mod groups that appeared or were resolved. Works best with an unpacked (folder) pack.\n\n"
+            "Locales:\n"
+            "• Settings → Locales picks the languages to check (default en_us; 'all' = every locale the jars or RP ship). Every jar is read once for all of them.\n"
+            "• Translations fall back like the game does: RP locale > mod locale > RP en_us > mod en_us.\n"
+            "• With more than one locale, each gets its own report tree: Output/<locale>/.\n\n"
+            "Notes:\n"
+            "• Only cross-mod duplicates are kept (same display name used by 2+ different mods).\n"
+            "• If a mod lacks lang entries, we fall back to a prettified ID path (e.g., 'pear_jelly_block' -> 'Pear Jelly Block').\n"
+            "• This tool compares *names*, not IDs. If two different names are used, they won't count as duplicates.\n"
+            "• Settings can also ignore \u00a7 formatting codes and repeated or trailing spaces ('\u00a76Copper  Ingot ' = 'Copper Ingot') and fold Unicode compatibility forms (NFKC), so fullwidth or ligature spellings match too. All three are off by default; the report settings line names the ones in use.\n\n"
+            "Made for Star (Aniket). Have fun fixing the multiverse of Pears 🍐.\n"
+        )
+        txt.insert("1.0", msg)
+        txt.configure(state="disabled")
+
+    ##############################
+    # Actions
+    ##############################
+
+    def show_results(self, payload: dict):
+        self.results_indexes = {key: kind_result["index"] for key, kind_result in payload["kinds"].items()
+                                if "index" in kind_result}
+        keys = list(self.results_indexes)
+        self.results_combo.configure(values=keys)
+        # setting the variable (even to the same key) runs select_results() through its trace
+        self.results_key.set(self.results_key.get() if self.results_key.get() in self.results_indexes else (keys[0] if keys else ""))
+
+    def current_results(self) -> Optional[ResultsIndex]:
+        return self.results_indexes.get(self.results_key.get())
+
+    def select_results(self):
+        index = self.current_results()
+        mods = sorted(index.by_mod) if index is not None else []
+        self.results_mod_combo.configure(values=[RESULTS_ALL_MODS] + mods)
+        if self.results_mod.get() != RESULTS_ALL_MODS and self.results_mod.get() not in mods:
+            self.results_mod.set(RESULTS_ALL_MODS)
+        self.apply_results_filter()
+
+    def schedule_results_filter(self):
+        if self.results_filter_job is not None:
+            self.after_cancel(self.results_filter_job)
+        self.results_filter_job = self.after(RESULTS_FILTER_MS, self.apply_results_filter)
+
+    def apply_results_filter(self):
+        self.results_filter_job = None
+        self.results_members.delete(*self.results_members.get_children())
+        index = self.current_results()
+        if index is None:
+            self.results_rows = []
+            self.results_tree.set_rows(0, None)
+            return
+        modid = self.results_mod.get()
+        rows = index.query(self.results_search.get(),
+                           modid=None if modid == RESULTS_ALL_MODS else modid,
+                           changed=RESULTS_STATUS_FILTERS.get(self.results_status.get()),
+                           cross_mod_only=bool(self.results_cross_mod.get()))
+        self.results_rows = rows
+        self.results_tree.set_rows(len(rows), lambda r: index.row_values(rows[r]))
+        self.results_count.set(f"{len(rows)} of {len(index)} {index.kind} duplicate groups")
+
+    def show_result_group(self, row: int):
+        index = self.current_results()
+        self.results_members.delete(*self.results_members.get_children())
+        if index is None or row >= len(self.results_rows):
+            return
+        for values in index.members(self.results_rows[row]):
+            self.results_members.insert("", "end", values=values)
+
+    def append_log(self, line: str):
+        # scans run off the main thread now, so no update_idletasks() here;
+        # poll_scan_queue() hands over whole batches of lines at once
+        self.log_text.insert("end", line + "\n")
+        self.log_text.see("end")
+
+    def pick_dump_root(self):
+        p = filedialog.askdirectory(title="Choose Dump Root (folder that contains items/blocks/etc)")
+        if p:
+            self.dump_root.set(p)
+            self.scan_dump_root_for_candidates()
+
+    def pick_mods_folder(self):
+        p = filedialog.askdirectory(title="Choose Mods folder (.jar files)")
+        if p:
+            self.mods_folder.set(p)
+
+    def pick_rp_path(self):
+        # allow either file or folder
+        p = filedialog.askopenfilename(title="Choose Resource Pack (zip/jar)")
+        if not p:
+            p = filedialog.askdirectory(title="Or choose a Resource Pack folder")
+        if p:
+            self.rp_path.set(p)
+
+    def add_rp_to_stack(self):
+        # packs further right in the stack have lower priority, like lower entries in game
+        p = filedialog.askopenfilename(title="Add a lower-priority Resource Pack (zip/jar)")
+        if not p:
+            p = filedialog.askdirectory(title="Or choose a Resource Pack folder")
+        if p:
+            current = self.rp_path.get().strip()
+            self.rp_path.set(f"{current}; {p}" if current else p)
+
+    def pick_output_folder(self):
+        p = filedialog.askdirectory(title="Choose Output folder")
+        if p:
+            self.output_folder.set(p)
+
+    def scan_dump_root_for_candidates(self):
+        root = self.dump_root.get().strip()
+        if not root or not os.path.isdir(root):
+            messagebox.showerror("Error", "Dump Root not found.")
+            return
+        # Find likely registry subfolders with JSON files, off the UI thread (big dumps take a while)
+        self.btn_discover.configure(state="disabled")
+        self.candidate_info.set("Looking for registry folders…")
+        q = self.discovery_queue
+
+        def work():
+            try:
+                q.put(("done", discover_registry_folders(root)))
+            except Exception as ex:
+                q.put(("error", f"{type(ex).__name__}: {ex}"))
+
+        threading.Thread(target=work, daemon=True).start()
+        self.after(SCAN_POLL_MS, self.poll_discovery_queue)
+
+    def poll_discovery_queue(self):
+        try:
+            status, payload = self.discovery_queue.get_nowait()
+        except queue.Empty:
+            self.after(SCAN_POLL_MS, self.poll_discovery_queue)
+            return
+        self.btn_discover.configure(state="normal")
+        if status == "error":
+            self.candidate_info.set("")
+            messagebox.showerror("Error", f"Could not scan the Dump Root:\n{payload}")
+            return
+        self.candidates_by_path = {folder: (count, kind) for folder, count, kind in payload}
+        candidates = [folder for folder, _, _ in payload]
+        self.registry_combo["values"] = candidates
+        # auto-pick common ones if present; registries of no known kind can't be scanned on their own
+        scannable = [folder for folder, _, kind in payload if kind in KINDS]
+        pick = ""
+        for guess in ("items", "item", "blocks", "block", "entities", "entity", "worldgen"):
+            for c in scannable:
+                if c.lower().endswith(guess):
+                    pick = c; break
+            if pick:
+                break
+        if not pick and scannable:
+            pick = scannable[0]
+        if pick:
+            self.registry_folder.set(pick)
+        if candidates:
+            self.append_log(f"Registry folders found: {len(candidates)}")
+            for folder, count, kind in payload:
+                self.append_log(f"  {folder}  ({count} files, {kind})")
+        self.show_candidate_info()
+        self.update_kind_label()
+
+    def show_candidate_info(self):
+        info = self.candidates_by_path.get(self.registry_folder.get())
+        if info is None:
+            self.candidate_info.set("" if self.candidates_by_path else "No registry folders found.")
+        else:
+            self.candidate_info.set(f"{info[0]} JSON files, likely kind: {info[1]}")
+        self.update_kind_label()
+
+    def get_lang_workers(self) -> int:
+        try:
+            return max(0, int(self.lang_workers.get()))
+        except (tk.TclError, ValueError):
+            return 0
+
+    def get_near_threshold(self) -> float:
+        try:
+            return float(self.near_threshold.get())
+        except (tk.TclError, ValueError):
+            return NEAR_DUPE_DEFAULT_THRESHOLD
+
+    def get_nested_jar_depth(self) -> int:
+        try:
+            return max(0, int(self.nested_jar_depth.get()))
+        except (tk.TclError, ValueError):
+            return NESTED_JAR_DEPTH
+
+    def get_report_workers(self) -> int:
+        try:
+            return max(1, int(self.report_workers.get()))
+        except (tk.TclError, ValueError):
+            return 4
+
+    def update_kind_label(self):
+        if bool(self.scan_all_kinds.get()):
+            self.kind_inferred.set("all")
+        else:
+            self.kind_inferred.set(registry_folder_kind(self.registry_folder.get()))
+
+    def collect_settings(self) -> dict:
+        return {
+            "dump_root": self.dump_root.get(),
+            "registry_folder": self.registry_folder.get(),
+            "mods_folder": self.mods_folder.get(),
+            "rp_path": self.rp_path.get(),
+            "output_folder": self.output_folder.get(),
+            "scan_all_kinds": bool(self.scan_all_kinds.get()),
+            "case_insensitive": bool(self.case_insensitive.get()),
+            "underscores_as_spaces": bool(self.underscores_as_spaces.get()),
+            "strip_formatting_codes": bool(self.strip_formatting_codes.get()),
+            "fold_whitespace": bool(self.fold_whitespace.get()),
+            "normalize_nfkc": bool(self.normalize_nfkc.get()),
+            "enable_rp": bool(self.enable_rp.get()),
+            "check_missing_lang": bool(self.check_missing_lang.get()),
+            "exclude_mods": self.exclude_mods.get(),
+            "locales": self.locales.get(),
+            "what_if_stacks": self.what_if_stacks.get(),
+            "use_lang_cache": bool(self.use_lang_cache.get()),
+            "lang_cache_hash": bool(self.lang_cache_hash.get()),
+            "lang_workers": self.get_lang_workers(),
+            "report_workers": self.get_report_workers(),
+            "nested_jar_depth": self.get_nested_jar_depth(),
+            "targeted_langs": bool(self.targeted_langs.get()),
+            "incremental": bool(self.incremental.get()),
+            "write_sqlite": bool(self.write_sqlite.get()),
+            "near_duplicates": bool(self.near_duplicates.get()),
+            "near_threshold": self.get_near_threshold(),
+            "profile": bool(self.profile.get()),
+            "dark_mode": bool(self.dark_mode.get())
+        }
+
+    def save_defaults(self):
+        ok = save_config(self.script_dir, self.collect_settings())
+        if ok:
+            messagebox.showinfo("Saved", "Defaults saved.")
+        else:
+            messagebox.showerror("Error", "Failed to save defaults.")
+
+    def do_scan(self):
+        if self.scan_thread is not None and self.scan_thread.is_alive():
+            return
+        if self.watch_thread is not None:
+            messagebox.showerror("Error", "Stop watch mode before starting a full scan.")
+            return
+        opts = self.collect_settings()
+        err = validate_scan_options(opts)
+        if err:
+            messagebox.showerror("Error", err)
+            return
+
+        self.update_kind_label()
+        self.scan_cancel = threading.Event()
+        self.scan_thread = threading.Thread(target=self.scan_worker, args=(opts, self.scan_cancel), daemon=True)
+        self.set_scanning(True)
+        self.scan_thread.start()
+        self.after(SCAN_POLL_MS, self.poll_scan_queue)
+
+    def scan_worker(self, opts: dict, cancel: threading.Event):
+        # runs on the worker thread: never touch Tk from here, only the queue
+        q = self.scan_queue
+        try:
+            result = run_scan(
+                opts,
+                lang_cache_path=os.path.join(self.script_dir, LANG_CACHE_NAME),
+                log=lambda line: q.put(("log", line)),
+                progress=lambda stage, done, total: q.put(("progress", stage, done, total)),
+                cancel=cancel,
+                keep_results=True,
+                warn=lambda line: q.put(("log", line))
+            )
+            q.put(("done", result))
+        except ScanCancelled:
+            q.put(("cancelled", None))
+        except Exception as ex:
+            q.put(("error", f"{type(ex).__name__}: {ex}"))
+
+    def poll_scan_queue(self):
+        lines: List[str] = []
+        last_progress = None
+        finished = None
+        while finished is None:
+            try:
+                msg = self.scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            if msg[0] == "log":
+                lines.append(msg[1])
+            elif msg[0] == "progress":
+                last_progress = msg[1:]
+            else:
+                finished = msg
+        if lines:
+            self.append_log("\n".join(lines))
+        if last_progress is not None:
+            self.show_progress(*last_progress)
+        if finished is None:
+            self.after(SCAN_POLL_MS, self.poll_scan_queue)
+        else:
+            self.finish_scan(*finished)
+
+    def show_progress(self, stage: str, done: int, total: int):
+        label = SCAN_STAGE_LABELS.get(stage, stage)
+        self.progress_text.set(f"{label}: {done}/{total}")
+        self.progress_value.set(100.0 * done / total if total else 0.0)
+
+    def set_scanning(self, running: bool):
+        self.btn_scan.configure(state="disabled" if running else "normal")
+        self.btn_cancel.configure(state="normal" if running else "disabled")
+        if running:
+            self.progress_value.set(0.0)
+            self.progress_text.set("Starting…")
+
+    def cancel_scan(self):
+        if self.scan_cancel is not None and not self.scan_cancel.is_set():
+            self.scan_cancel.set()
+            self.append_log("Cancelling after the current step…")
+
+    def toggle_watch(self):
+        if not bool(self.watching.get()):
+            if self.watch_stop is not None and not self.watch_stop.is_set():
+                self.watch_stop.set()
+                self.append_log("Stopping watch mode…")
+            return
+        if self.watch_thread is not None:
+            return
+        if self.scan_thread is not None and self.scan_thread.is_alive():
+            messagebox.showerror("Error", "Wait for the scan to finish before starting watch mode.")
+            self.watching.set(False)
+            return
+        opts = self.collect_settings()
+        err = validate_scan_options(opts)
+        if not err and not [p for p in parse_rp_stack(opts["rp_path"]) if p.lower() != "none"]:
+            err = "Watch mode needs a Resource Pack."
+        if err:
+            messagebox.showerror("Error", err)
+            self.watching.set(False)
+            return
+        self.watch_stop = threading.Event()
+        self.watch_thread = threading.Thread(target=self.watch_worker, args=(opts, self.watch_stop), daemon=True)
+        self.watch_thread.start()
+        self.after(SCAN_POLL_MS, self.poll_watch_queue)
+
+    def watch_worker(self, opts: dict, stop: threading.Event):
+        # same rule as scan_worker: only the queue crosses over to the Tk thread
+        q = self.watch_queue
+        try:
+            watch_resource_pack(
+                opts,
+                lang_cache_path=os.path.join(self.script_dir, LANG_CACHE_NAME),
+                log=lambda line: q.put(("log", line)),
+                stop=stop,
+                warn=lambda line: q.put(("log", line))
+            )
+            q.put(("stopped", None))
+        except Exception as ex:
+            q.put(("error", f"{type(ex).__name__}: {ex}"))
+
+    def poll_watch_queue(self):
+        lines: List[str] = []
+        finished = None
+        while finished is None:
+            try:
+                msg = self.watch_queue.get_nowait()
+            except queue.Empty:
+                break
+            if msg[0] == "log":
+                lines.append(msg[1])
+            else:
+                finished = msg
+        if lines:
+            self.append_log("\n".join(lines))
+        if finished is None:
+            self.after(SCAN_POLL_MS, self.poll_watch_queue)
+            return
+        self.watching.set(False)
+        self.watch_thread = None
+        self.watch_stop = None
+        if finished[0] == "error":
+            self.append_log(f"Watch mode failed: {finished[1]}")
+            messagebox.showerror("Error", f"Watch mode failed:\n{finished[1]}")
+
+    def finish_scan(self, status: str, payload):
+        self.set_scanning(False)
+        self.scan_thread = None
+        if status == "cancelled":
+            self.progress_text.set("Cancelled")
+            self.append_log("Scan cancelled.")
+        elif status == "error":
+            self.progress_text.set("Failed")
+            self.append_log(f"Scan failed: {payload}")
+            messagebox.showerror("Error", f"Scan failed:\n{payload}")
+        elif not payload["reports"]:
+            self.progress_text.set("Done")
+            messagebox.showinfo("No IDs", "No IDs found in the selected registry folder.")
+        else:
+            self.progress_text.set("Done")
+            self.kind_inferred.set(payload["kind"])
+            self.append_log("Reports written:\n- " + "\n- ".join(payload["reports"]))
+            self.show_results(payload)
+            self.notebook.select(self.frame_results)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tests import mmdc_core from the checkout, however pytest was started
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
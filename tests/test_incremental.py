@@ -0,0 +1,135 @@
+import os
+import json
+import zipfile
+import filecmp
+
+import pytest
+
+from mmdc_core.options import ScanOptions
+from mmdc_core.pipeline import run_scan
+
+# per-run files that legitimately differ between an incremental and a full scan
+RUN_ONLY_FILES = {"mmdc_snapshot.json", "DELTA_since_last_run.txt", "run_metrics.json", "mmdc_results.sqlite"}
+
+NAMES = ("Copper Ingot", "Tin Ingot", "Pear", "Copper Nugget", "Steel Plate", "Ruby")
+
+def write_jar(path: str, modid: str, lang: dict):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\n")
+        zf.writestr(f"assets/{modid}/lang/en_us.json", json.dumps(lang))
+    # a rewrite within the same second must still look changed
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000_000))
+
+def write_json(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def make_pack(root: str, mods: int = 8, items: int = 6) -> dict:
+    """
+    dump/items + dump/blocks, one jar per mod with item and block names, and an unpacked RP.
+    """
+    paths = {"dump": os.path.join(root, "dump"), "mods": os.path.join(root, "mods"), "rp": os.path.join(root, "rp")}
+    os.makedirs(paths["mods"])
+    for m in range(mods):
+        modid = f"mod{m}"
+        write_json(os.path.join(paths["dump"], "items", f"{modid}.json"), [f"{modid}:thing_{i}" for i in range(items)])
+        write_json(os.path.join(paths["dump"], "blocks", f"{modid}.json"), [{"id": f"{modid}:block_{i}"} for i in range(2)])
+        lang = {f"item.{modid}.thing_{i}": NAMES[(m + i) % len(NAMES)] for i in range(items)}
+        lang.update({f"block.{modid}.block_{i}": f"{NAMES[m % 3]} Block" for i in range(2)})
+        write_jar(os.path.join(paths["mods"], f"{modid}.jar"), modid, lang)
+    write_json(os.path.join(paths["rp"], "assets", "rcp", "lang", "en_us.json"),
+               {"item.mod0.thing_0": "Copper Ingot (mod0)", "item.mod1.thing_1": "Pear", "block.mod2.block_0": "Odd Block"})
+    return paths
+
+def read_jar_lang(path: str, modid: str) -> dict:
+    with zipfile.ZipFile(path) as zf:
+        return json.loads(zf.read(f"assets/{modid}/lang/en_us.json"))
+
+def edit_rp(paths: dict, change: dict, remove=()):
+    rp_file = os.path.join(paths["rp"], "assets", "rcp", "lang", "en_us.json")
+    with open(rp_file, "r", encoding="utf-8") as f:
+        overrides = json.load(f)
+    overrides.update(change)
+    for key in remove:
+        overrides.pop(key, None)
+    write_json(rp_file, overrides)
+
+def add_jar(paths):
+    # mod8's IDs were in the dump all along, without a lang to name them
+    write_json(os.path.join(paths["dump"], "items", "mod8.json"), ["mod8:thing_0", "mod8:thing_1"])
+    write_jar(os.path.join(paths["mods"], "mod8.jar"), "mod8", {"item.mod8.thing_0": "Tin Ingot"})
+
+def remove_jar(paths):
+    os.remove(os.path.join(paths["mods"], "mod3.jar"))
+
+def change_jar(paths):
+    jar = os.path.join(paths["mods"], "mod5.jar")
+    lang = read_jar_lang(jar, "mod5")
+    lang["item.mod5.thing_0"] = "Pear"
+    lang["item.mod5.thing_1"] = "Brand New Name"
+    del lang["block.mod5.block_1"]
+    write_jar(jar, "mod5", lang)
+
+def change_rp(paths):
+    edit_rp(paths, {"item.mod4.thing_2": "Pear", "item.mod1.thing_1": "Not A Pear", "block.mod6.block_1": "Odd Block"},
+            remove=("item.mod0.thing_0",))
+
+def everything(paths):
+    add_jar(paths)
+    remove_jar(paths)
+    change_jar(paths)
+    change_rp(paths)
+
+CHANGES = {"add_jar": add_jar, "remove_jar": remove_jar, "change_jar": change_jar, "change_rp": change_rp,
+           "everything": everything}
+
+def scan(paths: dict, out: str, cache: str, all_kinds: bool, incremental: bool) -> list:
+    lines = []
+    opts = ScanOptions(dump_root=paths["dump"], registry_folder=os.path.join(paths["dump"], "items"),
+                       scan_all_kinds=all_kinds, mods_folder=paths["mods"], rp_path=paths["rp"], output_folder=out,
+                       incremental=incremental, near_duplicates=True, near_threshold=0.75)
+    run_scan(opts, lang_cache_path=cache, log=lines.append)
+    return lines
+
+def report_differences(a: str, b: str) -> list:
+    """
+    Paths (relative to a) whose content differs between the two report trees, per-run files left out.
+    """
+    diffs = []
+    cmp = filecmp.dircmp(a, b, ignore=list(RUN_ONLY_FILES))
+    pending = [("", cmp)]
+    while pending:
+        rel, c = pending.pop()
+        diffs += [os.path.join(rel, n) for n in c.left_only + c.right_only + c.funny_files]
+        _, mismatch, errors = filecmp.cmpfiles(c.left, c.right, c.common_files, shallow=False)
+        diffs += [os.path.join(rel, n) for n in mismatch + errors]
+        pending += [(os.path.join(rel, name), sub) for name, sub in c.subdirs.items()]
+    return sorted(diffs)
+
+@pytest.mark.parametrize("all_kinds", (False, True), ids=("items", "all_kinds"))
+@pytest.mark.parametrize("change", sorted(CHANGES))
+def test_incremental_rescan_equals_full_rescan(tmp_path, change, all_kinds):
+    paths = make_pack(str(tmp_path / "pack"))
+    inc_out = str(tmp_path / "incremental")
+    cache = str(tmp_path / "langcache.json")
+    scan(paths, inc_out, cache, all_kinds, incremental=True)
+    CHANGES[change](paths)
+    log = scan(paths, inc_out, cache, all_kinds, incremental=True)
+    # the second run really was incremental
+    assert not any("doing a full scan" in line for line in log), log
+    full_out = str(tmp_path / "full")
+    scan(paths, full_out, str(tmp_path / "fresh_cache.json"), all_kinds, incremental=False)
+    assert os.path.isfile(os.path.join(inc_out, "item" if all_kinds else "", "DELTA_since_last_run.txt"))
+    assert report_differences(inc_out, full_out) == []
+
+def test_unchanged_rescan_equals_full_rescan(tmp_path):
+    paths = make_pack(str(tmp_path / "pack"))
+    inc_out = str(tmp_path / "incremental")
+    cache = str(tmp_path / "langcache.json")
+    scan(paths, inc_out, cache, False, incremental=True)
+    scan(paths, inc_out, cache, False, incremental=True)
+    full_out = str(tmp_path / "full")
+    scan(paths, full_out, cache, False, incremental=False)
+    assert report_differences(inc_out, full_out) == []
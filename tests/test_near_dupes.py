@@ -0,0 +1,100 @@
+import random
+import itertools
+
+import pytest
+
+from mmdc_core.names import name_normalizer
+from mmdc_core.near_dupes import bounded_edit_distance, find_near_duplicates
+
+# small alphabets make near misses common; the second one is not ASCII
+ALPHABETS = ("abcde ", "aéßΩж ")
+
+def levenshtein(a: str, b: str) -> int:
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+def brute_force_pairs(ids_to_names, threshold):
+    """
+    find_near_duplicates by comparing every pair of names with the plain DP distance.
+    """
+    by_name = {}
+    for item_id, nm in ids_to_names.items():
+        by_name.setdefault(nm, []).append(item_id)
+    pairs = set()
+    for a, b in itertools.combinations(by_name, 2):
+        if {i.split(":", 1)[0] for i in by_name[a] + by_name[b]} == {by_name[a][0].split(":", 1)[0]}:
+            continue
+        longer = max(len(a), len(b))
+        if levenshtein(a, b) <= int((1.0 - threshold) * longer + 1e-9):
+            pairs.add(frozenset((a, b)))
+    return pairs
+
+def random_names(rng, alphabet, count, max_len):
+    base = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, max_len))) for _ in range(count // 3)]
+    names = list(base)
+    # mutated copies, so many pairs sit right around the threshold
+    while len(names) < count:
+        chars = list(rng.choice(base))
+        for _ in range(rng.randint(1, 3)):
+            op = rng.randrange(3)
+            pos = rng.randrange(len(chars) + 1)
+            if op == 0:
+                chars.insert(pos, rng.choice(alphabet))
+            elif chars and op == 1:
+                del chars[min(pos, len(chars) - 1)]
+            elif chars:
+                chars[min(pos, len(chars) - 1)] = rng.choice(alphabet)
+        if chars:
+            names.append("".join(chars))
+    return names
+
+def found_pairs(ids_to_names, threshold):
+    # no case or underscore folding: the brute force compares the names as they are
+    pairs = find_near_duplicates(ids_to_names, False, False, threshold, normalizer=name_normalizer(False, False))
+    return {frozenset((a, b)) for a, b, _, _, _ in pairs}
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("alphabet", ALPHABETS)
+def test_bounded_edit_distance_matches_levenshtein(seed, alphabet):
+    rng = random.Random(seed)
+    for _ in range(300):
+        a = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        b = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        limit = rng.randint(0, 6)
+        d = levenshtein(a, b)
+        assert bounded_edit_distance(a, b, limit) == (d if d <= limit else limit + 1), (a, b, limit)
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("alphabet", ALPHABETS)
+@pytest.mark.parametrize("threshold", (0.5, 0.67, 0.75, 0.85, 0.9))
+def test_find_near_duplicates_matches_brute_force(seed, alphabet, threshold):
+    rng = random.Random(seed)
+    names = random_names(rng, alphabet, 100, 14)
+    ids_to_names = {f"mod{rng.randrange(4)}:n{i}": nm for i, nm in enumerate(names)}
+    assert found_pairs(ids_to_names, threshold) == brute_force_pairs(ids_to_names, threshold)
+
+@pytest.mark.parametrize("threshold", (0.5, 0.6, 0.75))
+def test_short_names(threshold):
+    names = ["a", "b", "ab", "ba", "abc", "abd", "xbc", "ß", "ßa", "Ω", "ΩΩ"]
+    ids_to_names = {f"mod{i % 3}:n{i}": nm for i, nm in enumerate(names)}
+    assert found_pairs(ids_to_names, threshold) == brute_force_pairs(ids_to_names, threshold)
+
+def test_threshold_boundary():
+    ids_to_names = {"a:x": "copper ingot", "b:x": "copper ingos", "c:x": "cooper ingos"}
+    # 1 edit in 12 characters is 91.7% similar, 2 edits 83.3%
+    assert found_pairs(ids_to_names, 11 / 12) == {frozenset(("copper ingot", "copper ingos")),
+                                                   frozenset(("copper ingos", "cooper ingos"))}
+    assert found_pairs(ids_to_names, 11 / 12 + 0.001) == set()
+    assert found_pairs(ids_to_names, 10 / 12) == brute_force_pairs(ids_to_names, 10 / 12)
+    assert len(found_pairs(ids_to_names, 10 / 12)) == 3
+
+def test_same_mod_pairs_are_skipped():
+    ids_to_names = {"a:x": "copper ingot", "a:y": "copper ingots", "b:z": "tin ingot"}
+    assert found_pairs(ids_to_names, 0.9) == set()
+    ids_to_names["b:w"] = "copper ingots"
+    assert found_pairs(ids_to_names, 0.9) == {frozenset(("copper ingot", "copper ingots"))}
@@ -0,0 +1,94 @@
+import io
+import json
+import random
+
+import pytest
+
+from mmdc_core.common import extract_ids_from_json
+from mmdc_core.registry import JsonStream, iter_dump_ids, read_dump_ids
+
+class Trickle(io.StringIO):
+    """
+    A text file that hands out at most `step` characters per read, so every value gets split across chunks.
+    """
+    def __init__(self, text: str, step: int):
+        super().__init__(text)
+        self.step = step
+
+    def read(self, size=-1):
+        return super().read(self.step if size is None or size < 0 else min(size, self.step))
+
+DOCUMENTS = [
+    # the flat Registry Dump list
+    '["minecraft:stone", "mymod:copper_ingot", "mymod:tin_ingot"]',
+    # objects with id-like keys, other keys skipped whatever their type
+    '[{"id": "a:b", "props": {"hardness": 1.5, "tags": ["x", {"y": [1, 2, [3]]}]}, "n": null},'
+    ' {"registry_name": "c:d", "ok": true}, {"identifier": "e:f", "id": "g:h"}, {}]',
+    # escapes: quotes, backslashes, unicode, surrogate pairs, control escapes
+    r'["q:\"quoted\"", "b:back\\slash", "u:\u00e9t\u00e9", "s:\ud83d\ude00", "c:tab\there\nnl", "p:\/"]',
+    # a top-level object: every list is read, its own id keys come last
+    '{"entries": ["a:1", "a:2"], "id": "top:level", "meta": {"entries": ["not:read"]}, "more": [{"id": "a:3"}]}',
+    # a repeated key: the last one wins, a non-string value drops it
+    '[{"id": "first:one", "id": "second:one"}, {"id": "x:y", "id": 5}]',
+    # nested lists and scalars between the strings
+    '[["n:1", ["n:2"]], 1, -2.5e3, true, false, null, "n:3", {"id": "n:4"}, "last:one"]',
+    # whitespace everywhere
+    ' \n\t[ \r\n "w:1" ,\n\t"w:2" , { "id" :\n "w:3" } ] \n',
+    '[]',
+    '{}',
+    '"a bare string"',
+    '42',
+]
+
+def expected(text: str):
+    return list(extract_ids_from_json(json.loads(text)))
+
+@pytest.mark.parametrize("text", DOCUMENTS)
+@pytest.mark.parametrize("step", (1, 2, 3, 5, 7, 64, 1 << 16))
+def test_iter_dump_ids_matches_json_load(text, step):
+    assert list(iter_dump_ids(Trickle(text, step))) == expected(text)
+
+ID_PARTS = ("", "é", '"', "\\", "\n", "Ω", "path/to")
+
+def random_value(rng: random.Random, depth: int):
+    kind = rng.randrange(7 if depth < 3 else 4)
+    if kind == 0:
+        return f"{rng.choice(['a', 'mod', 'x_y'])}:{rng.choice(ID_PARTS)}{rng.randrange(100)}"
+    if kind == 1:
+        return rng.choice([0, -1, 2.5, 1e10, True, False, None])
+    if kind == 2:
+        return rng.choice(["plain", "with \"quote\"", "back\\slash", "ctrl\t\x01", "\U0001f600"])
+    if kind == 3:
+        return {rng.choice(["id", "identifier", "registry_name", "registryName", "other"]): random_value(rng, depth + 1)}
+    if kind == 4:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(5))]
+    return {rng.choice(["id", "entries", "data", "registryName"]) + str(i % 2 * rng.randrange(2)): random_value(rng, depth + 1)
+            for i in range(rng.randrange(5))}
+
+@pytest.mark.parametrize("seed", range(30))
+def test_random_documents(seed):
+    rng = random.Random(seed)
+    doc = [random_value(rng, 0) for _ in range(rng.randrange(1, 30))]
+    if rng.random() < 0.3:
+        doc = {"entries": doc, "id": "top:x"}
+    text = json.dumps(doc, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 1]))
+    for step in (1, 3, 17, 1 << 16):
+        assert list(iter_dump_ids(Trickle(text, step))) == expected(text)
+
+@pytest.mark.parametrize("text", ['["a:1", "a:2"', '["a:1" "a:2"]', '[{"id": "a:1"]', '["a:1"] x', '["unterminated'])
+def test_malformed_json_raises(text):
+    with pytest.raises(ValueError):
+        list(iter_dump_ids(Trickle(text, 3)))
+
+def test_string_run_stops_at_chunk_end():
+    js = JsonStream(Trickle('["a:1", "a:2", "a:3"]', 9), chunk_size=9)
+    js.expect("[")
+    # only entries whose closing quote and comma are in the buffer are taken
+    assert js.string_run() == ["a:1"]
+    assert js.string() == "a:2"
+
+def test_read_dump_ids_streams_like_json_load(tmp_path):
+    path = tmp_path / "mod.json"
+    text = DOCUMENTS[1]
+    path.write_text(text, encoding="utf-8")
+    assert read_dump_ids(str(path), stream_min_bytes=0) == read_dump_ids(str(path)) == expected(text)